@@ -5,6 +5,9 @@ Aproximadamente 10,000 compras ágiles
 
 Uso:
     python scraper_masivo_unico.py
+
+Para rangos arbitrarios usar scripts/backfill.py (fragmentos por día en paralelo,
+re-ejecutable y con fusión sin duplicados)
 """
 import json
 import time
@@ -9,13 +9,20 @@ sys.path.insert(0, str(BASE_DIR))
 
 # --- Importaciones del proyecto ---
 from src.scraper.list_scraper import ScraperListado
-from src.scraper.utilidades.helpers import cargar_json
-from src.filters.filter_advanced import FiltradorAvanzado
+from src.scraper.utilidades.lector_json import iterar_compras, iterar_dataframes
+from src.filters.filter_advanced import FiltradorAvanzado, COLUMNAS_FILTRADO, filtrar_por_lotes
+from src.filters.planificador import planificar_consulta
+from src.storage.snapshot import cargar_snapshot, ultimo_snapshot
+from src.storage.base_datos import AlmacenCompras
+from src.storage.historico import compactar_historico, cargar_historico
+from src.storage.normalizacion import normalizar_dataframe
+from config.config import PARAMETRO_TAMANO_PAGINA, TAMANO_PAGINA_BASE
 # Importamos la función 'main' del script de análisis para poder llamarla
 from scripts.analizar_organismos import main as analizar_organismos_main
 
 # --- DataFrame Global ---
 DF_COMPRAS = pd.DataFrame()
+ORIGEN_DATOS = None
 
 def limpiar_pantalla():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -23,20 +30,96 @@ def limpiar_pantalla():
 def esperar_enter():
     input("\nPresione Enter para continuar...")
 
+def asignar_compras(df, origen):
+    """Deja las compras en memoria ya tipadas (categorías, enteros, fechas): los filtros no reconvierten."""
+    global DF_COMPRAS, ORIGEN_DATOS
+    DF_COMPRAS = normalizar_dataframe(df)
+    ORIGEN_DATOS = origen
+
+def cargar_ultimo_snapshot():
+    """Carga el snapshot columnar del último scraping."""
+    ruta = ultimo_snapshot(prefijo='compras_completas')
+    if ruta is None:
+        return
+    try:
+        asignar_compras(cargar_snapshot(ruta), ruta.name)
+    except Exception as e:
+        print(f"No se pudo cargar el snapshot '{ruta.name}': {e}")
+
+def pedir_ruta_json():
+    """Pide la ruta de un archivo de compras; None si el usuario sale."""
+    while True:
+        ruta_archivo = input("Ingrese la ruta del archivo JSON/JSONL, también .gz (o 's' para salir): ")
+        if ruta_archivo.lower() == 's': return None
+        if Path(ruta_archivo).is_file(): return Path(ruta_archivo)
+        print(f"No existe el archivo '{ruta_archivo}'.")
+
+def leer_lotes_json(ruta_archivo):
+    """Lotes tipados para filtrar sin cargar el archivo: solo COLUMNAS_FILTRADO (p. ej. 'detalle' no se lee)."""
+    return (normalizar_dataframe(df) for df in iterar_dataframes(ruta_archivo, columnas=COLUMNAS_FILTRADO))
+
 def cargar_datos_json():
-    """Pide al usuario la ruta de un archivo JSON y lo carga en el DataFrame global."""
-    global DF_COMPRAS
+    """Carga un archivo JSON/JSONL completo en memoria (todas las columnas).
+    Para filtrar un archivo sin cargarlo entero: Filtrado Avanzado sin datos en memoria."""
     while True:
-        ruta_archivo = input("Ingrese la ruta del archivo JSON (o 's' para salir): ")
-        if ruta_archivo.lower() == 's': return False
+        ruta_archivo = pedir_ruta_json()
+        if ruta_archivo is None: return False
         try:
             print(f"Cargando datos desde '{ruta_archivo}'...")
-            DF_COMPRAS = pd.DataFrame(cargar_json(Path(ruta_archivo)))
+            asignar_compras(pd.DataFrame(list(iterar_compras(ruta_archivo))), ruta_archivo.name)
             print(f"¡Éxito! Se cargaron {len(DF_COMPRAS)} compras.")
             return True
         except Exception as e:
             print(f"Ocurrió un error: {e}")
 
+def consultar_total(parametros):
+    """resultCount de una consulta (lee solo la primera página)."""
+    scraper = ScraperListado(max_paginas=1, parametros=parametros)
+    scraper.ejecutar(guardar=False)
+    return scraper.total_resultados
+
+def cargar_datos_base():
+    """Carga compras de la base de datos por rango de fechas (consulta por índices)."""
+    limpiar_pantalla()
+    print("--- Cargar desde Base de Datos ---")
+    print("Defina el rango a cargar (Enter para omitir).")
+    fecha_inicio = input("Publicadas desde (YYYY-MM-DD): ") or None
+    fecha_fin = input("Publicadas hasta (YYYY-MM-DD): ") or None
+    organismo = input("Organismo (nombre exacto): ") or None
+    try:
+        almacen = AlmacenCompras()
+        df = almacen.consultar_compras(fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, organismo=organismo)
+        almacen.cerrar()
+    except Exception as e:
+        print(f"Ocurrió un error al consultar la base de datos: {e}")
+        return
+    if df.empty:
+        print("No hay compras en la base para ese rango.")
+        return
+    asignar_compras(df, 'base de datos')
+    print(f"¡Éxito! Se cargaron {len(DF_COMPRAS)} compras.")
+
+def cargar_datos_historico():
+    """Compacta data/raw en el histórico y carga un rango (solo lee los meses del rango)."""
+    limpiar_pantalla()
+    print("--- Cargar desde Histórico ---")
+    try:
+        resumen = compactar_historico()
+        if resumen['archivos']:
+            print(f"Compactados {resumen['archivos']} archivos nuevos ({resumen['compras']} compras).")
+    except Exception as e:
+        print(f"Ocurrió un error al compactar data/raw: {e}")
+        return
+    print("Defina el rango a cargar (Enter para omitir).")
+    fecha_inicio = input("Publicadas desde (YYYY-MM-DD): ") or None
+    fecha_fin = input("Publicadas hasta (YYYY-MM-DD): ") or None
+    df = cargar_historico(fecha_inicio, fecha_fin)
+    if df.empty:
+        print("No hay compras en el histórico para ese rango.")
+        return
+    asignar_compras(df, 'histórico')
+    print(f"¡Éxito! Se cargaron {len(DF_COMPRAS)} compras.")
+
 def gestionar_scraping():
     """Gestiona la ejecución del scraper."""
     limpiar_pantalla()
@@ -45,14 +128,44 @@ def gestionar_scraping():
         limite_str = input("Límite de páginas a scrapear (Enter para sin límite): ")
         limite_paginas = int(limite_str) if limite_str else None
         
-        compras, archivo = ScraperListado(max_paginas=limite_paginas).ejecutar(guardar=True)
+        print("\nFiltros que resuelve el buscador (Enter para omitir).")
+        plan = planificar_consulta(
+            texto=input("Texto a buscar: "),
+            region=input("Código de región (ej: 13): "),
+            fecha_inicio=input("Publicadas desde (YYYY-MM-DD): "),
+            fecha_fin=input("Publicadas hasta (YYYY-MM-DD): "),
+            orden=input("Orden (recent / closing_soon): ")
+        )
+        
+        scraper = ScraperListado(max_paginas=limite_paginas, parametros=plan.parametros)
+        
+        reanudar = False
+        if scraper.hay_corrida_interrumpida():
+            reanudar = input("Hay una corrida interrumpida. ¿Reanudarla? (s/n): ").lower() == 's'
+        
+        compras, archivo = scraper.ejecutar(guardar=True, reanudar=reanudar)
+        
+        # El reporte de ahorro necesita otra corrida del listado (la consulta sin filtros)
+        if plan.empujados and input("¿Calcular páginas ahorradas? Requiere una consulta extra (s/n): ").lower() == 's':
+            ahorro = plan.reportar_ahorro(
+                consultar_total, scraper.total_resultados,
+                scraper.parametros.get(PARAMETRO_TAMANO_PAGINA, TAMANO_PAGINA_BASE)
+            )
+            if ahorro['paginas_ahorradas'] is not None:
+                print(f"\nFiltros en la consulta ({', '.join(plan.empujados)}): "
+                      f"{ahorro['paginas_con_pushdown']} páginas en vez de {ahorro['paginas_sin_pushdown']} "
+                      f"({ahorro['paginas_ahorradas']} ahorradas).")
         
         if compras:
             print(f"\nScraping completado: {len(compras)} compras encontradas.")
             print(f"Resultados guardados en: {archivo}")
+            # Lo que la API no filtró (p. ej. un parámetro de texto que ignora) se descarta aquí
+            df = plan.aplicar_filtros_locales(pd.DataFrame(compras))
+            if len(df) < len(compras):
+                print(f"Filtros locales: {len(df)} de {len(compras)} compras cumplen la búsqueda.")
             if input("¿Cargar estos datos para filtrar? (s/n): ").lower() == 's':
-                global DF_COMPRAS
-                DF_COMPRAS = pd.DataFrame(compras)
+                asignar_compras(df, Path(archivo).name if archivo else 'scraping')
+
     except Exception as e:
         print(f"\nOcurrió un error durante el scraping: {e}")
 
@@ -62,8 +175,12 @@ def gestionar_filtrado_avanzado():
     limpiar_pantalla()
     print("--- Módulo de Filtrado Avanzado y Puntuación ---")
 
-    if DF_COMPRAS.empty and not cargar_datos_json():
-        return
+    # Sin datos en memoria se filtra un archivo lote a lote, sin cargarlo entero
+    ruta_archivo = None
+    if DF_COMPRAS.empty:
+        ruta_archivo = pedir_ruta_json()
+        if ruta_archivo is None:
+            return
     
     print("\nDefina los criterios de filtrado (Enter para omitir).")
     
@@ -82,10 +199,18 @@ def gestionar_filtrado_avanzado():
     
     keywords = [k.strip() for k in keywords_str.split(',') if k.strip()]
     
-    df_resultado = FiltradorAvanzado(DF_COMPRAS).ejecutar_filtrado(
+    criterios = dict(
         keywords=keywords, min_monto=min_monto, max_monto=max_monto,
         fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, codigo_exacto=codigo
     )
+    if ruta_archivo:
+        try:
+            df_resultado = filtrar_por_lotes(leer_lotes_json(ruta_archivo), **criterios)
+        except Exception as e:
+            print(f"Ocurrió un error al leer '{ruta_archivo}': {e}")
+            return
+    else:
+        df_resultado = FiltradorAvanzado(DF_COMPRAS).ejecutar_filtrado(**criterios)
 
     if df_resultado.empty:
         print("No se encontraron compras relevantes que cumplan los criterios.")
@@ -135,12 +260,13 @@ def gestionar_tests():
 
 def main():
     """Bucle principal de la aplicación."""
+    cargar_ultimo_snapshot()
     while True:
         limpiar_pantalla()
         print("="*45)
         print("== Asistente de Scraping y Análisis M-CAv1 ==")
         print("="*45)
-        print(f"Datos en memoria: {len(DF_COMPRAS)} compras")
+        print(f"Datos en memoria: {len(DF_COMPRAS)} compras" + (f" ({ORIGEN_DATOS})" if ORIGEN_DATOS else ""))
         print("-"*45)
         print("\nMenú Principal:")
         print("1. Cargar Datos desde Archivo JSON")
@@ -148,6 +274,8 @@ def main():
         print("3. Filtrado Avanzado y Puntuación")
         print("4. Ejecutar Análisis de Organismos")
         print("5. Ejecutar Pruebas del Sistema")
+        print("6. Cargar Datos desde la Base de Datos")
+        print("7. Cargar Datos desde el Histórico (compacta data/raw)")
         print("0. Salir")
         
         opcion = input("\nSeleccione una opción: ")
@@ -155,7 +283,8 @@ def main():
         opciones = {
             '1': (cargar_datos_json, True), '2': (gestionar_scraping, True),
             '3': (gestionar_filtrado_avanzado, True), '4': (gestionar_analisis, True),
-            '5': (gestionar_tests, False)
+            '5': (gestionar_tests, False), '6': (cargar_datos_base, True),
+            '7': (cargar_datos_historico, True)
         }
         if opcion == '0':
             print("¡Hasta luego!"); break
@@ -0,0 +1,95 @@
+"""
+Backfill de compras ágiles para un rango de fechas
+Reemplaza al script de uso único m.py: fragmentos por día en procesos paralelos,
+re-ejecutable (omite los fragmentos ya completos) y con fusión sin duplicados
+
+Uso:
+    python scripts/backfill.py 2025-09-23 2025-10-23 --procesos 4
+"""
+import argparse
+import sys
+from pathlib import Path
+from datetime import datetime
+
+# Agregar directorio raíz al path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.backfill import BackfillListado
+from src.scraper.list_scraper import MODOS_SCRAPING
+from config.config import (
+    MODO_SCRAPING,
+    BACKFILL_PROCESOS,
+    BACKFILL_DIAS_POR_FRAGMENTO
+)
+
+
+def main():
+    """
+    Ejecuta el backfill con los argumentos de línea de comandos
+    
+    Returns:
+        int: 0 si éxito, 1 si error o fragmentos incompletos
+    """
+    parser = argparse.ArgumentParser(description="Backfill paralelo de compras ágiles")
+    parser.add_argument('desde', help="Fecha inicial YYYY-MM-DD (incluida)")
+    parser.add_argument('hasta', help="Fecha final YYYY-MM-DD (incluida)")
+    parser.add_argument('--procesos', type=int, default=BACKFILL_PROCESOS,
+                        help="Procesos trabajadores en paralelo")
+    parser.add_argument('--dias', type=int, default=BACKFILL_DIAS_POR_FRAGMENTO,
+                        help="Días por fragmento")
+    parser.add_argument('--modo', choices=MODOS_SCRAPING, default=MODO_SCRAPING,
+                        help="Modo de obtención del listado en cada fragmento")
+    parser.add_argument('--status', help="Estado de las compras (por defecto el de PARAMETROS_API)")
+    parser.add_argument('--order-by', help="Orden del listado (por defecto el de PARAMETROS_API)")
+    argumentos = parser.parse_args()
+    
+    parametros = {}
+    if argumentos.status:
+        parametros['status'] = argumentos.status
+    if argumentos.order_by:
+        parametros['order_by'] = argumentos.order_by
+    
+    tiempo_inicio = datetime.now()
+    
+    try:
+        backfill = BackfillListado(
+            argumentos.desde, argumentos.hasta,
+            procesos=argumentos.procesos,
+            dias_por_fragmento=argumentos.dias,
+            modo=argumentos.modo,
+            parametros=parametros
+        )
+        
+        print(f"Backfill {argumentos.desde} .. {argumentos.hasta}")
+        print(f"  Fragmentos: {len(backfill.fragmentos)} | "
+              f"Pendientes: {len(backfill.fragmentos_pendientes())}")
+        print("-" * 50)
+        
+        compras, ruta, incompletos = backfill.ejecutar(guardar=True)
+        
+        tiempo_total = (datetime.now() - tiempo_inicio).total_seconds()
+        
+        print("-" * 50)
+        print(f"  Compras únicas: {len(compras)}")
+        print(f"  Tiempo: {int(tiempo_total // 60)}m {int(tiempo_total % 60)}s")
+        if ruta:
+            print(f"  Archivo: {ruta}")
+        if incompletos:
+            print(f"  Fragmentos incompletos: {len(incompletos)} (vuelve a ejecutar para completarlos)")
+            return 1
+        
+        return 0
+    
+    except KeyboardInterrupt:
+        print("\nProceso interrumpido por usuario (los fragmentos completos quedan registrados)")
+        return 1
+    
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        print("Revisa logs/scraper/ para más detalles")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Compactación de data/raw en el histórico particionado por mes de publicación
+Re-ejecutable: solo lee los archivos nuevos o modificados desde la última vez
+
+Uso:
+    python scripts/compactar_historico.py
+"""
+import sys
+from pathlib import Path
+from datetime import datetime
+
+# Agregar directorio raíz al path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.storage.historico import compactar_historico
+from config.config import DIRECTORIO_DATOS_RAW, DIRECTORIO_HISTORICO
+
+
+def main():
+    """
+    Ejecuta la compactación e imprime el resumen
+
+    Returns:
+        int: 0 si éxito, 1 si error
+    """
+    tiempo_inicio = datetime.now()
+
+    try:
+        print(f"Compactando {DIRECTORIO_DATOS_RAW} -> {DIRECTORIO_HISTORICO}")
+        print("-" * 50)
+
+        resumen = compactar_historico()
+
+        tiempo_total = (datetime.now() - tiempo_inicio).total_seconds()
+
+        print(f"  Archivos nuevos: {resumen['archivos']}")
+        print(f"  Compras únicas: {resumen['compras']}")
+        print(f"  Particiones reescritas: {', '.join(resumen['particiones']) or 'ninguna'}")
+        if resumen['omitidos']:
+            print(f"  Omitidos (no son listas de compras): {', '.join(resumen['omitidos'])}")
+        print(f"  Tiempo: {tiempo_total:.1f}s")
+
+        return 0
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,34 +29,51 @@ def main():
     
     try:
         # ========================================
-        # PASO 1: SCRAPING DE LISTADO COMPLETO
+        # PASO 1: LISTADO COMPLETO, FILTRANDO CADA PÁGINA AL LLEGAR
         # ========================================
-        print("[1/2] Extrayendo listado completo...", end=" ", flush=True)
+        print("[1/2] Extrayendo listado y filtrando en flujo...", end=" ", flush=True)
         
         scraper_listado = ScraperListado(max_paginas=None)
-        compras_completas, archivo_completo = scraper_listado.ejecutar(guardar=True)
+        filtrador = FiltradorCompras()
+        
+        filtradas_por_pagina = {}
+        tiempo_primer_hallazgo = None
+        for numero_pagina, filtradas in filtrador.filtrar_en_flujo(scraper_listado.iterar_paginas(guardar=True)):
+            # Una página corregida por corrimiento llega otra vez con compras adicionales
+            filtradas_por_pagina.setdefault(numero_pagina, []).extend(filtradas)
+            if filtradas and tiempo_primer_hallazgo is None:
+                tiempo_primer_hallazgo = (datetime.now() - tiempo_inicio).total_seconds()
+        
+        compras_completas = scraper_listado.compras
         
         if not compras_completas:
             print("ERROR")
             print("No se obtuvieron compras. Revisa logs/scraper/")
             return 1
         
+        archivo_completo = scraper_listado.guardar_resultados()
+        
         tiempo_paso1 = (datetime.now() - tiempo_inicio).total_seconds()
         velocidad_paso1 = len(compras_completas) / tiempo_paso1 if tiempo_paso1 > 0 else 0
         
         print(f"OK")
         print(f"    Compras extraídas: {len(compras_completas)}")
         print(f"    Tiempo: {int(tiempo_paso1)}s ({velocidad_paso1:.1f} compras/s)")
+        if tiempo_primer_hallazgo is not None:
+            print(f"    Primer segundo llamado a los {int(tiempo_primer_hallazgo)}s")
         
         # ========================================
-        # PASO 2: FILTRADO POR ESTADO_CONVOCATORIA
+        # PASO 2: RESULTADO DEL FILTRADO POR ESTADO_CONVOCATORIA
         # ========================================
-        print("[2/2] Filtrando por segundo llamado...", end=" ", flush=True)
+        print("[2/2] Guardando compras con segundo llamado...", end=" ", flush=True)
         
         tiempo_paso2_inicio = datetime.now()
         
-        filtrador = FiltradorCompras()
-        compras_filtradas = filtrador.filtrar_segundo_llamado(compras_completas)
+        # En orden de página (las páginas reintentadas llegan al final)
+        compras_filtradas = [
+            compra for numero_pagina in sorted(filtradas_por_pagina)
+            for compra in filtradas_por_pagina[numero_pagina]
+        ]
         estadisticas = filtrador.generar_estadisticas(compras_completas, compras_filtradas)
         
         # Guardar resultados
@@ -0,0 +1,54 @@
+"""
+Listado simulado compartido por los tests del scraper
+Payloads con la forma de la API de compra ágil y páginas que registran lo pedido
+"""
+
+
+def crear_payload(pagina, cantidad=2, total_paginas=4, campos=None):
+    """
+    Respuesta de una página del listado con compras de id pagina * 100 + i
+
+    Args:
+        pagina: Número de página
+        cantidad: Compras por página
+        total_paginas: pageCount informado
+        campos: Función (pagina, i) -> dict con claves extra de cada compra
+    """
+    resultados = []
+    for i in range(cantidad):
+        compra = {'id': pagina * 100 + i}
+        if campos:
+            compra.update(campos(pagina, i))
+        resultados.append(compra)
+
+    return {
+        'success': 'OK',
+        'payload': {
+            'resultados': resultados,
+            'resultCount': cantidad * total_paginas,
+            'pageCount': total_paginas,
+            'page': pagina,
+            'pageSize': cantidad
+        }
+    }
+
+
+class ListadoSimulado:
+    """
+    Páginas simuladas para _recorrer_paginas, de a una o por lote
+
+    Atributos:
+        pedidas: Números de página pedidos, en orden
+    """
+
+    def __init__(self, **payload):
+        self.payload = payload
+        self.pedidas = []
+
+    def obtener_pagina(self, numero):
+        self.pedidas.append(numero)
+        return crear_payload(numero, **self.payload)
+
+    def obtener_lote(self, paginas):
+        self.pedidas.extend(paginas)
+        return {numero: crear_payload(numero, **self.payload) for numero in paginas}
@@ -207,6 +207,62 @@ def test_limpieza():
     print(f"✓ Respuesta limpiada correctamente")
 
 
+def test_captura_por_clave():
+    """Prueba que respuestas de varias páginas en vuelo no se pisen"""
+    print("\nTEST: Captura por clave")
+    print("-" * 50)
+    
+    logger = configurar_logger('test_api_handler')
+    manejador = ManejadorAPI(logger)
+    
+    for pagina in (3, 4):
+        datos_mock = {
+            "success": "OK",
+            "payload": {"resultados": [{"id": pagina}], "page": pagina}
+        }
+        url_api = f"https://api.buscador.mercadopublico.cl/compra-agil?page_number={pagina}"
+        manejador.interceptar_respuesta(MockResponse(url_api, datos_mock))
+    
+    ficha_mock = {"success": "OK", "payload": {"codigo": "1234-567-COT89"}}
+    url_ficha = "https://api.buscador.mercadopublico.cl/compra-agil?action=ficha&code=1234-567-COT89"
+    manejador.interceptar_respuesta(MockResponse(url_ficha, ficha_mock))
+    
+    assert manejador.tomar_respuesta(('listado', 4))['payload']['page'] == 4
+    assert manejador.tomar_respuesta(('listado', 3))['payload']['page'] == 3
+    assert manejador.tomar_respuesta(('listado', 3)) is None
+    assert manejador.tomar_respuesta(('ficha', '1234-567-COT89')) is not None
+    print(f"✓ Respuestas separadas por página y por código")
+
+
+def test_esperar_respuesta():
+    """Prueba que la espera retorne apenas llega la respuesta de la clave"""
+    print("\nTEST: Espera por evento")
+    print("-" * 50)
+    
+    logger = configurar_logger('test_api_handler')
+    manejador = ManejadorAPI(logger)
+    
+    class MockPage:
+        """Entrega primero la página 1 y luego la 2 en cada evento"""
+        def __init__(self):
+            self.eventos = [1, 2]
+        
+        def wait_for_event(self, evento, predicate=None, timeout=None):
+            pagina = self.eventos.pop(0)
+            datos_mock = {"success": "OK", "payload": {"resultados": [], "page": pagina}}
+            url_api = f"https://api.buscador.mercadopublico.cl/compra-agil?page_number={pagina}"
+            respuesta = MockResponse(url_api, datos_mock)
+            manejador.interceptar_respuesta(respuesta)
+            return respuesta
+    
+    page = MockPage()
+    datos = manejador.esperar_respuesta(page, ('listado', 2), timeout=5)
+    
+    assert datos['payload']['page'] == 2
+    assert page.eventos == []
+    print(f"✓ Respuesta de la página 2 obtenida sin esperas fijas")
+
+
 def main():
     """Ejecuta todos los tests"""
     print("=" * 50)
@@ -220,6 +276,8 @@ def main():
         test_extraccion_metadata()
         test_verificacion_exito()
         test_limpieza()
+        test_captura_por_clave()
+        test_esperar_respuesta()
         
         print("\n" + "=" * 50)
         print("RESULTADO: Manejador de API válido")
@@ -0,0 +1,122 @@
+"""
+Test de backfill por fragmentos
+Valida: división del rango, manifiesto de fragmentos completos y fusión sin duplicados
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper import backfill as modulo_backfill
+from src.scraper.backfill import BackfillListado, generar_fragmentos, deduplicar_compras
+from src.scraper.utilidades.indice import identificador_compra
+
+
+def test_fragmentos():
+    """Prueba la división de rangos en días y en bloques de N días"""
+    print("TEST: División en fragmentos")
+    print("-" * 50)
+
+    assert generar_fragmentos('2025-09-29', '2025-10-02') == [
+        ('2025-09-29', '2025-09-29'), ('2025-09-30', '2025-09-30'),
+        ('2025-10-01', '2025-10-01'), ('2025-10-02', '2025-10-02')
+    ]
+    assert generar_fragmentos('2025-10-01', '2025-10-05', 2) == [
+        ('2025-10-01', '2025-10-02'), ('2025-10-03', '2025-10-04'), ('2025-10-05', '2025-10-05')
+    ]
+    print("✓ Rangos divididos por día y por bloques")
+
+
+def test_deduplicar():
+    """Prueba que se conserve la primera aparición de cada compra"""
+    print("\nTEST: Deduplicación")
+    print("-" * 50)
+
+    compras = [{'id': 1, 'v': 'a'}, {'id': 2}, {'id': 1, 'v': 'b'}]
+    assert deduplicar_compras(compras) == [{'id': 1, 'v': 'a'}, {'id': 2}]
+    print("✓ Duplicados eliminados")
+
+    # Misma clave que el índice incremental: el código manda sobre el id
+    compras = [{'id': 1, 'codigo': '1-1-COT25'}, {'id': 2, 'codigo': '1-1-COT25'}, {'id': 1, 'codigo': '2-1-COT25'}]
+    unicas = deduplicar_compras(compras)
+    assert unicas == [compras[0], compras[2]]
+    assert len(unicas) == len({identificador_compra(compra) for compra in compras})
+    print("✓ Deduplicación con la misma clave que el índice incremental")
+
+
+def test_manifiesto():
+    """Prueba que una re-ejecución omita los fragmentos completos"""
+    print("\nTEST: Manifiesto y re-ejecución")
+    print("-" * 50)
+
+    ejecutados = []
+
+    def fragmento_simulado(argumentos):
+        desde, hasta, _, _, directorio = argumentos
+        ejecutados.append(desde)
+        # El primer día lanza una excepción la primera vez
+        if desde == '2025-10-01' and ejecutados.count(desde) == 1:
+            raise ConnectionError("API caída")
+        compras = [{'id': desde}, {'id': 'compartida'}]
+        archivo = modulo_backfill.guardar_json(compras, f"{desde}_{hasta}.json", directorio)
+        return {
+            'desde': desde, 'hasta': hasta, 'archivo': str(archivo),
+            'compras': 2, 'compras_esperadas': 2,
+            # El segundo día falla la primera vez
+            'completo': desde != '2025-10-02' or ejecutados.count(desde) > 1
+        }
+
+    original = modulo_backfill._ejecutar_fragmento
+    directorio_original = modulo_backfill.DIRECTORIO_BACKFILL
+    modulo_backfill._ejecutar_fragmento = fragmento_simulado
+
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            modulo_backfill.DIRECTORIO_BACKFILL = Path(directorio)
+
+            backfill = BackfillListado('2025-10-01', '2025-10-03', procesos=1)
+            compras, _, incompletos = backfill.ejecutar(guardar=False)
+            assert incompletos == [('2025-10-01', '2025-10-01'), ('2025-10-02', '2025-10-02')]
+            assert len(compras) == 3
+
+            backfill = BackfillListado('2025-10-01', '2025-10-03', procesos=1)
+            compras, _, incompletos = backfill.ejecutar(guardar=False)
+            assert incompletos == []
+            assert len(compras) == 4
+            assert ejecutados == ['2025-10-01', '2025-10-02', '2025-10-03', '2025-10-01', '2025-10-02']
+    finally:
+        modulo_backfill._ejecutar_fragmento = original
+        modulo_backfill.DIRECTORIO_BACKFILL = directorio_original
+
+    print("✓ Un fragmento con error no corta el backfill y queda pendiente")
+    print("✓ Solo los fragmentos incompletos se volvieron a ejecutar")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Backfill")
+    print("=" * 50)
+
+    try:
+        test_fragmentos()
+        test_deduplicar()
+        test_manifiesto()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Backfill válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Test de la base de datos de compras
+Valida: inserción idempotente por id, detalle e historial, consultas por
+fechas/organismo/estado/monto, índices creados y filtrado sobre el resultado
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import inspect
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.storage.base_datos import AlmacenCompras
+from src.filters.filter_advanced import FiltradorAvanzado
+
+
+def crear_compras(cantidad=6, sufijo=''):
+    return [
+        {
+            'id': i, 'codigo': f"1000-{i}-COT25", 'nombre': f"Compra de herramientas {i}{sufijo}",
+            'organismo': 'Hospital Regional' if i % 2 else 'Municipalidad de Talca',
+            'estado_convocatoria': 2 if i % 3 else 1,
+            'monto_disponible_CLP': 100000 * i,
+            'fecha_publicacion': f"2026-10-{10 + i:02d} 09:00:00",
+            'fecha_cierre': f"2026-10-{20 + i:02d} 18:00:00",
+            'cantidad_provedores_cotizando': i % 2
+        }
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def abrir_almacen(directorio):
+    return AlmacenCompras(f"sqlite:///{Path(directorio) / 'compras.sqlite'}", tamano_lote=4)
+
+
+def test_insercion_idempotente():
+    """Prueba que guardar dos veces no duplique y actualice por id"""
+    print("TEST: Inserción idempotente")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = abrir_almacen(directorio)
+
+        assert almacen.guardar_compras(crear_compras()) == 6
+        assert almacen.guardar_compras(crear_compras(sufijo=' (editada)')) == 6
+        df = almacen.consultar_compras()
+        assert len(df) == 6
+        assert df['nombre'].str.endswith('(editada)').all()
+        print("✓ Segunda carga actualiza las mismas 6 compras")
+
+        # Duplicados dentro del mismo lote: gana la última aparición
+        duplicadas = crear_compras(2) + [dict(crear_compras(1)[0], nombre='Última versión')]
+        assert almacen.guardar_compras(duplicadas) == 2
+        assert almacen.consultar_compras(fecha_fin='2026-10-11')['nombre'].tolist() == ['Última versión']
+        print("✓ Ids repetidos en un lote se guardan una vez")
+
+        almacen.cerrar()
+
+
+def test_detalles_e_historial():
+    """Prueba que el historial de cada compra se reemplace al volver a guardar"""
+    print("\nTEST: Detalles e historial")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = abrir_almacen(directorio)
+
+        compras = crear_compras(2)
+        for compra in compras:
+            compra['detalle'] = {
+                'codigo': compra['codigo'],
+                'ficha': {'descripcion': 'Martillos'},
+                'historial': [{'accion': 'Publicada'}, {'accion': 'Cerrada'}],
+                'fecha_scraping_detalle': '2026-10-17T10:00:00'
+            }
+
+        assert almacen.guardar_detalles(compras) == 2
+        assert almacen.obtener_historial('1000-1-COT25') == [{'accion': 'Publicada'}, {'accion': 'Cerrada'}]
+
+        compras[0]['detalle']['historial'] = [{'accion': 'Revocada'}]
+        almacen.guardar_detalles(compras[:1])
+        assert almacen.obtener_historial('1000-1-COT25') == [{'accion': 'Revocada'}]
+        assert len(almacen.obtener_historial('1000-2-COT25')) == 2
+        assert 'detalle' not in almacen.consultar_compras().columns
+        print("✓ Historial reemplazado solo para la compra actualizada")
+
+        almacen.cerrar()
+
+
+def test_consultas_e_indices():
+    """Prueba filtros de consulta e índices de las columnas filtradas"""
+    print("\nTEST: Consultas e índices")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = abrir_almacen(directorio)
+        almacen.guardar_compras(crear_compras())
+
+        df = almacen.consultar_compras(fecha_inicio='2026-10-12', fecha_fin='2026-10-14')
+        assert df['id'].tolist() == [2, 3, 4]
+        assert pd.api.types.is_datetime64_any_dtype(df['fecha_publicacion'])
+        print("✓ Rango de publicación inclusive en ambos extremos")
+
+        assert almacen.consultar_compras(organismo='Hospital Regional')['id'].tolist() == [1, 3, 5]
+        assert almacen.consultar_compras(estado_convocatoria=1)['id'].tolist() == [3, 6]
+        assert almacen.consultar_compras(min_monto=200000, max_monto=400000)['id'].tolist() == [2, 3, 4]
+        assert almacen.consultar_compras(cierre_hasta='2026-10-22 23:59:59')['id'].tolist() == [1, 2]
+        assert almacen.consultar_compras(fecha_inicio='2027-01-01').empty
+        print("✓ Filtros de organismo, estado, monto y cierre")
+
+        indices = {
+            indice['column_names'][0]
+            for indice in inspect(almacen.motor).get_indexes('compras')
+        }
+        assert {'fecha_publicacion', 'fecha_cierre', 'organismo', 'estado_convocatoria'} <= indices
+        print("✓ Índices en fechas, organismo y estado")
+
+        argumentos = {'keywords': ['herramientas'], 'min_monto': 150000, 'fecha_inicio': '2026-10-12'}
+        desde_base = FiltradorAvanzado(almacen.consultar_compras()).ejecutar_filtrado(**argumentos)
+        desde_json = FiltradorAvanzado(pd.DataFrame(crear_compras())).ejecutar_filtrado(**argumentos)
+        assert list(desde_base['codigo']) == list(desde_json['codigo'])
+        print(f"✓ Mismo filtrado que con el JSON: {len(desde_base)} compras relevantes")
+
+        almacen.cerrar()
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Base de datos de compras")
+    print("=" * 50)
+
+    try:
+        test_insercion_idempotente()
+        test_detalles_e_historial()
+        test_consultas_e_indices()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Base de datos válida")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
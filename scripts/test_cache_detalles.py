@@ -0,0 +1,138 @@
+"""
+Test de la caché de detalles
+Valida: vencimiento según estado y fecha_cierre, descarte LRU y aciertos en el scraper
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.utilidades.cache_detalles import CacheDetalles, calcular_expiracion
+from src.scraper.detail_scraper import ScraperDetalles
+
+
+def fecha_en(horas):
+    return (datetime.now() + timedelta(hours=horas)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def test_expiracion():
+    """Prueba el vencimiento según estado y cercanía del cierre"""
+    print("TEST: Vencimiento por estado")
+    print("-" * 50)
+
+    ahora = time.time()
+    parametros = {'ahora': ahora, 'fraccion': 0.25, 'ttl_minimo': 300, 'ttl_maximo': 6 * 3600}
+
+    assert calcular_expiracion({'estado': 'Adjudicada'}, **parametros) is None
+    assert calcular_expiracion({'estado': 'Publicada', 'fecha_cierre': fecha_en(-1)}, **parametros) is None
+    print("✓ Adjudicadas y cerradas no vencen")
+
+    lejana = calcular_expiracion({'estado': 'Publicada', 'fecha_cierre': fecha_en(72)}, **parametros)
+    media = calcular_expiracion({'estado': 'Publicada', 'fecha_cierre': fecha_en(8)}, **parametros)
+    cercana = calcular_expiracion({'estado': 'Publicada', 'fecha_cierre': fecha_en(0.1)}, **parametros)
+
+    assert lejana - ahora == 6 * 3600
+    assert abs((media - ahora) - 2 * 3600) < 5
+    assert cercana - ahora == 300
+    print("✓ La vigencia de las abiertas se acorta al acercarse el cierre")
+
+
+def test_cache_lru():
+    """Prueba vencimiento en lectura y descarte de las menos usadas"""
+    print("\nTEST: Caché con descarte LRU")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheDetalles(Path(directorio) / 'cache.sqlite', maximo=2)
+
+        cache.guardar('A', {'ficha': {'estado': 'Cerrada'}})
+        time.sleep(0.01)
+        cache.guardar('B', {'ficha': {'estado': 'Cerrada'}})
+        time.sleep(0.01)
+        assert cache.obtener('A') is not None  # A pasa a ser la más reciente
+        time.sleep(0.01)
+        cache.guardar('C', {'ficha': {'estado': 'Cerrada'}})
+
+        assert len(cache) == 2
+        assert cache.obtener('B') is None
+        assert cache.obtener('A') and cache.obtener('C')
+        print("✓ Se descartó la entrada menos usada")
+
+        cache._conexion.execute("UPDATE detalles SET expira_en = ? WHERE codigo = 'A'", (time.time() - 1,))
+        assert cache.obtener('A') is None
+        assert len(cache) == 1
+        print("✓ Entrada vencida descartada al leerla")
+        cache.cerrar()
+
+
+def test_aciertos_en_scraper():
+    """Prueba que la segunda corrida no vuelva a pedir las fichas cerradas"""
+    print("\nTEST: Aciertos y fallos en el scraper")
+    print("-" * 50)
+
+    class ClienteMock:
+        def __init__(self):
+            self.fichas = []
+
+        def obtener_ficha(self, codigo):
+            self.fichas.append(codigo)
+            estado = 'Cerrada' if codigo == 'cerrada' else 'Publicada'
+            return {'payload': {'estado': estado, 'fecha_cierre': fecha_en(0.01)}}
+
+        def obtener_historial(self, codigo):
+            return {'payload': []}
+
+    compras = [{'codigo': 'cerrada'}, {'codigo': 'abierta'}]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheDetalles(Path(directorio) / 'cache.sqlite')
+        cliente = ClienteMock()
+
+        scraper = ScraperDetalles(cache=cache)
+        scraper.scrapear_multiples_detalles_http(compras, concurrencia=2, cliente=cliente)
+        assert (scraper.estadisticas.cache_aciertos, scraper.estadisticas.cache_fallos) == (0, 2)
+
+        # Vence la entrada abierta (cierre inminente => TTL mínimo)
+        cache._conexion.execute("UPDATE detalles SET expira_en = ? WHERE codigo = 'abierta'", (time.time() - 1,))
+
+        scraper = ScraperDetalles(cache=cache)
+        resultado = scraper.scrapear_multiples_detalles_http(compras, concurrencia=2, cliente=cliente)
+        assert (scraper.estadisticas.cache_aciertos, scraper.estadisticas.cache_fallos) == (1, 1)
+        assert sorted(cliente.fichas) == ['abierta', 'abierta', 'cerrada']
+        assert [compra['codigo'] for compra in resultado] == ['cerrada', 'abierta']
+        assert all('detalle' in compra for compra in resultado)
+        assert scraper.estadisticas.obtener_resumen()['cache_aciertos'] == 1
+        print("✓ Ficha cerrada servida desde caché; abierta vencida descargada de nuevo")
+        cache.cerrar()
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Caché de detalles")
+    print("=" * 50)
+
+    try:
+        test_expiracion()
+        test_cache_lru()
+        test_aciertos_en_scraper()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Caché de detalles válida")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
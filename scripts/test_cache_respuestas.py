@@ -0,0 +1,131 @@
+"""
+Test de la caché de respuestas del listado
+Valida: vigencia, descarte por tamaño, páginas servidas desde caché en el scraper
+y cierre de la caché al terminar la corrida
+"""
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.utilidades.cache_respuestas import CacheRespuestas
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.utilidades.checkpoint import GestorCheckpoint
+from scripts.listado_simulado import ListadoSimulado
+
+
+def test_vigencia_y_tamano():
+    """Prueba vencimiento por TTL y descarte de las menos usadas"""
+    print("TEST: Vigencia y tamaño máximo")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheRespuestas(Path(directorio) / 'respuestas.sqlite', ttl=60, maximo=2)
+
+        cache.guardar('url-1', {'n': 1})
+        time.sleep(0.01)
+        cache.guardar('url-2', {'n': 2})
+        time.sleep(0.01)
+        cache.obtener('url-1')
+        time.sleep(0.01)
+        cache.guardar('url-3', {'n': 3})
+
+        assert len(cache) == 2
+        assert cache.obtener('url-2') is None
+        assert cache.obtener('url-1') == {'n': 1}
+        print("✓ Se descartó la respuesta menos usada")
+
+        cache.ttl = 0
+        assert cache.obtener('url-3') is None
+        print("✓ Respuesta vencida no se sirve")
+        cache.cerrar()
+
+
+def recorrer(cache, omitir_cache=False, con_lote=False):
+    listado = ListadoSimulado()
+
+    scraper = ScraperListado(modo='http', concurrencia=1, omitir_cache=omitir_cache)
+    scraper.cache_respuestas = cache
+    scraper._recorrer_paginas(
+        listado.obtener_pagina, obtener_lote=listado.obtener_lote if con_lote else None
+    )
+    return scraper, listado.pedidas
+
+
+def test_scraper_con_cache():
+    """Prueba que una segunda corrida de la misma consulta no vuelva a pedir páginas"""
+    print("\nTEST: Listado servido desde caché")
+    print("-" * 50)
+
+    esperados = [pagina * 100 + i for pagina in range(1, 5) for i in range(2)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheRespuestas(Path(directorio) / 'respuestas.sqlite', ttl=60)
+
+        scraper, pedidas = recorrer(cache)
+        assert pedidas == [1, 2, 3, 4]
+        assert scraper.estadisticas.cache_listado_fallos == 4
+
+        scraper, pedidas = recorrer(cache)
+        assert pedidas == []
+        assert scraper.estadisticas.cache_listado_aciertos == 4
+        assert [c['id'] for c in scraper.compras] == esperados
+        print("✓ Segunda corrida sin solicitudes al sitio")
+
+        # La caché de detalles tiene sus propios contadores
+        assert (scraper.estadisticas.cache_aciertos, scraper.estadisticas.cache_fallos) == (0, 0)
+        print("✓ Aciertos del listado contados aparte de los de detalles")
+
+        scraper, pedidas = recorrer(cache, omitir_cache=True)
+        assert pedidas == [1, 2, 3, 4]
+        assert scraper.estadisticas.cache_listado_aciertos == 0
+        print("✓ omitir_cache vuelve a pedir todas las páginas")
+
+        cache.limpiar()
+        recorrer(cache, con_lote=True)
+        scraper, pedidas = recorrer(cache, con_lote=True)
+        assert pedidas == []
+        assert [c['id'] for c in scraper.compras] == esperados
+        print("✓ Páginas en lote también se sirven desde caché")
+
+        # Al terminar la corrida se cierra la conexión de la caché
+        scraper.checkpoint = GestorCheckpoint('listado', 'test_cache_respuestas', directorio=Path(directorio))
+        scraper._finalizar_corrida()
+        assert scraper.cache_respuestas is None
+        try:
+            len(cache)
+            assert False, "La conexión de la caché sigue abierta"
+        except sqlite3.ProgrammingError:
+            pass
+        print("✓ _finalizar_corrida cierra la caché de respuestas")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Caché de respuestas")
+    print("=" * 50)
+
+    try:
+        test_vigencia_y_tamano()
+        test_scraper_con_cache()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Caché de respuestas válida")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Test de checkpoints y reanudación
+Valida: lectura/escritura JSONL, clave por parámetros reanudación del listado y clave de detalles por compras
+"""
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.list_scraper import ScraperListado
+from src.scraper import detail_scraper
+from src.scraper.detail_scraper import ScraperDetalles
+from src.scraper.utilidades.checkpoint import GestorCheckpoint
+from scripts.listado_simulado import ListadoSimulado, crear_payload
+
+
+def test_archivo_checkpoint():
+    """Prueba escritura, lectura y tolerancia a una línea truncada"""
+    print("TEST: Archivo de checkpoint")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        checkpoint = GestorCheckpoint('detalles', 'date_from=2025-10-20', Path(directorio))
+        otro = GestorCheckpoint('detalles', 'date_from=2025-10-21', Path(directorio))
+        assert checkpoint.ruta != otro.ruta
+
+        checkpoint.guardar('1234-5-COT25', {'ficha': {'id': 1}})
+        with open(checkpoint.ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write('{"id": "cortado", "dat')
+
+        registros = checkpoint.cargar()
+        assert registros == {'1234-5-COT25': {'ficha': {'id': 1}}}
+
+        checkpoint.eliminar()
+        assert not checkpoint.existe()
+
+    print("✓ Registros recuperados y línea truncada ignorada")
+
+
+def test_reanudar_listado():
+    """Prueba que al reanudar solo se pidan las páginas faltantes"""
+    print("\nTEST: Reanudación del listado")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        checkpoint = GestorCheckpoint('listado', 'prueba', Path(directorio))
+
+        # Corrida anterior cortada tras la página 2
+        for pagina in (1, 2):
+            datos = crear_payload(pagina)['payload']
+            registro = {'resultados': datos['resultados']}
+            if pagina == 1:
+                registro['metadata'] = {
+                    clave: datos[clave] for clave in ('resultCount', 'pageCount', 'page', 'pageSize')
+                }
+            checkpoint.guardar(pagina, registro)
+
+        listado = ListadoSimulado()
+        pedidas = listado.pedidas
+
+        scraper = ScraperListado(modo='http', concurrencia=1)
+        scraper.checkpoint = checkpoint
+        scraper.reanudar = True
+        scraper._recorrer_paginas(listado.obtener_pagina)
+
+        ids = [compra['id'] for compra in scraper.compras]
+        assert pedidas == [3, 4]
+        assert ids == [pagina * 100 + i for pagina in range(1, 5) for i in range(2)]
+        assert set(checkpoint.cargar()) == {1, 2, 3, 4}
+
+    print(f"✓ Solo se pidieron las páginas {pedidas}, {len(ids)} compras en orden")
+
+
+def test_checkpoint_detalles_por_compras():
+    """Prueba que el checkpoint de detalles dependa de las compras de entrada"""
+    print("\nTEST: Checkpoint de detalles por compras")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        pedidos = []
+
+        def recorrer(codigos, reanudar):
+            scraper = ScraperDetalles(usar_cache=False, base_datos=False)
+
+            def scrapear_detalle_individual(page, codigo):
+                pedidos.append(codigo)
+                return {'ficha': {'codigo': codigo}, 'historial': []}
+
+            scraper.scrapear_detalle_individual = scrapear_detalle_individual
+            compras = [{'codigo': codigo} for codigo in codigos]
+            return scraper.scrapear_multiples_detalles(None, compras, reanudar=reanudar)
+
+        original = detail_scraper.GestorCheckpoint
+        detail_scraper.GestorCheckpoint = partial(GestorCheckpoint, directorio=Path(directorio))
+        try:
+            recorrer(['A', 'B'], reanudar=False)
+
+            # Otras compras no reutilizan lo capturado para A y B
+            del pedidos[:]
+            recorrer(['C', 'D'], reanudar=True)
+            assert pedidos == ['C', 'D']
+
+            # Las mismas compras se reanudan sin volver a pedir nada
+            del pedidos[:]
+            resultado = recorrer(['A', 'B'], reanudar=True)
+            assert pedidos == []
+            assert [compra['detalle']['ficha']['codigo'] for compra in resultado] == ['A', 'B']
+        finally:
+            detail_scraper.GestorCheckpoint = original
+
+    print("✓ Checkpoint distinto para otras compras, reanudación de las mismas")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Checkpoints")
+    print("=" * 50)
+
+    try:
+        test_archivo_checkpoint()
+        test_reanudar_listado()
+        test_checkpoint_detalles_por_compras()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Checkpoints válidos")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Test de corrimiento de páginas durante el recorrido
+Valida: duplicados por publicaciones nuevas, saltos por publicaciones retiradas,
+conteos en el resumen y páginas corregidas entregadas en flujo
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.utilidades.checkpoint import GestorCheckpoint
+
+
+TAMANO_PAGINA = 5
+
+
+class ListadoVivo:
+    """Listado ordenado por más recientes que cambia mientras se recorre"""
+
+    def __init__(self, total, cambios):
+        # ids más altos = más recientes
+        self.ids = list(range(total, 0, -1))
+        self.cambios = cambios
+        self.pedidas = []
+
+    def obtener_pagina(self, numero):
+        self.pedidas.append(numero)
+
+        # Cambios programados antes de servir la página indicada
+        cambio = self.cambios.pop(numero, None)
+        if cambio:
+            cambio(self.ids)
+
+        inicio = (numero - 1) * TAMANO_PAGINA
+        return {
+            "success": "OK",
+            "payload": {
+                "resultados": [{"id": i} for i in self.ids[inicio:inicio + TAMANO_PAGINA]],
+                "resultCount": len(self.ids),
+                "pageCount": -(-len(self.ids) // TAMANO_PAGINA),
+                "page": numero,
+                "pageSize": TAMANO_PAGINA
+            }
+        }
+
+
+def recorrer(listado):
+    scraper = ScraperListado(modo='http', concurrencia=1)
+    scraper._recorrer_paginas(listado.obtener_pagina)
+    return scraper
+
+
+def test_publicaciones_nuevas():
+    """Prueba que las compras empujadas de página no se repitan y las nuevas se recojan"""
+    print("TEST: Publicaciones nuevas durante el recorrido")
+    print("-" * 50)
+
+    def publicar(ids):
+        ids[0:0] = [22, 21]
+
+    # Antes de la página 3 se publican dos compras nuevas
+    listado = ListadoVivo(20, {3: publicar})
+    scraper = recorrer(listado)
+
+    ids = [compra['id'] for compra in scraper.compras]
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == list(range(1, 23))
+    assert ids[:2] == [22, 21]
+
+    # Páginas 1-2 de nuevo (nuevas al inicio) y la 5, donde cayeron las más antiguas
+    assert listado.pedidas == [1, 2, 3, 4, 1, 2, 5]
+
+    resumen = scraper.estadisticas.obtener_resumen()
+    assert resumen['deriva_duplicados'] == 2
+    assert resumen['deriva_recuperadas'] == 4
+    print(f"✓ {resumen['deriva_duplicados']} repetidas descartadas, "
+          f"{resumen['deriva_recuperadas']} compras recuperadas")
+
+
+def test_publicaciones_retiradas():
+    """Prueba que las compras que suben de página no se salten"""
+    print("\nTEST: Publicaciones retiradas durante el recorrido")
+    print("-" * 50)
+
+    def retirar(ids):
+        ids.remove(20)
+        ids.remove(19)
+
+    # Antes de la página 3 se retiran dos compras de la página 1
+    listado = ListadoVivo(20, {3: retirar})
+    scraper = recorrer(listado)
+
+    ids = [compra['id'] for compra in scraper.compras]
+    assert len(ids) == len(set(ids))
+    # Todas las que siguen publicadas están, aunque 19 y 20 ya se vieron antes
+    assert set(range(1, 19)) <= set(ids)
+
+    resumen = scraper.estadisticas.obtener_resumen()
+    assert resumen['deriva_huecos'] == 1
+    assert resumen['deriva_recuperadas'] == 2
+    assert 2 in listado.pedidas[4:]
+    print(f"✓ Página borde vuelta a pedir, {resumen['deriva_recuperadas']} compras recuperadas")
+
+
+def test_listado_estable():
+    """Prueba que sin cambios no se repita ninguna página"""
+    print("\nTEST: Listado estable")
+    print("-" * 50)
+
+    listado = ListadoVivo(20, {})
+    scraper = recorrer(listado)
+
+    assert listado.pedidas == [1, 2, 3, 4]
+    assert scraper.estadisticas.deriva_duplicados == 0
+    print("✓ Sin páginas repetidas")
+
+
+def test_correccion_en_flujo():
+    """Prueba que las páginas corregidas lleguen al flujo como compras adicionales"""
+    print("\nTEST: Corrección de corrimiento en flujo")
+    print("-" * 50)
+
+    def publicar(ids):
+        ids[0:0] = [22, 21]
+
+    listado = ListadoVivo(20, {3: publicar})
+    scraper = ScraperListado(modo='http', concurrencia=1)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        def preparar(reanudar=False, guardar=False):
+            scraper.checkpoint = GestorCheckpoint('listado', 'deriva', Path(directorio))
+
+        scraper._preparar_corrida = preparar
+        scraper.scrapear_todas_las_paginas = lambda: scraper._recorrer_paginas(listado.obtener_pagina)
+
+        entregas = list(scraper.iterar_paginas(tamano_buffer=2))
+
+    # La página 1 llega otra vez, solo con las publicaciones nuevas
+    assert [numero for numero, _ in entregas] == [1, 2, 3, 4, 1, 5]
+    assert [compra['id'] for compra in entregas[4][1]] == [22, 21]
+    entregadas = [compra['id'] for _, compras in entregas for compra in compras]
+    assert len(entregadas) == len(set(entregadas))
+
+    # Acumulando por página (como inicio_scraper) no se pierde ninguna
+    por_pagina = {}
+    for numero, compras in entregas:
+        por_pagina.setdefault(numero, []).extend(compras)
+    acumuladas = [compra['id'] for numero in sorted(por_pagina) for compra in por_pagina[numero]]
+    assert sorted(acumuladas) == sorted(compra['id'] for compra in scraper.compras) == list(range(1, 23))
+    print(f"✓ {len(entregas)} entregas, {len(acumuladas)} compras sin repetir ni perder")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Corrimiento de páginas")
+    print("=" * 50)
+
+    try:
+        test_publicaciones_nuevas()
+        test_publicaciones_retiradas()
+        test_listado_estable()
+        test_correccion_en_flujo()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Corrimiento de páginas válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Test de enrutador de recursos del navegador
+Valida: bloqueo por tipo y por host, entrega de respuestas de la API y estadísticas
+"""
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.enrutador import EnrutadorRecursos
+from src.scraper.utilidades.stats import EstadisticasScraper
+from src.scraper.utilidades.logger import configurar_logger
+
+
+class MockRequest:
+    """Mock de request de Playwright"""
+
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class MockRoute:
+    """Mock de route de Playwright que registra la acción tomada"""
+
+    def __init__(self, url, resource_type):
+        self.request = MockRequest(url, resource_type)
+        self.accion = None
+
+    def abort(self):
+        self.accion = 'abort'
+
+    def continue_(self):
+        self.accion = 'continue'
+
+    def fetch(self):
+        return self.request
+
+    def fulfill(self, response=None):
+        self.accion = 'fulfill'
+
+
+def crear_enrutador(capturadas):
+    logger = configurar_logger('test_enrutador')
+    estadisticas = EstadisticasScraper()
+    return EnrutadorRecursos(logger, estadisticas, capturadas.append), estadisticas
+
+
+def test_bloqueo():
+    """Prueba que imágenes y hosts de terceros se aborten"""
+    print("TEST: Bloqueo de recursos")
+    print("-" * 50)
+
+    enrutador, estadisticas = crear_enrutador([])
+
+    imagen = MockRoute("https://buscador.mercadopublico.cl/logo.png", "image")
+    analitica = MockRoute("https://www.googletagmanager.com/gtag/js", "script")
+    script_propio = MockRoute("https://buscador.mercadopublico.cl/main.js", "script")
+
+    for route in (imagen, analitica, script_propio):
+        enrutador.enrutar(route)
+
+    assert imagen.accion == 'abort'
+    assert analitica.accion == 'abort'
+    assert script_propio.accion == 'continue'
+    assert estadisticas.solicitudes_bloqueadas == 2
+    assert estadisticas.solicitudes_permitidas == 1
+    assert estadisticas.bytes_bloqueados_estimados > 0
+    print("✓ Imagen y tercero bloqueados, script propio permitido")
+
+
+def test_respuesta_api():
+    """Prueba que las respuestas de la API lleguen al callback"""
+    print("\nTEST: Entrega de respuestas de la API")
+    print("-" * 50)
+
+    capturadas = []
+    enrutador, _ = crear_enrutador(capturadas)
+
+    route = MockRoute(
+        "https://api.buscador.mercadopublico.cl/compra-agil?page_number=1", "fetch"
+    )
+    enrutador.enrutar(route)
+
+    assert route.accion == 'fulfill'
+    assert len(capturadas) == 1
+    print("✓ Respuesta de API entregada a Python")
+
+
+def test_error_al_enrutar():
+    """Prueba que un error al enrutar no deje la solicitud sin respuesta"""
+    print("\nTEST: Error al enrutar")
+    print("-" * 50)
+
+    enrutador, _ = crear_enrutador([])
+
+    route = MockRoute(
+        "https://api.buscador.mercadopublico.cl/compra-agil?page_number=1", "fetch"
+    )
+
+    def fetch_con_error():
+        raise RuntimeError("conexión cerrada")
+
+    route.fetch = fetch_con_error
+    enrutador.enrutar(route)
+
+    assert route.accion == 'continue'
+    print("✓ La solicitud continúa sin pasar por el callback")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Enrutador de recursos")
+    print("=" * 50)
+
+    try:
+        test_bloqueo()
+        test_respuesta_api()
+        test_error_al_enrutar()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Enrutador válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
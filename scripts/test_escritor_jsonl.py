@@ -0,0 +1,133 @@
+"""
+Test de la salida JSON Lines
+Valida: escritura en segundo plano, lectura de ambos formatos con cargar_json,
+línea truncada por un corte y listado guardado página a página
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.utilidades.escritor_jsonl import EscritorJSONL
+from src.scraper.utilidades.helpers import cargar_json
+from src.scraper.list_scraper import ScraperListado
+from scripts.listado_simulado import crear_payload
+
+
+def crear_compra(pagina, i):
+    return {'nombre': 'Compra ñandú'}
+
+
+def test_escritor():
+    """Prueba escritura, sincronización y errores del hilo escritor"""
+    print("TEST: Escritor JSONL")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'compras.jsonl'
+
+        with EscritorJSONL(ruta) as escritor:
+            escritor.escribir([{'id': 1}, {'id': 2}], sincronizar=True)
+            escritor.escribir([])
+            escritor.escribir([{'id': 3}])
+
+        assert escritor.total_escritas == 3
+        assert ruta.read_text(encoding='utf-8').count('\n') == 3
+        assert cargar_json(ruta) == [{'id': 1}, {'id': 2}, {'id': 3}]
+        print("✓ Compras escritas en orden, una por línea")
+
+        # Un corte deja la última línea a medias: se ignora
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write('{"id": 4, "nom')
+        assert cargar_json(ruta) == [{'id': 1}, {'id': 2}, {'id': 3}]
+        print("✓ Línea truncada al final se descarta")
+
+        escritor = EscritorJSONL(Path(directorio) / 'error.jsonl')
+        escritor.escribir([{'id': object()}])
+        try:
+            escritor.cerrar()
+            assert False, "No se informó el error de escritura"
+        except Exception as e:
+            assert 'ERROR al escribir' in str(e)
+        print("✓ Error del hilo escritor se informa al cerrar")
+
+
+def test_cargar_ambos_formatos():
+    """Prueba que cargar_json lea JSON y JSONL indistintamente"""
+    print("\nTEST: cargar_json con ambos formatos")
+    print("-" * 50)
+
+    compras = [{'id': 1, 'nombre': 'Ñuble'}, {'id': 2}]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_json = Path(directorio) / 'compras.json'
+        ruta_json.write_text(json.dumps(compras, indent=2), encoding='utf-8')
+
+        ruta_jsonl = Path(directorio) / 'compras.jsonl'
+        ruta_jsonl.write_text(''.join(json.dumps(c) + '\n' for c in compras), encoding='utf-8')
+
+        # JSON Lines guardado con extensión .json
+        ruta_mixta = Path(directorio) / 'lineas.json'
+        ruta_mixta.write_text(ruta_jsonl.read_text(encoding='utf-8'), encoding='utf-8')
+
+        assert cargar_json(ruta_json) == cargar_json(ruta_jsonl) == cargar_json(ruta_mixta) == compras
+        print("✓ Mismo resultado para .json, .jsonl y JSONL con extensión .json")
+
+
+def test_listado_en_jsonl():
+    """Prueba que el listado escriba cada página al llegar"""
+    print("\nTEST: Listado guardado página a página")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'compras_completas.jsonl'
+        escritas_al_pedir = []
+
+        scraper = ScraperListado(modo='http', concurrencia=1, snapshot=False, base_datos=False)
+        scraper.escritor = EscritorJSONL(ruta)
+
+        def obtener_pagina(numero):
+            escritas_al_pedir.append(len(scraper._ids_emitidos))
+            return crear_payload(numero, cantidad=3, campos=crear_compra)
+
+        scraper._recorrer_paginas(obtener_pagina)
+
+        # Antes de pedir cada página las anteriores ya iban al escritor
+        assert escritas_al_pedir == [0, 3, 6, 9]
+
+        assert scraper.guardar_resultados() == str(ruta)
+        compras = cargar_json(ruta)
+        assert compras == scraper.compras
+        assert compras[0]['nombre'] == 'Compra ñandú'
+        print(f"✓ {len(compras)} compras en {ruta.name}, iguales a las del scraper")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Salida JSON Lines")
+    print("=" * 50)
+
+    try:
+        test_escritor()
+        test_cargar_ambos_formatos()
+        test_listado_en_jsonl()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Salida JSON Lines válida")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Test del listado en flujo
+Valida: páginas entregadas al llegar, contrapresión del buffer, corte anticipado,
+páginas en vuelo acotadas, versión asíncrona y filtrado de segundo llamado
+como etapa del flujo
+"""
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.filters import FiltradorCompras
+from src.scraper.utilidades.checkpoint import GestorCheckpoint
+from scripts.listado_simulado import ListadoSimulado, crear_payload
+
+
+def crear_compra(pagina, i):
+    return {'estado_convocatoria': 2 if i == 0 else 1}
+
+
+def crear_scraper(directorio, listado=None):
+
+    #Scraper con checkpoint temporal, sin caché y con páginas simuladas
+
+    listado = listado or ListadoSimulado(total_paginas=8, campos=crear_compra)
+    scraper = ScraperListado(modo='http', concurrencia=1)
+
+    def preparar(reanudar=False, guardar=False):
+        scraper.checkpoint = GestorCheckpoint('listado', 'flujo', Path(directorio))
+
+    scraper._preparar_corrida = preparar
+    scraper.scrapear_todas_las_paginas = lambda: scraper._recorrer_paginas(listado.obtener_pagina)
+    return scraper
+
+
+def test_contrapresion():
+    """Prueba que el recorrido no se adelante más que el buffer"""
+    print("TEST: Contrapresión del buffer")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        listado = ListadoSimulado(total_paginas=8, campos=crear_compra)
+        pedidas = listado.pedidas
+        scraper = crear_scraper(directorio, listado)
+        paginas = scraper.iterar_paginas(tamano_buffer=2)
+
+        numero, compras = next(paginas)
+        assert numero == 1 and len(compras) == 2
+
+        # Consumidor lento: el productor se detiene con el buffer lleno
+        time.sleep(0.3)
+        assert len(pedidas) <= 1 + 2 + 1, pedidas
+        print(f"✓ Con el consumidor detenido solo se pidieron {len(pedidas)} páginas")
+
+        resto = list(paginas)
+        assert [numero for numero, _ in resto] == list(range(2, 9))
+        assert len(scraper.compras) == 16
+        assert scraper.reporte_completitud['completitud'] == 100.0
+        print("✓ Todas las páginas entregadas en orden y completitud reportada")
+
+
+def test_corte_anticipado():
+    """Prueba que dejar de leer detenga el recorrido"""
+    print("\nTEST: Corte anticipado")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        listado = ListadoSimulado(total_paginas=8, campos=crear_compra)
+        pedidas = listado.pedidas
+        scraper = crear_scraper(directorio, listado)
+        paginas = scraper.iterar_paginas(tamano_buffer=1)
+
+        next(paginas)
+        paginas.close()
+
+        assert len(pedidas) < 8
+        print(f"✓ Recorrido detenido tras {len(pedidas)} páginas")
+
+
+def test_flujo_asincrono_y_filtro():
+    """Prueba la versión asíncrona y el filtro como etapa del flujo"""
+    print("\nTEST: Flujo asíncrono y filtrado")
+    print("-" * 50)
+
+    async def consumir(scraper):
+        return [elemento async for elemento in scraper.aiterar_paginas(tamano_buffer=2)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        scraper = crear_scraper(directorio)
+        paginas = asyncio.run(consumir(scraper))
+        assert [numero for numero, _ in paginas] == list(range(1, 9))
+        print("✓ Páginas recibidas con async for")
+
+        scraper = crear_scraper(directorio)
+        filtrador = FiltradorCompras()
+        filtradas = list(filtrador.filtrar_en_flujo(scraper.iterar_paginas()))
+
+        assert [len(compras) for _, compras in filtradas] == [1] * 8
+        assert filtrador.total_procesadas == 16
+        assert filtrador.total_segundo_llamado == 8
+        assert filtradas[0][1][0]['metadata_filtrado']['es_segundo_llamado']
+        print("✓ Segundo llamado detectado página a página")
+
+
+def test_paginas_en_vuelo():
+    """Prueba que con concurrencia > 1 solo haya concurrencia páginas pedidas a la vez"""
+    print("\nTEST: Páginas en vuelo con concurrencia")
+    print("-" * 50)
+
+    concurrencia = 3
+    lock = threading.Lock()
+    en_curso = []
+    maximo = [0]
+    pedidas = []
+
+    def obtener_pagina(numero):
+        with lock:
+            pedidas.append(numero)
+            en_curso.append(numero)
+            maximo[0] = max(maximo[0], len(en_curso))
+        time.sleep(0.01)
+        with lock:
+            en_curso.remove(numero)
+        return crear_payload(numero, total_paginas=40)
+
+    scraper = ScraperListado(modo='http', concurrencia=concurrencia)
+    paginas = scraper._obtener_paginas(obtener_pagina, range(1, 41))
+
+    numero, _ = next(paginas)
+    time.sleep(0.2)
+    assert numero == 1
+    assert len(pedidas) <= concurrencia + 1, pedidas
+    print(f"✓ Con el consumidor detenido solo se pidieron {len(pedidas)} de 40 páginas")
+
+    assert [numero for numero, _ in paginas] == list(range(2, 41))
+    assert maximo[0] <= concurrencia
+    print(f"✓ Resto entregado en orden, máximo {maximo[0]} páginas a la vez")
+
+    del pedidas[:]
+    paginas = scraper._obtener_paginas(obtener_pagina, range(1, 41))
+    next(paginas)
+    paginas.close()
+    time.sleep(0.1)
+    assert len(pedidas) <= concurrencia + 1, pedidas
+    print("✓ Al cortar el recorrido no quedan páginas encoladas")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Listado en flujo")
+    print("=" * 50)
+
+    try:
+        test_contrapresion()
+        test_corte_anticipado()
+        test_paginas_en_vuelo()
+        test_flujo_asincrono_y_filtro()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Listado en flujo válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Test del histórico particionado
+Valida: fusión sin duplicados (gana el archivo más reciente), compactación
+incremental, compras que cambian de mes y lectura solo de las particiones del rango
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.storage import historico
+from src.storage.historico import compactar_historico, cargar_historico, particiones
+from src.filters.fecha import filtrar_por_fecha
+
+
+def crear_compra(i, fecha, nombre=None):
+    return {
+        'id': i, 'codigo': f"1000-{i}-COT25", 'nombre': nombre or f"Compra {i}",
+        'monto_disponible_CLP': 100000 * i, 'fecha_publicacion': fecha,
+        'productos': [{'nombre': 'martillo'}]
+    }
+
+
+def escribir(directorio, nombre, datos, antiguedad):
+    ruta = directorio / nombre
+    if ruta.suffix == '.jsonl':
+        ruta.write_text(''.join(json.dumps(d) + '\n' for d in datos), encoding='utf-8')
+    else:
+        ruta.write_text(json.dumps(datos), encoding='utf-8')
+    momento = time.time() - antiguedad
+    os.utime(ruta, (momento, momento))
+    return ruta
+
+
+def preparar_raw(raw):
+    completas = [
+        crear_compra(1, '2026-09-28 10:00:00'),
+        crear_compra(2, '2026-09-30 10:00:00'),
+        crear_compra(3, '2026-10-02 10:00:00'),
+        crear_compra(4, '2026-10-15 10:00:00'),
+        crear_compra(5, '2026-10-31 23:00:00'),
+        crear_compra(6, None)
+    ]
+    escribir(raw, 'compras_completas_20261001.json', completas, antiguedad=300)
+    # Archivo posterior con versiones nuevas de compras ya listadas
+    escribir(raw, 'compras_segundo_llamado_20261002.jsonl',
+             [crear_compra(3, '2026-10-02 10:00:00', 'Compra 3 (segundo llamado)'), crear_compra(7, '2026-10-20 08:00:00')],
+             antiguedad=200)
+    escribir(raw, 'resumen.json', {'total': 7}, antiguedad=100)
+
+
+def test_compactacion():
+    """Prueba la fusión de archivos con compras repetidas"""
+    print("TEST: Compactación de data/raw")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        raw, destino = Path(directorio) / 'raw', Path(directorio) / 'historico'
+        raw.mkdir()
+        preparar_raw(raw)
+
+        resumen = compactar_historico(raw, destino)
+        assert resumen['archivos'] == 2 and resumen['omitidos'] == ['resumen.json']
+        assert resumen['compras'] == 7
+        assert particiones(destino) == ['2026-09', '2026-10', 'sin_fecha']
+        print(f"✓ {resumen['compras']} compras únicas en {len(resumen['particiones'])} particiones")
+
+        df = cargar_historico(directorio=destino)
+        assert sorted(df['id']) == [1, 2, 3, 4, 5, 6, 7]
+        assert df.loc[df['id'] == 3, 'nombre'].item() == 'Compra 3 (segundo llamado)'
+        assert pd.api.types.is_datetime64_any_dtype(df['fecha_publicacion'])
+        print("✓ Sin duplicados, con la versión del archivo más reciente")
+
+
+def test_incremental():
+    """Prueba que solo se lean archivos nuevos y se reescriban sus particiones"""
+    print("\nTEST: Compactación incremental")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        raw, destino = Path(directorio) / 'raw', Path(directorio) / 'historico'
+        raw.mkdir()
+        preparar_raw(raw)
+        compactar_historico(raw, destino)
+
+        resumen = compactar_historico(raw, destino)
+        assert resumen['archivos'] == 0 and resumen['particiones'] == []
+        print("✓ Sin archivos nuevos no se reescribe nada")
+
+        octubre = historico._ruta_particion(destino, '2026-10')
+        modificado = octubre.stat().st_mtime_ns
+
+        # La compra 1 se republica en noviembre: sale de septiembre
+        escribir(raw, 'compras_completas_20261101.json',
+                 [crear_compra(1, '2026-11-03 09:00:00', 'Compra 1 (republicada)')], antiguedad=0)
+        resumen = compactar_historico(raw, destino)
+        assert resumen['archivos'] == 1
+        assert resumen['particiones'] == ['2026-09', '2026-11']
+        assert octubre.stat().st_mtime_ns == modificado
+
+        df = cargar_historico(directorio=destino)
+        assert sorted(df['id']) == [1, 2, 3, 4, 5, 6, 7]
+        assert cargar_historico('2026-09-01', '2026-09-30', directorio=destino)['id'].tolist() == [2]
+        assert cargar_historico('2026-11-01', directorio=destino)['nombre'].tolist() == ['Compra 1 (republicada)']
+        print("✓ Solo se reescriben las particiones afectadas, sin versiones antiguas")
+
+
+def test_poda_de_particiones():
+    """Prueba que un rango de fechas lea solo sus meses y dé lo mismo que filtrar_por_fecha"""
+    print("\nTEST: Lectura por rango")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        raw, destino = Path(directorio) / 'raw', Path(directorio) / 'historico'
+        raw.mkdir()
+        preparar_raw(raw)
+        compactar_historico(raw, destino)
+
+        leidas = []
+        leer_original = historico._leer_particion
+
+        def leer_registrando(directorio_historico, particion, columnas=None):
+            leidas.append(particion)
+            return leer_original(directorio_historico, particion, columnas)
+
+        historico._leer_particion = leer_registrando
+        try:
+            df = cargar_historico('2026-10-02', '2026-10-20', columnas=['codigo', 'nombre'], directorio=destino)
+        finally:
+            historico._leer_particion = leer_original
+
+        assert leidas == ['2026-10']
+        assert list(df.columns) == ['codigo', 'nombre']
+        print(f"✓ Particiones leídas: {leidas}")
+
+        completo = cargar_historico(directorio=destino)
+        esperado = filtrar_por_fecha(completo, '2026-10-02', '2026-10-20')
+        assert sorted(df['codigo']) == sorted(esperado['codigo'])
+        assert sorted(df['codigo']) == ['1000-3-COT25', '1000-4-COT25', '1000-7-COT25']
+        print("✓ Mismo resultado que filtrar_por_fecha sobre todo el histórico")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Histórico particionado")
+    print("=" * 50)
+
+    try:
+        test_compactacion()
+        test_incremental()
+        test_poda_de_particiones()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Histórico válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
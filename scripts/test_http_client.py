@@ -0,0 +1,235 @@
+"""
+Test de cliente HTTP directo
+Valida: refresco de sesión, URL de API y flujo del listado en modos http y lote
+"""
+import sys
+import time
+import random
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.http_client import ClienteAPI
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.detail_scraper import ScraperDetalles
+from src.scraper.api_handler import ManejadorAPI
+from src.scraper.url_builder import construir_url_api_listado, construir_url_api_ficha
+from src.scraper.utilidades.logger import configurar_logger
+from config.config import URL_BASE_API
+from scripts.listado_simulado import crear_payload
+
+
+class MockRespuestaHTTP:
+    """Mock de respuesta de requests"""
+
+    def __init__(self, status_code, json_data=None):
+        self.status_code = status_code
+        self._json_data = json_data
+
+    def json(self):
+        return self._json_data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+
+class MockSesion:
+    """Mock de requests.Session que responde una secuencia de códigos"""
+
+    def __init__(self, respuestas):
+        self.respuestas = list(respuestas)
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        return self.respuestas.pop(0)
+
+
+def test_url_api():
+    """Prueba que la URL de API use los mismos parámetros del listado"""
+    print("TEST: URL de API")
+    print("-" * 50)
+
+    url = construir_url_api_listado(4)
+
+    assert url.startswith(URL_BASE_API + "?")
+    assert "page_number=4" in url
+    assert "date_from=" in url
+    print(f"✓ URL construida: {url}")
+
+
+def test_refresco_sesion():
+    """Prueba que un 401 provoque un refresco de cookies y un reintento"""
+    print("\nTEST: Refresco de sesión")
+    print("-" * 50)
+
+    logger = configurar_logger('test_http_client')
+    cliente = ClienteAPI(logger)
+    cliente.expira_en = time.time() + 60
+
+    refrescos = []
+
+    def refrescar_mock():
+        refrescos.append(True)
+        cliente.expira_en = time.time() + 120
+
+    cliente.inicializar_sesion = refrescar_mock
+    cliente.sesion = MockSesion([
+        MockRespuestaHTTP(401),
+        MockRespuestaHTTP(200, crear_payload(1, cantidad=15, total_paginas=3))
+    ])
+
+    datos = cliente.obtener_listado(1)
+
+    assert len(refrescos) == 1
+    assert len(cliente.sesion.urls) == 2
+    assert datos['payload']['page'] == 1
+    print("✓ Sesión refrescada tras HTTP 401")
+
+
+def test_listado_modo_http():
+    """Prueba el recorrido completo del listado con un cliente mock"""
+    print("\nTEST: Listado en modo http")
+    print("-" * 50)
+
+    class ClienteMock:
+        def obtener_listado(self, numero_pagina, parametros=None):
+            return crear_payload(numero_pagina, cantidad=15, total_paginas=3)
+
+    scraper = ScraperListado(max_paginas=2, modo='http')
+    manejador = ManejadorAPI(scraper.logger)
+    cliente = ClienteMock()
+
+    datos = scraper.scrapear_pagina_http(cliente, manejador, 1)
+
+    assert datos is not None
+    assert manejador.extraer_metadata_paginacion()['pageCount'] == 3
+    assert scraper.estadisticas.paginas_procesadas == 1
+    assert scraper.estadisticas.items_scrapeados == 15
+    print("✓ Página obtenida y contabilizada")
+
+
+def test_concurrencia_orden():
+    """Prueba que las páginas concurrentes se reensamblen en orden"""
+    print("\nTEST: Concurrencia y orden de páginas")
+    print("-" * 50)
+
+    def obtener_pagina(numero):
+        time.sleep(random.uniform(0, 0.05))
+        return crear_payload(numero, cantidad=2, total_paginas=8)
+
+    scraper = ScraperListado(modo='http', concurrencia=4)
+    scraper._recorrer_paginas(obtener_pagina)
+
+    ids = [compra['id'] for compra in scraper.compras]
+    esperados = [pagina * 100 + i for pagina in range(1, 9) for i in range(2)]
+
+    assert ids == esperados
+    print(f"✓ {len(ids)} compras reensambladas en orden de página")
+
+
+def test_lotes_en_pagina():
+    """Prueba que el modo lote pida las páginas por tramos y las registre en orden"""
+    print("\nTEST: Fetch en lote por tramos")
+    print("-" * 50)
+
+    tramos = []
+
+    def obtener_lote(paginas):
+        tramos.append(list(paginas))
+        return {numero: crear_payload(numero, cantidad=2, total_paginas=7) for numero in paginas}
+
+    scraper = ScraperListado(modo='lote')
+    scraper._recorrer_paginas(
+        lambda numero: crear_payload(numero, cantidad=2, total_paginas=7),
+        obtener_lote=obtener_lote,
+        tamano_lote=4
+    )
+
+    ids = [compra['id'] for compra in scraper.compras]
+    esperados = [pagina * 100 + i for pagina in range(1, 8) for i in range(2)]
+
+    assert tramos == [[2, 3, 4, 5], [6, 7]]
+    assert ids == esperados
+    print(f"✓ {len(tramos)} tramos, {len(ids)} compras en orden")
+
+
+def test_detalles_concurrentes():
+    """Prueba ficha + historial en paralelo, reintento y orden de entrada"""
+    print("\nTEST: Detalles concurrentes por API")
+    print("-" * 50)
+
+    assert construir_url_api_ficha('123-4-COT25').startswith(URL_BASE_API + "?action=ficha")
+
+    class ClienteMock:
+        def __init__(self):
+            self.en_vuelo = 0
+            self.maximo_en_vuelo = 0
+            self.fallos = {'5'}
+            self._lock = threading.Lock()
+
+        def obtener_ficha(self, codigo):
+            with self._lock:
+                self.en_vuelo += 1
+                self.maximo_en_vuelo = max(self.maximo_en_vuelo, self.en_vuelo)
+            time.sleep(random.uniform(0.01, 0.05))
+            with self._lock:
+                self.en_vuelo -= 1
+                # El código 5 falla solo la primera vez
+                if codigo in self.fallos:
+                    self.fallos.discard(codigo)
+                    raise Exception("HTTP 503")
+            return {'payload': {'codigo': codigo}}
+
+        def obtener_historial(self, codigo):
+            if codigo == '3':
+                raise Exception("HTTP 500")
+            return {'payload': [{'accion': 'publicada'}]}
+
+    compras = [{'codigo': str(i)} for i in range(10)] + [{'id': 'sin-codigo'}]
+    cliente = ClienteMock()
+
+    scraper = ScraperDetalles(usar_cache=False)
+    resultado = scraper.scrapear_multiples_detalles_http(compras, concurrencia=4, cliente=cliente)
+
+    assert [compra.get('codigo') for compra in resultado] == [str(i) for i in range(10)] + [None]
+    assert all(compra['detalle']['ficha']['codigo'] == compra['codigo'] for compra in resultado[:10])
+    assert resultado[3]['detalle']['historial'] == []
+    assert 'detalle' not in resultado[10]
+    assert cliente.maximo_en_vuelo > 1
+    assert scraper.estadisticas.reintentos == 1
+    print(f"✓ {cliente.maximo_en_vuelo} fichas en vuelo, resultados en orden de entrada")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Cliente HTTP")
+    print("=" * 50)
+
+    try:
+        test_url_api()
+        test_refresco_sesion()
+        test_listado_modo_http()
+        test_concurrencia_orden()
+        test_lotes_en_pagina()
+        test_detalles_concurrentes()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Cliente HTTP válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Test de scraping incremental
+Valida: índice de compras conocidas, sondeo de página 1 y corte en página conocida
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.utilidades.indice import IndiceCompras
+
+
+def crear_sitio(codigos, tamano_pagina=3):
+    """Simula el listado ordenado por recientes a partir de una lista de códigos"""
+    paginas_totales = (len(codigos) + tamano_pagina - 1) // tamano_pagina
+    pedidas = []
+
+    def obtener_pagina(numero):
+        pedidas.append(numero)
+        inicio = (numero - 1) * tamano_pagina
+        return {
+            'success': 'OK',
+            'payload': {
+                'resultados': [{'codigo': c} for c in codigos[inicio:inicio + tamano_pagina]],
+                'resultCount': len(codigos),
+                'pageCount': paginas_totales,
+                'page': numero,
+                'pageSize': tamano_pagina
+            }
+        }
+
+    return obtener_pagina, pedidas
+
+
+def ejecutar_incremental(indice, codigos):
+    obtener_pagina, pedidas = crear_sitio(codigos)
+    scraper = ScraperListado(modo='http', incremental=True)
+    scraper.indice = indice
+    scraper._recorrer_paginas(obtener_pagina)
+    return [compra['codigo'] for compra in scraper.compras], pedidas
+
+
+def test_incremental():
+    """Prueba primera corrida completa, delta y sondeo sin cambios"""
+    print("TEST: Scraping incremental")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        indice = IndiceCompras('prueba', Path(directorio))
+        codigos = [f"C{n}" for n in range(12, 0, -1)]
+
+        # Primera corrida: índice vacío, se recorre todo
+        nuevas, pedidas = ejecutar_incremental(indice, codigos)
+        assert len(nuevas) == 12 and pedidas == [1, 2, 3, 4]
+        print("✓ Primera corrida completa (4 páginas)")
+
+        # Llegan 4 compras nuevas: se leen páginas 1-2 y se corta en la 3 (conocida)
+        codigos = [f"C{n}" for n in range(16, 12, -1)] + codigos
+        nuevas, pedidas = ejecutar_incremental(IndiceCompras('prueba', Path(directorio)), codigos)
+        assert nuevas == ['C16', 'C15', 'C14', 'C13']
+        assert pedidas == [1, 2, 3]
+        print(f"✓ Delta de {len(nuevas)} compras con {len(pedidas)} páginas")
+
+        # Sin cambios: solo el sondeo de la página 1
+        nuevas, pedidas = ejecutar_incremental(IndiceCompras('prueba', Path(directorio)), codigos)
+        assert nuevas == [] and pedidas == [1]
+        print("✓ Sin cambios detectado con una sola página")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Incremental")
+    print("=" * 50)
+
+    try:
+        test_incremental()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Incremental válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
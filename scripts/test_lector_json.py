@@ -0,0 +1,241 @@
+"""
+Test de la lectura en flujo de archivos de compras
+Valida: arreglos JSON, JSONL y comprimidos con bloques pequeños, lotes y
+DataFrames, memoria acotada, archivos truncados y filtrado por lotes
+"""
+import bz2
+import gzip
+import json
+import lzma
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.utilidades import lector_json
+from src.scraper.utilidades.lector_json import iterar_compras, iterar_lotes, iterar_dataframes
+from src.scraper.utilidades.helpers import cargar_json
+from src.filters.filter_advanced import FiltradorAvanzado, filtrar_por_lotes
+
+
+def crear_compras(cantidad=10, detalle=True):
+    compras = []
+    for i in range(1, cantidad + 1):
+        compra = {
+            'id': i, 'codigo': f"1000-{i}-COT25", 'nombre': f"Compra de herramientas ñandú {i}",
+            'organismo': 'Hospital Regional' if i % 2 else 'Municipalidad de Talca',
+            'estado_convocatoria': 2, 'monto_disponible_CLP': 100000 * i + 0.5,
+            'fecha_publicacion': f"2026-10-{1 + i % 28:02d} 09:00:00",
+            'fecha_cierre': f"2026-11-{1 + i % 28:02d} 18:00:00",
+            'cantidad_provedores_cotizando': i % 3
+        }
+        if detalle:
+            compra['detalle'] = {'ficha': {'descripcion': 'x' * 200}, 'historial': [{'accion': 'Publicada'}] * 3}
+        compras.append(compra)
+    return compras
+
+
+def escribir(ruta, compras, jsonl=False, indent=None):
+    if jsonl:
+        texto = ''.join(json.dumps(c, ensure_ascii=False) + '\n' for c in compras)
+    else:
+        texto = json.dumps(compras, ensure_ascii=False, indent=indent)
+    abrir = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}.get(ruta.suffix)
+    if abrir:
+        with abrir(ruta, 'wt', encoding='utf-8') as archivo:
+            archivo.write(texto)
+    else:
+        ruta.write_text(texto, encoding='utf-8')
+    return ruta
+
+
+def test_formatos():
+    """Prueba que todos los formatos entreguen las mismas compras, aun con bloques diminutos"""
+    print("TEST: Formatos de archivo")
+    print("-" * 50)
+
+    compras = crear_compras()
+    bloque_original = lector_json.TAMANO_BLOQUE
+
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio = Path(directorio)
+        archivos = [
+            escribir(directorio / 'indentado.json', compras, indent=2),
+            escribir(directorio / 'compacto.json', compras),
+            escribir(directorio / 'lineas.jsonl', compras, jsonl=True),
+            escribir(directorio / 'lineas_con_extension_json.json', compras, jsonl=True),
+            escribir(directorio / 'comprimido.json.gz', compras),
+            escribir(directorio / 'comprimido.jsonl.bz2', compras, jsonl=True),
+            escribir(directorio / 'comprimido.json.xz', compras, indent=2),
+        ]
+
+        # Bloques de 7 caracteres: valores y números cortados entre lecturas
+        for tamano_bloque in (7, bloque_original):
+            lector_json.TAMANO_BLOQUE = tamano_bloque
+            try:
+                for ruta in archivos:
+                    assert list(iterar_compras(ruta)) == compras, ruta.name
+            finally:
+                lector_json.TAMANO_BLOQUE = bloque_original
+        print(f"✓ {len(archivos)} archivos con las mismas compras (bloques de 7 y {bloque_original})")
+
+        for ruta in archivos:
+            assert cargar_json(ruta) == compras, ruta.name
+        print("✓ cargar_json también lee los comprimidos")
+
+        assert list(iterar_compras(escribir(directorio / 'vacio.json', []))) == []
+        print("✓ Arreglo vacío sin compras")
+
+
+def test_lotes_y_dataframes():
+    """Prueba los lotes de tamaño fijo y la proyección de columnas"""
+    print("\nTEST: Lotes y DataFrames")
+    print("-" * 50)
+
+    compras = crear_compras()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = escribir(Path(directorio) / 'compras.json', compras)
+
+        assert [len(lote) for lote in iterar_lotes(ruta, tamano_lote=4)] == [4, 4, 2]
+        print("✓ Lotes de 4, 4 y 2 compras")
+
+        lotes = list(iterar_dataframes(ruta, tamano_lote=4, columnas=['codigo', 'monto_disponible_CLP', 'no_existe']))
+        assert [len(df) for df in lotes] == [4, 4, 2]
+        assert list(lotes[0].columns) == ['codigo', 'monto_disponible_CLP']
+        assert pd.concat(lotes)['codigo'].tolist() == [c['codigo'] for c in compras]
+        print("✓ DataFrames por lote solo con las columnas pedidas")
+
+
+def test_memoria_acotada():
+    """Prueba que recorrer un archivo grande no cargue el archivo completo"""
+    print("\nTEST: Memoria acotada")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = escribir(Path(directorio) / 'grande.json', crear_compras(10000), indent=2)
+        tamano_archivo = ruta.stat().st_size
+
+        tracemalloc.start()
+        try:
+            total = sum(1 for _ in iterar_compras(ruta))
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert total == 10000
+        assert pico < tamano_archivo / 10, (pico, tamano_archivo)
+        print(f"✓ Archivo de {tamano_archivo / 1e6:.1f} MB recorrido con pico de {pico / 1e6:.2f} MB")
+
+
+def test_archivos_truncados():
+    """Prueba los cortes: arreglo sin cerrar falla, última línea JSONL se ignora"""
+    print("\nTEST: Archivos truncados")
+    print("-" * 50)
+
+    compras = crear_compras(3)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio = Path(directorio)
+
+        ruta = directorio / 'cortado.json'
+        ruta.write_text(json.dumps(compras)[:-40], encoding='utf-8')
+        try:
+            list(iterar_compras(ruta))
+            assert False, "No se detectó el arreglo truncado"
+        except Exception as e:
+            assert 'JSON inválido' in str(e)
+        print("✓ Arreglo truncado informa JSON inválido")
+
+        # Un elemento inválido no hace leer el resto del archivo buscando su cierre
+        ruta = directorio / 'malformado.json'
+        ruta.write_text('[{"id": 1}, {"id": tr, "x": 1}, ' + json.dumps(crear_compras(200))[1:], encoding='utf-8')
+        maximo_original = lector_json.TAMANO_MAXIMO_ELEMENTO
+        lector_json.TAMANO_MAXIMO_ELEMENTO = 1000
+        try:
+            list(iterar_compras(ruta))
+            assert False, "No se detectó el elemento inválido"
+        except Exception as e:
+            assert 'JSON inválido' in str(e) and 'sin cerrar' in str(e)
+        finally:
+            lector_json.TAMANO_MAXIMO_ELEMENTO = maximo_original
+        print("✓ Elemento inválido informa error sin leer el archivo completo")
+
+        ruta = escribir(directorio / 'cortado.jsonl', compras, jsonl=True)
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write('{"id": 4, "nom')
+        assert list(iterar_compras(ruta)) == compras
+        print("✓ Última línea JSONL truncada se descarta")
+
+        ruta = directorio / 'corrupto.jsonl'
+        ruta.write_text('{"id": 1}\n{"id": \n{"id": 3}\n', encoding='utf-8')
+        try:
+            list(iterar_compras(ruta))
+            assert False, "No se detectó la línea corrupta"
+        except Exception as e:
+            assert 'línea 2' in str(e)
+        print("✓ Línea corrupta en medio del archivo informa su número")
+
+        ruta = directorio / 'resumen.json'
+        ruta.write_text('{"total": 3}', encoding='utf-8')
+        try:
+            list(iterar_compras(ruta))
+            assert False, "Un objeto suelto no es una lista de compras"
+        except Exception as e:
+            assert 'no contiene una lista de compras' in str(e)
+        print("✓ Un objeto JSON suelto no se toma como compras")
+
+
+def test_filtrado_por_lotes():
+    """Prueba que filtrar por lotes dé lo mismo que filtrar todo junto"""
+    print("\nTEST: Filtrado por lotes")
+    print("-" * 50)
+
+    compras = crear_compras(30, detalle=False)
+    argumentos = {'keywords': ['herramientas'], 'min_monto': 500000, 'fecha_inicio': '2026-10-05'}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = escribir(Path(directorio) / 'compras.jsonl', compras, jsonl=True)
+        por_lotes = filtrar_por_lotes(iterar_dataframes(ruta, tamano_lote=7), **argumentos)
+
+    completo = FiltradorAvanzado(pd.DataFrame(compras)).ejecutar_filtrado(**argumentos)
+
+    assert not completo.empty
+    assert sorted(por_lotes['codigo']) == sorted(completo['codigo'])
+    assert por_lotes['puntuacion_relevancia'].is_monotonic_decreasing
+    print(f"✓ {len(por_lotes)} compras relevantes, igual que sin lotes")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Lectura en flujo")
+    print("=" * 50)
+
+    try:
+        test_formatos()
+        test_lotes_y_dataframes()
+        test_memoria_acotada()
+        test_archivos_truncados()
+        test_filtrado_por_lotes()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Lectura en flujo válida")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Test de limitador de tasa adaptativo
+Valida: aumento aditivo, back-off ante 429/5xx/timeout, estado compartido y estadísticas
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.utilidades.limitador import LimitadorTasa, clasificar_error
+from src.scraper.utilidades.stats import EstadisticasScraper
+
+
+def crear_limitador(**kwargs):
+    parametros = dict(
+        tasa_inicial=1.0, tasa_minima=0.2, tasa_maxima=2.0, incremento=0.5,
+        factor_reduccion=0.5, factor_latencia=3, enfriamiento=0, rafaga=1,
+        compartido=False
+    )
+    parametros.update(kwargs)
+    return LimitadorTasa('test', **parametros)
+
+
+def test_clasificacion():
+    """Prueba qué errores cuentan como saturación"""
+    print("TEST: Clasificación de errores")
+    print("-" * 50)
+
+    assert clasificar_error(429) == 'http_429'
+    assert clasificar_error(503) == 'http_5xx'
+    assert clasificar_error('HTTP 502') == 'http_5xx'
+    assert clasificar_error(TimeoutError('read timed out')) == 'timeout'
+    assert clasificar_error(404) is None
+    assert clasificar_error(ValueError('JSON inválido')) is None
+    print("✓ 429, 5xx y timeouts provocan back-off; 404 y errores de parseo no")
+
+
+def test_aimd():
+    """Prueba aumento aditivo y reducción multiplicativa"""
+    print("\nTEST: Ajuste AIMD")
+    print("-" * 50)
+
+    limitador = crear_limitador()
+    estadisticas = EstadisticasScraper()
+
+    limitador.registrar_resultado(0.1, estadisticas=estadisticas)
+    assert limitador.tasa_actual == 1.5
+    limitador.registrar_resultado(0.1, estadisticas=estadisticas)
+    limitador.registrar_resultado(0.1, estadisticas=estadisticas)
+    assert limitador.tasa_actual == 2.0
+
+    motivo = limitador.registrar_resultado(0.1, 429, estadisticas=estadisticas)
+    assert motivo == 'http_429'
+    assert limitador.tasa_actual == 1.0
+
+    # Latencia muy por sobre la base también reduce
+    assert limitador.registrar_resultado(5.0, estadisticas=estadisticas) == 'latencia'
+    assert limitador.tasa_actual == 0.5
+
+    assert estadisticas.tasa_actual == 0.5
+    assert estadisticas.eventos_backoff == {'http_429': 1, 'latencia': 1}
+    print(f"✓ Tasa final {limitador.tasa_actual} req/s, back-off: {estadisticas.eventos_backoff}")
+
+
+def test_turno():
+    """Prueba que turno() registre el fallo marcado en el bloque"""
+    print("\nTEST: Turno de solicitud")
+    print("-" * 50)
+
+    limitador = crear_limitador(rafaga=2)
+
+    with limitador.turno() as turno:
+        turno.fallar('timeout')
+    assert limitador.tasa_actual == 0.5
+
+    inicio = time.time()
+    limitador.adquirir()
+    assert time.time() - inicio >= 1.0
+    print("✓ Back-off aplicado y siguiente turno pospuesto")
+
+
+def test_estado_compartido():
+    """Prueba que dos instancias (p.ej. dos procesos) compartan la tasa"""
+    print("\nTEST: Estado compartido por archivo")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'limitador_test.json'
+        primero = crear_limitador(compartido=True)
+        segundo = crear_limitador(compartido=True)
+
+        if primero.ruta_estado is None:
+            print("✓ Sin fcntl en esta plataforma: estado solo local")
+            return
+
+        primero.ruta_estado = segundo.ruta_estado = ruta
+
+        primero.registrar_resultado(0.1, 503)
+        assert segundo.tasa_actual == 0.5
+        print("✓ La reducción de un proceso la ve el otro")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Limitador de tasa")
+    print("=" * 50)
+
+    try:
+        test_clasificacion()
+        test_aimd()
+        test_turno()
+        test_estado_compartido()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Limitador válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Test de la forma compacta y tipada de las compras
+Valida: tipos del DataFrame normalizado, idempotencia, filtros sin reconversión,
+textos compartidos en los dict del listado y registros Compra con __slots__
+"""
+import json
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.storage.normalizacion import normalizar_dataframe, internar_compras, normalizar_compras, Compra
+from src.filters.filter_advanced import FiltradorAvanzado
+
+
+ORGANISMOS = [f"Ilustre Municipalidad de Comuna {i}" for i in range(20)] + ['Hospital Regional de Talca']
+
+
+def crear_compras(cantidad=30):
+    # Cada compra pasa por json.loads por separado, como páginas distintas de la API
+    return [
+        json.loads(json.dumps({
+            'id': i, 'codigo': f"1000-{i}-COT25", 'nombre': f"Compra de herramientas {i}",
+            'organismo': ORGANISMOS[i % len(ORGANISMOS)],
+            'estado_convocatoria': 2 if i % 3 else 1,
+            'monto_disponible_CLP': 50000 * i if i != 4 else 'sin monto',
+            'fecha_publicacion': f"2026-10-{1 + i % 28:02d} 09:00:00",
+            'fecha_cierre': f"2026-11-{1 + i % 28:02d} 18:00:00",
+            'cantidad_provedores_cotizando': i % 3
+        }))
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def test_dataframe_tipado():
+    """Prueba tipos, nulos, idempotencia y memoria del DataFrame normalizado"""
+    print("TEST: DataFrame normalizado")
+    print("-" * 50)
+
+    original = pd.DataFrame(crear_compras())
+    df = normalizar_dataframe(original)
+
+    assert isinstance(df['organismo'].dtype, pd.CategoricalDtype)
+    assert df['monto_disponible_CLP'].dtype == 'Int64' and pd.isna(df['monto_disponible_CLP'][3])
+    assert pd.api.types.is_integer_dtype(df['cantidad_provedores_cotizando'])
+    assert pd.api.types.is_datetime64_any_dtype(df['fecha_cierre'])
+    assert original['monto_disponible_CLP'].dtype == object
+    print("✓ Organismo categórico, montos y conteos enteros, fechas datetime64")
+
+    con_decimales = normalizar_dataframe(pd.DataFrame({'monto_disponible_CLP': [1500.5, 2000]}))
+    assert con_decimales['monto_disponible_CLP'].dtype == 'float64'
+    print("✓ Montos con decimales se mantienen float")
+
+    de_nuevo = normalizar_dataframe(df)
+    assert list(de_nuevo.dtypes) == list(df.dtypes)
+    pd.testing.assert_frame_equal(de_nuevo, df)
+    print("✓ Normalizar dos veces no cambia nada")
+
+    grande = pd.DataFrame(crear_compras(20000))
+    antes = grande.memory_usage(deep=True).sum()
+    despues = normalizar_dataframe(grande).memory_usage(deep=True).sum()
+    assert despues < antes / 2, (antes, despues)
+    print(f"✓ Memoria de 20000 compras: {antes / 1e6:.1f} MB -> {despues / 1e6:.1f} MB")
+
+
+def test_filtros_sin_reconversion():
+    """Prueba que el filtrado dé lo mismo y no vuelva a convertir columnas tipadas"""
+    print("\nTEST: Filtros sobre datos normalizados")
+    print("-" * 50)
+
+    argumentos = {'keywords': ['herramientas'], 'min_monto': 300000, 'fecha_inicio': '2026-10-05'}
+    compras = crear_compras()
+
+    sin_normalizar = FiltradorAvanzado(pd.DataFrame(compras)).ejecutar_filtrado(**argumentos)
+    normalizado = normalizar_dataframe(pd.DataFrame(compras))
+
+    # Solo cuentan las conversiones de columnas (las fechas del filtro son escalares)
+    llamadas = []
+    to_numeric, to_datetime = pd.to_numeric, pd.to_datetime
+
+    def registrar(nombre, conversion):
+        def envoltura(valor, *args, **kwargs):
+            if isinstance(valor, pd.Series):
+                llamadas.append(f"{nombre}({valor.name})")
+            return conversion(valor, *args, **kwargs)
+        return envoltura
+
+    pd.to_numeric = registrar('to_numeric', to_numeric)
+    pd.to_datetime = registrar('to_datetime', to_datetime)
+    try:
+        resultado = FiltradorAvanzado(normalizado).ejecutar_filtrado(**argumentos)
+    finally:
+        pd.to_numeric, pd.to_datetime = to_numeric, to_datetime
+
+    assert llamadas == [], llamadas
+    assert not resultado.empty
+    assert sorted(resultado['codigo']) == sorted(sin_normalizar['codigo'])
+    assert sorted(resultado['puntuacion_relevancia']) == sorted(sin_normalizar['puntuacion_relevancia'])
+    print(f"✓ {len(resultado)} compras relevantes, sin pd.to_numeric ni pd.to_datetime sobre columnas")
+
+
+def test_textos_compartidos():
+    """Prueba que el organismo de compras distintas quede como un solo objeto"""
+    print("\nTEST: Textos compartidos")
+    print("-" * 50)
+
+    compras = crear_compras()
+    primera, misma = compras[0], compras[len(ORGANISMOS)]
+    assert primera['organismo'] == misma['organismo'] and primera['organismo'] is not misma['organismo']
+
+    assert internar_compras(compras) is compras
+    assert primera['organismo'] is misma['organismo']
+    print("✓ Mismo organismo, mismo objeto tras internar")
+
+
+def test_registro_compra():
+    """Prueba el registro con __slots__: tipos, get, ida y vuelta y memoria"""
+    print("\nTEST: Registro Compra")
+    print("-" * 50)
+
+    compra = dict(crear_compras(1)[0], region='Maule')
+    registro = Compra.desde_dict(compra)
+
+    assert not hasattr(registro, '__dict__')
+    assert registro.monto_disponible_CLP == 50000 and isinstance(registro.monto_disponible_CLP, int)
+    assert registro.fecha_cierre == datetime(2026, 11, 2, 18, 0)
+    assert registro.get('region') == 'Maule' and registro.get('no_existe', 0) == 0
+    assert registro.a_dict() == compra
+    print("✓ Campos tipados, get() como dict y a_dict() igual al original")
+
+    assert Compra.desde_dict({'codigo': 'X', 'monto_disponible_CLP': '1500.0'}).monto_disponible_CLP == 1500
+    assert Compra.desde_dict({'codigo': 'X', 'fecha_cierre': 'mañana'}).fecha_cierre is None
+    print("✓ Montos en texto y fechas inválidas")
+
+    textos = [json.dumps(c) for c in crear_compras(5000)]
+
+    tracemalloc.start()
+    try:
+        como_dict = [json.loads(texto) for texto in textos]
+        memoria_dict, _ = tracemalloc.get_traced_memory()
+        del como_dict
+        base, _ = tracemalloc.get_traced_memory()
+        registros = normalizar_compras(json.loads(texto) for texto in textos)
+        memoria_registros = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+
+    assert len(registros) == 5000
+    assert memoria_registros < memoria_dict * 0.75, (memoria_dict, memoria_registros)
+    print(f"✓ 5000 compras: {memoria_dict / 1e6:.2f} MB en dict, {memoria_registros / 1e6:.2f} MB en Compra")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Compras normalizadas")
+    print("=" * 50)
+
+    try:
+        test_dataframe_tipado()
+        test_filtros_sin_reconversion()
+        test_textos_compartidos()
+        test_registro_compra()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Normalización válida")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Test del crawl particionado por región
+Valida: generación de particiones, unión sin duplicados y verificación contra el total global
+"""
+import sys
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper import particiones as modulo_particiones
+from src.scraper.particiones import ScraperParticionado, generar_particiones
+
+
+# resultCount simulado por región; 'all' es la consulta global
+TOTALES = {'13': 3, '5': 2, '8': 1, 'all': 6}
+
+
+def particion_simulada(parametros, modo, max_paginas=None):
+    region = parametros['region']
+    compras = [{'id': f"{region}-{i}"} for i in range(TOTALES[region])]
+    if region == '5':
+        # Compra que el buscador lista en dos regiones
+        compras.append({'id': '13-0'})
+    return {'compras': compras, 'total_resultados': TOTALES[region], 'completo': True}
+
+
+def test_generar_particiones():
+    """Prueba el producto región x estado"""
+    print("TEST: Generación de particiones")
+    print("-" * 50)
+
+    assert generar_particiones(['13', '5']) == [{'region': '13'}, {'region': '5'}]
+    assert generar_particiones(['13', '5'], [2, 3]) == [
+        {'region': '13', 'status': 2}, {'region': '5', 'status': 2},
+        {'region': '13', 'status': 3}, {'region': '5', 'status': 3}
+    ]
+    print("✓ Particiones por región y por región/estado")
+
+
+def test_union_y_verificacion():
+    """Prueba la unión en orden, sin duplicados, y el cruce con el total global"""
+    print("\nTEST: Unión y verificación de totales")
+    print("-" * 50)
+
+    hilos = set()
+
+    def particion_registrada(parametros, modo, max_paginas=None):
+        hilos.add(threading.get_ident())
+        return particion_simulada(parametros, modo, max_paginas)
+
+    original = modulo_particiones._scrapear_particion
+    modulo_particiones._scrapear_particion = particion_registrada
+
+    try:
+        scraper = ScraperParticionado(regiones=['13', '5', '8'], concurrencia=3, total_global=TOTALES['all'])
+        compras, ruta, reporte = scraper.ejecutar(guardar=False)
+
+        assert ruta is None
+        assert [c['id'] for c in compras] == ['13-0', '13-1', '13-2', '5-0', '5-1', '8-0']
+        assert reporte['compras_obtenidas'] == 7
+        assert reporte['compras_unicas'] == 6
+        assert reporte['total_particiones'] == 6
+        assert reporte['total_global'] == 6
+        assert reporte['coincide']
+        print("✓ Compras unidas en orden de partición y sin duplicados")
+        print("✓ Suma de particiones coincide con el total global")
+
+        # Región omitida: la verificación lo detecta
+        scraper = ScraperParticionado(regiones=['13', '5'], concurrencia=1, total_global=TOTALES['all'])
+        _, _, reporte = scraper.ejecutar(guardar=False)
+        assert not reporte['coincide']
+        assert reporte['total_particiones'] == 5
+        print("✓ Partición faltante detectada")
+
+        # Sin total conocido no se lanza otra corrida para la consulta global
+        consultadas = []
+
+        def particion_consultada(parametros, modo, max_paginas=None):
+            consultadas.append(parametros['region'])
+            return particion_simulada(parametros, modo, max_paginas)
+
+        modulo_particiones._scrapear_particion = particion_consultada
+        _, _, reporte = ScraperParticionado(regiones=['13', '5', '8'], concurrencia=1).ejecutar(guardar=False)
+        assert consultadas == ['13', '5', '8']
+        assert reporte['total_global'] is None and reporte['coincide'] is None
+        print("✓ Sin total global conocido no se consulta la región 'all'")
+    finally:
+        modulo_particiones._scrapear_particion = original
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Crawl particionado")
+    print("=" * 50)
+
+    try:
+        test_generar_particiones()
+        test_union_y_verificacion()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Crawl particionado válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
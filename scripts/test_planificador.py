@@ -0,0 +1,163 @@
+"""
+Test del planificador de consultas
+Valida: reparto de filtros entre API y filtrado local, rangos con un extremo,
+código exacto, validación de orden, filtros locales tras la descarga y reporte
+de páginas ahorradas
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.filters.planificador import planificar_consulta, calcular_paginas_ahorradas
+from config.config import PARAMETRO_TEXTO_BUSQUEDA, FECHA_SCRAPING
+
+
+def test_reparto_de_filtros():
+    """Prueba que los filtros del buscador vayan a la API y el resto quede local"""
+    print("TEST: Reparto de filtros")
+    print("-" * 50)
+
+    plan = planificar_consulta(
+        texto='ferretería', region='13', estado=2, fecha_inicio='2026-10-01',
+        fecha_fin='2026-10-15', orden='closing_soon', keywords=['riego'],
+        min_monto=100000, max_monto=None
+    )
+
+    assert plan.parametros == {
+        PARAMETRO_TEXTO_BUSQUEDA: 'ferretería', 'region': '13', 'status': 2,
+        'date_from': '2026-10-01', 'date_to': '2026-10-15', 'order_by': 'closing_soon'
+    }
+    assert plan.filtros_locales == {'keywords': ['riego'], 'min_monto': 100000, 'texto': 'ferretería'}
+    assert 'orden' not in plan.empujados
+    print(f"✓ API: {', '.join(plan.empujados)} | local: monto, keywords y texto")
+
+    assert plan.parametros_sin_pushdown == {
+        'date_from': '2026-10-01', 'date_to': '2026-10-15', 'order_by': 'closing_soon'
+    }
+    print("✓ Consulta sin pushdown conserva solo la ventana de fechas y el orden")
+
+
+def test_rango_con_un_extremo():
+    """Prueba que un rango con un solo extremo no llegue invertido a la API"""
+    print("\nTEST: Rango de fechas con un extremo")
+    print("-" * 50)
+
+    plan = planificar_consulta(fecha_fin='2020-03-15')
+    assert plan.parametros == {'date_from': '2020-03-15', 'date_to': '2020-03-15'}
+    print("✓ Solo fecha_fin anterior a ayer: date_from = fecha_fin")
+
+    plan = planificar_consulta(fecha_fin='2999-01-01')
+    assert plan.parametros == {'date_to': '2999-01-01'}
+    assert FECHA_SCRAPING <= plan.parametros['date_to']
+    print("✓ Solo fecha_fin posterior a ayer: date_from por defecto")
+
+    plan = planificar_consulta(fecha_inicio='2999-01-01')
+    assert plan.parametros == {'date_from': '2999-01-01', 'date_to': '2999-01-01'}
+    print("✓ Solo fecha_inicio posterior a ayer: date_to = fecha_inicio")
+
+
+def test_codigo_exacto_y_validacion():
+    """Prueba que el código exacto anule los demás filtros y que se validen los valores"""
+    print("\nTEST: Código exacto y validación")
+    print("-" * 50)
+
+    plan = planificar_consulta(codigo_exacto='1234-56-COT25', region='13', min_monto=5)
+    assert plan.parametros == {PARAMETRO_TEXTO_BUSQUEDA: '1234-56-COT25'}
+    assert plan.filtros_locales['codigo_exacto'] == '1234-56-COT25'
+    print("✓ Código buscado como texto y confirmado localmente")
+
+    for filtros in ({'orden': 'mas_barato'}, {'proveedor': 'x'}):
+        try:
+            planificar_consulta(**filtros)
+            assert False, f"Se aceptó {filtros}"
+        except ValueError:
+            pass
+    print("✓ Orden y filtros desconocidos rechazados")
+
+    plan = planificar_consulta(texto='', region=None, keywords=[])
+    assert plan.parametros == {} and plan.empujados == []
+    print("✓ Filtros vacíos se ignoran")
+
+
+def test_filtros_locales_tras_descarga():
+    """Prueba que el texto se confirme localmente si la API ignoró el parámetro"""
+    print("\nTEST: Filtros locales sobre lo descargado")
+    print("-" * 50)
+
+    # La API devolvió todo: el parámetro de texto no era el correcto
+    descargadas = pd.DataFrame([
+        {'codigo': '1-1-COT25', 'nombre': 'Compra de FERRETERIA menor', 'monto_disponible_CLP': 200000},
+        {'codigo': '1-2-COT25', 'nombre': 'Artículos de ferretería', 'monto_disponible_CLP': 50000},
+        {'codigo': '1-3-COT25', 'nombre': 'Servicio de aseo', 'monto_disponible_CLP': 300000},
+    ])
+
+    plan = planificar_consulta(texto='Ferretería', min_monto=100000)
+    assert plan.aplicar_filtros_locales(descargadas)['codigo'].tolist() == ['1-1-COT25']
+    print("✓ Texto sin tildes ni mayúsculas y monto mínimo aplicados")
+
+    plan = planificar_consulta(region='13')
+    assert len(plan.aplicar_filtros_locales(descargadas)) == 3
+    print("✓ Sin filtros locales no se descarta nada")
+
+
+def test_reporte_de_ahorro():
+    """Prueba el cálculo de páginas evitadas"""
+    print("\nTEST: Páginas ahorradas")
+    print("-" * 50)
+
+    assert calcular_paginas_ahorradas(1500, 40, 15)['paginas_ahorradas'] == 97
+    assert calcular_paginas_ahorradas(None, 40)['paginas_ahorradas'] is None
+
+    totales = {'region': 30}
+    consultadas = []
+
+    def consultar_total(parametros):
+        consultadas.append(parametros)
+        return totales.get('region' if 'region' in parametros else 'todas', 3000)
+
+    plan = planificar_consulta(region='13', fecha_inicio='2026-10-01')
+    ahorro = plan.reportar_ahorro(consultar_total, total_con_pushdown=30, tamano_pagina=100)
+    assert consultadas == [{'date_from': '2026-10-01'}]
+    assert ahorro['paginas_sin_pushdown'] == 30
+    assert ahorro['paginas_con_pushdown'] == 1
+    assert ahorro['paginas_ahorradas'] == 29
+    print("✓ 29 de 30 páginas evitadas con una sola consulta extra")
+
+    consultadas.clear()
+    ahorro = planificar_consulta(orden='recent').reportar_ahorro(consultar_total)
+    assert len(consultadas) == 1 and ahorro['paginas_ahorradas'] == 0
+    print("✓ Sin filtros empujados no hay consulta extra ni ahorro")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Planificador de consultas")
+    print("=" * 50)
+
+    try:
+        test_reparto_de_filtros()
+        test_rango_con_un_extremo()
+        test_codigo_exacto_y_validacion()
+        test_filtros_locales_tras_descarga()
+        test_reporte_de_ahorro()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Planificador válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Test del pool de navegador sin lanzar Chromium
+Valida: captura de ficha sin historial con espera acotada y cierre del
+event loop cuando el navegador no logra iniciar
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper import browser_pool
+from src.scraper.browser_pool import PoolNavegador, capturar_detalle
+from src.scraper.utilidades.logger import configurar_logger
+
+
+class MockResponse:
+    """Mock de response de Playwright con un JSON fijo"""
+
+    def __init__(self, url, datos):
+        self.url = url
+        self.datos = datos
+
+    async def json(self):
+        return self.datos
+
+
+class MockPage:
+    """Mock de page de Playwright que emite las respuestas indicadas al navegar"""
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.oyentes = []
+
+    def on(self, evento, funcion):
+        self.oyentes.append(funcion)
+
+    def remove_listener(self, evento, funcion):
+        self.oyentes.remove(funcion)
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        loop = asyncio.get_running_loop()
+        for retraso, respuesta in self.respuestas:
+            for oyente in list(self.oyentes):
+                loop.call_later(retraso, oyente, respuesta)
+
+
+def test_detalle_sin_historial():
+    """Prueba que una compra sin historial no espere el timeout completo de captura"""
+    print("TEST: Ficha sin historial")
+    print("-" * 50)
+
+    ficha = MockResponse(
+        "https://api.buscador.mercadopublico.cl/compra-agil?action=ficha&code=1-1-COT25",
+        {'success': 'OK', 'payload': {'codigo': '1-1-COT25'}}
+    )
+    historial = MockResponse(
+        "https://api.buscador.mercadopublico.cl/compra-agil?action=historial&code=1-1-COT25",
+        {'success': 'OK', 'payload': [{'accion': 'Publicada'}]}
+    )
+
+    timeout_original = browser_pool.TIMEOUT_CAPTURA_HISTORIAL
+    browser_pool.TIMEOUT_CAPTURA_HISTORIAL = 0.2
+    try:
+        inicio = time.time()
+        detalle = asyncio.run(capturar_detalle(MockPage([(0.01, ficha)]), '1-1-COT25'))
+        duracion = time.time() - inicio
+
+        completo = asyncio.run(capturar_detalle(MockPage([(0.01, ficha), (0.05, historial)]), '1-1-COT25'))
+    finally:
+        browser_pool.TIMEOUT_CAPTURA_HISTORIAL = timeout_original
+
+    assert detalle == {'ficha': {'codigo': '1-1-COT25'}, 'historial': []}
+    assert duracion < 1, duracion
+    print(f"✓ Ficha sin historial en {duracion:.2f} s (timeout de captura {browser_pool.TIMEOUT_CAPTURA_API:.0f} s)")
+
+    assert completo['historial'] == [{'accion': 'Publicada'}]
+    print("✓ Historial capturado cuando llega")
+
+
+class MockPlaywright:
+    """Mock de async_playwright cuyo Chromium no logra lanzarse"""
+
+    def __init__(self):
+        self.detenido = False
+        self.chromium = self
+
+    async def start(self):
+        return self
+
+    async def launch(self, **opciones):
+        raise RuntimeError("Executable doesn't exist")
+
+    async def stop(self):
+        self.detenido = True
+
+
+def test_inicio_fallido():
+    """Prueba que un lanzamiento fallido detenga playwright y el hilo del event loop"""
+    print("\nTEST: Inicio fallido del pool")
+    print("-" * 50)
+
+    playwright = MockPlaywright()
+    original = browser_pool.async_playwright
+    browser_pool.async_playwright = lambda: playwright
+    pool = PoolNavegador(configurar_logger('test_pool_navegador'), tamano=2)
+    try:
+        with pool:
+            assert False, "El pool no debía iniciar"
+    except RuntimeError as e:
+        assert "Executable" in str(e)
+    finally:
+        browser_pool.async_playwright = original
+
+    assert playwright.detenido
+    assert not pool._hilo.is_alive() and pool._loop.is_closed()
+    print("✓ Error propagado, playwright detenido y event loop cerrado")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Pool de navegador")
+    print("=" * 50)
+
+    try:
+        test_detalle_sin_historial()
+        test_inicio_fallido()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Pool de navegador válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Test de cola de reintentos
+Valida: backoff exponencial con jitter, recuperación de páginas fallidas y reporte de completitud
+"""
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.utilidades.reintentos import ColaReintentos
+from src.scraper.utilidades.stats import EstadisticasScraper
+from src.scraper.utilidades.logger import configurar_logger
+from scripts.listado_simulado import crear_payload
+
+
+def crear_compra(pagina, i):
+    return {'codigo': f'{pagina}-{i}'}
+
+
+def test_backoff():
+    """Prueba que la espera crezca exponencialmente con tope y jitter"""
+    print("TEST: Backoff exponencial")
+    print("-" * 50)
+
+    cola = ColaReintentos(
+        configurar_logger('test_reintentos'), EstadisticasScraper(),
+        espera_base=1, espera_maxima=8
+    )
+
+    for intento, tope in [(1, 1), (2, 2), (3, 4), (6, 8)]:
+        espera = cola.calcular_espera(intento)
+        assert tope / 2 <= espera <= tope, f"intento {intento}: {espera}"
+
+    print("✓ Espera entre la mitad y el tope de cada intento")
+
+
+def test_intentos_agotados():
+    """Prueba que un elemento que siempre falla termine en fallidos"""
+    print("\nTEST: Intentos agotados")
+    print("-" * 50)
+
+    estadisticas = EstadisticasScraper()
+    cola = ColaReintentos(
+        configurar_logger('test_reintentos'), estadisticas,
+        max_intentos=3, espera_base=0.01, espera_maxima=0.01
+    )
+
+    cola.agregar('X')
+    recuperados = cola.procesar(lambda item: None)
+
+    assert recuperados == {}
+    assert cola.fallidos == ['X']
+    assert estadisticas.reintentos == 2
+    print("✓ 2 reintentos y elemento marcado como fallido")
+
+
+def test_recuperacion_listado():
+    """Prueba que una página fallida se recupere y vuelva a su posición"""
+    print("\nTEST: Recuperación de página en el listado")
+    print("-" * 50)
+
+    intentos = {}
+
+    def obtener_pagina(numero):
+        intentos[numero] = intentos.get(numero, 0) + 1
+        if numero == 3 and intentos[numero] == 1:
+            return None
+        return crear_payload(numero, campos=crear_compra)
+
+    scraper = ScraperListado(modo='http', concurrencia=1)
+    scraper._recorrer_paginas(obtener_pagina)
+
+    ids = [compra['id'] for compra in scraper.compras]
+    assert ids == [pagina * 100 + i for pagina in range(1, 5) for i in range(2)]
+    assert scraper.estadisticas.reintentos == 1
+    assert scraper.reporte_completitud['compras_faltantes'] == 0
+    assert scraper.reporte_completitud['completitud'] == 100.0
+    print(f"✓ Página 3 recuperada en orden, reporte: {scraper.reporte_completitud}")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Reintentos")
+    print("=" * 50)
+
+    try:
+        test_backoff()
+        test_intentos_agotados()
+        test_recuperacion_listado()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Reintentos válidos")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
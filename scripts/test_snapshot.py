@@ -0,0 +1,127 @@
+"""
+Test de los snapshots columnares
+Valida: tipos guardados, proyección de columnas, ambos formatos, último snapshot
+y mismo resultado de filtrado que con el JSON
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.storage.snapshot import guardar_snapshot, cargar_snapshot, ultimo_snapshot
+from src.filters.filter_advanced import FiltradorAvanzado, COLUMNAS_FILTRADO
+
+
+COMPRAS = [
+    {
+        'codigo': f"1000-{i}-COT25", 'nombre': f"Compra de herramientas {i}",
+        'organismo': 'Hospital Regional' if i % 2 else 'Municipalidad de Talca',
+        'estado_convocatoria': 2 if i % 3 else 1,
+        'monto_disponible_CLP': str(100000 * i) if i != 4 else 'sin monto',
+        'fecha_publicacion': f"2026-10-{10 + i:02d}T09:00:00",
+        'fecha_cierre': f"2026-10-{20 + i:02d}T18:00:00",
+        'cantidad_provedores_cotizando': i % 2,
+        'productos': [{'nombre': 'martillo', 'cantidad': i}],
+        'id': i
+    }
+    for i in range(1, 8)
+]
+
+
+def test_tipos_y_proyeccion():
+    """Prueba que las columnas queden tipadas y se lean solo las pedidas"""
+    print("TEST: Tipos y proyección")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for formato in ('arrow', 'parquet'):
+            ruta = guardar_snapshot(COMPRAS, 'compras_completas_1', Path(directorio), formato)
+            df = cargar_snapshot(ruta)
+
+            assert len(df) == len(COMPRAS)
+            assert df['monto_disponible_CLP'].dtype == 'Int64'
+            assert pd.isna(df['monto_disponible_CLP'][3])
+            assert isinstance(df['organismo'].dtype, pd.CategoricalDtype)
+            assert pd.api.types.is_datetime64_any_dtype(df['fecha_cierre'])
+            assert df['productos'][0] == '[{"nombre": "martillo", "cantidad": 1}]'
+
+            df = cargar_snapshot(ruta, columnas=['codigo', 'monto_disponible_CLP', 'no_existe'])
+            assert list(df.columns) == ['codigo', 'monto_disponible_CLP']
+            print(f"✓ {formato}: montos enteros, organismo categórico, fechas tipadas, solo columnas pedidas")
+
+        assert not list(Path(directorio).glob('*.tmp'))
+
+
+def test_ultimo_snapshot():
+    """Prueba la elección del snapshot más reciente por prefijo"""
+    print("\nTEST: Último snapshot")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio = Path(directorio)
+        assert ultimo_snapshot(directorio) is None
+
+        antiguo = guardar_snapshot(COMPRAS, 'compras_completas_1', directorio)
+        reciente = guardar_snapshot(COMPRAS, 'compras_completas_2', directorio, 'parquet')
+        nuevas = guardar_snapshot(COMPRAS[:1], 'compras_nuevas_3', directorio)
+
+        ahora = time.time()
+        os.utime(antiguo, (ahora - 20, ahora - 20))
+        os.utime(reciente, (ahora - 10, ahora - 10))
+
+        assert ultimo_snapshot(directorio) == nuevas
+        assert ultimo_snapshot(directorio, prefijo='compras_completas') == reciente
+        print("✓ Más reciente por fecha de modificación, filtrando por prefijo")
+
+
+def test_mismo_filtrado():
+    """Prueba que filtrar el snapshot dé lo mismo que filtrar el JSON"""
+    print("\nTEST: Filtrado sobre snapshot")
+    print("-" * 50)
+
+    argumentos = {'keywords': ['herramientas'], 'min_monto': 150000, 'fecha_inicio': '2026-10-12'}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = guardar_snapshot(COMPRAS, 'compras_completas_1', Path(directorio))
+        df_snapshot = cargar_snapshot(ruta, columnas=COLUMNAS_FILTRADO)
+
+    desde_json = FiltradorAvanzado(pd.DataFrame(COMPRAS)).ejecutar_filtrado(**argumentos)
+    desde_snapshot = FiltradorAvanzado(df_snapshot).ejecutar_filtrado(**argumentos)
+
+    assert list(desde_snapshot['codigo']) == list(desde_json['codigo'])
+    assert list(desde_snapshot['puntuacion_relevancia']) == list(desde_json['puntuacion_relevancia'])
+    print(f"✓ {len(desde_snapshot)} compras relevantes en ambos casos")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Snapshots columnares")
+    print("=" * 50)
+
+    try:
+        test_tipos_y_proyeccion()
+        test_ultimo_snapshot()
+        test_mismo_filtrado()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Snapshots válidos")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Test del tamaño de página auto-detectado
+Valida: tamaño aceptado, recortado por el servidor, parámetro ignorado o rechazado,
+reutilización del resultado guardado, sondeo sin decidir y estadísticas sin sondeos
+"""
+import sys
+import tempfile
+import threading
+from functools import partial
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.scraper import list_scraper
+from src.scraper.list_scraper import ScraperListado
+from src.scraper.utilidades import tamano_pagina
+from config.config import PARAMETRO_TAMANO_PAGINA, TAMANO_PAGINA_BASE
+
+
+TOTAL_COMPRAS = 230
+
+
+class ServidorSimulado:
+    """API que responde según el tamaño de página pedido"""
+
+    def __init__(self, scraper, maximo=None, ignora=False, rechaza_sobre=None, total=TOTAL_COMPRAS):
+        self.scraper = scraper
+        self.maximo = maximo
+        self.ignora = ignora
+        self.rechaza_sobre = rechaza_sobre
+        self.total = total
+        self.pedidas = []
+
+    def obtener_pagina(self, numero):
+        pedido = self.scraper.parametros.get(PARAMETRO_TAMANO_PAGINA)
+        self.pedidas.append((numero, pedido))
+
+        if pedido and self.rechaza_sobre and pedido > self.rechaza_sobre:
+            return None
+
+        tamano = TAMANO_PAGINA_BASE
+        if pedido and not self.ignora:
+            tamano = min(pedido, self.maximo or pedido)
+
+        inicio = (numero - 1) * tamano
+        return {
+            "success": "OK",
+            "payload": {
+                "resultados": [{"id": i} for i in range(inicio, min(inicio + tamano, self.total))],
+                "resultCount": self.total,
+                "pageCount": -(-self.total // tamano),
+                "page": numero,
+                "pageSize": tamano
+            }
+        }
+
+
+def recorrer(ruta, **servidor):
+
+    #Corrida completa con el resultado del sondeo guardado en un archivo temporal
+
+    list_scraper.leer_tamano_pagina = partial(tamano_pagina.leer_tamano_pagina, ruta=ruta)
+    list_scraper.guardar_tamano_pagina = partial(tamano_pagina.guardar_tamano_pagina, ruta=ruta)
+
+    scraper = ScraperListado(modo='http', concurrencia=1)
+    scraper._aplicar_tamano_pagina()
+    simulado = ServidorSimulado(scraper, **servidor)
+    # Cada respuesta pasa por el registro de estadísticas, como en los modos reales
+    scraper._recorrer_paginas(
+        lambda numero: scraper._registrar_datos_pagina(simulado.obtener_pagina(numero), numero)
+    )
+
+    assert sorted(c['id'] for c in scraper.compras) == list(range(simulado.total))
+    return scraper, simulado.pedidas
+
+
+def contadores(scraper):
+    resumen = scraper.estadisticas.obtener_resumen()
+    return resumen['paginas_procesadas'], resumen['compras_scrapeadas'], resumen['errores']
+
+
+def test_tamano_aceptado():
+    """Prueba que el mayor candidato aceptado se use y se recuerde"""
+    print("TEST: Tamaño aceptado")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'tamano.json'
+
+        scraper, pedidas = recorrer(ruta)
+        assert pedidas == [(1, 200), (2, 200)]
+        assert tamano_pagina.leer_tamano_pagina('http', ruta) == (True, 200)
+        assert contadores(scraper) == (2, TOTAL_COMPRAS, 0)
+        print("✓ 2 páginas en vez de 16, la primera reutilizada del sondeo")
+
+        scraper, pedidas = recorrer(ruta)
+        assert pedidas == [(1, 200), (2, 200)]
+        print("✓ Segunda corrida usa el tamaño guardado")
+
+
+def test_tamano_recortado():
+    """Prueba que un servidor con máximo menor imponga su tamaño"""
+    print("\nTEST: Tamaño recortado por el servidor")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'tamano.json'
+
+        scraper, pedidas = recorrer(ruta, maximo=60)
+        assert pedidas[0] == (1, 200)
+        assert pedidas[1:] == [(numero, 60) for numero in range(1, 5)]
+        assert tamano_pagina.leer_tamano_pagina('http', ruta) == (True, 60)
+        assert contadores(scraper) == (4, TOTAL_COMPRAS, 0)
+        print("✓ Se usa el máximo del servidor (60), sin contar el sondeo")
+
+
+def test_parametro_ignorado_o_rechazado():
+    """Prueba el retorno al tamaño por defecto"""
+    print("\nTEST: Parámetro ignorado o rechazado")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'tamano.json'
+
+        scraper, pedidas = recorrer(ruta, ignora=True)
+        assert PARAMETRO_TAMANO_PAGINA not in scraper.parametros
+        assert tamano_pagina.leer_tamano_pagina('http', ruta) == (True, None)
+        assert len(pedidas) == 1 + 16
+        assert contadores(scraper) == (16, TOTAL_COMPRAS, 0)
+        print("✓ Parámetro ignorado: un solo sondeo y tamaño por defecto")
+
+        scraper, pedidas = recorrer(ruta, ignora=True)
+        assert all(pedido is None for _, pedido in pedidas)
+        assert len(pedidas) == 16
+        print("✓ Corridas siguientes no vuelven a sondear")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'tamano.json'
+
+        scraper, pedidas = recorrer(ruta, rechaza_sobre=100)
+        assert pedidas[:2] == [(1, 200), (1, 100)]
+        assert tamano_pagina.leer_tamano_pagina('http', ruta) == (True, 100)
+        assert contadores(scraper) == (3, TOTAL_COMPRAS, 0)
+        print("✓ Candidato rechazado: se prueba el siguiente (100), sin contarlo como error")
+
+
+def test_sondeo_sin_decidir():
+    """Prueba que un día con pocos resultados no vuelva a sondear en cada corrida"""
+    print("\nTEST: Sondeo sin decidir")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'tamano.json'
+
+        scraper, pedidas = recorrer(ruta, total=10)
+        assert pedidas == [(1, 200), (1, None)]
+        assert tamano_pagina.leer_tamano_pagina('http', ruta) == (True, None)
+        assert contadores(scraper) == (1, 10, 0)
+        print("✓ Muestra insuficiente guardada como sin decidir, sin contar el sondeo")
+
+        scraper, pedidas = recorrer(ruta, total=10)
+        assert pedidas == [(1, None)]
+        print("✓ Corrida siguiente no vuelve a sondear")
+
+        assert tamano_pagina.leer_tamano_pagina('http', ruta, vigencia_sin_decidir=-1) == (False, None)
+        assert tamano_pagina.leer_tamano_pagina('http', ruta, vigencia=-1) == (True, None)
+        print("✓ El resultado sin decidir vence con su propia vigencia")
+
+
+def test_escritura_concurrente():
+    """Prueba que sondeos simultáneos de varios modos no se pisen"""
+    print("\nTEST: Escritura concurrente")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'tamano.json'
+        modos = [f"modo_{i}" for i in range(20)]
+
+        hilos = [
+            threading.Thread(target=tamano_pagina.guardar_tamano_pagina, args=(modo, 100, ruta))
+            for modo in modos
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert all(tamano_pagina.leer_tamano_pagina(modo, ruta) == (True, 100) for modo in modos)
+        assert not list(Path(directorio).glob('*.tmp'))
+        print(f"✓ {len(modos)} sondeos guardados, sin temporales sueltos")
+
+
+def main():
+    """Ejecuta todos los tests"""
+    print("=" * 50)
+    print("TESTING: Tamaño de página")
+    print("=" * 50)
+
+    originales = (list_scraper.leer_tamano_pagina, list_scraper.guardar_tamano_pagina)
+
+    try:
+        test_tamano_aceptado()
+        test_tamano_recortado()
+        test_parametro_ignorado_o_rechazado()
+        test_sondeo_sin_decidir()
+        test_escritura_concurrente()
+
+        print("\n" + "=" * 50)
+        print("RESULTADO: Tamaño de página válido")
+        print("=" * 50)
+        return 0
+
+    except AssertionError as e:
+        print(f"\nERROR: Test falló - {e}")
+        return 1
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        return 1
+    finally:
+        list_scraper.leer_tamano_pagina, list_scraper.guardar_tamano_pagina = originales
+
+
+if __name__ == "__main__":
+    sys.exit(main())
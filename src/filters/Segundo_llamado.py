@@ -6,6 +6,9 @@ def filtrar_por_estado_convocatoria(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()  # Devuelve un DataFrame vacío si la columna no existe
 
     # Asegurarse de que la columna es de tipo numérico, convirtiendo errores a NaN y luego a 0
-    df['estado_convocatoria'] = pd.to_numeric(df['estado_convocatoria'], errors='coerce').fillna(0).astype(int)
+    estado = df['estado_convocatoria']
+    if not pd.api.types.is_numeric_dtype(estado):
+        estado = pd.to_numeric(estado, errors='coerce')
+    df['estado_convocatoria'] = estado.fillna(0).astype(int)
     
     return df[df['estado_convocatoria'] == 2].copy()
\ No newline at end of file
@@ -18,7 +18,9 @@ def filtrar_por_fecha(df: pd.DataFrame, fecha_inicio: Optional[str] = None, fech
 
     # Convertir la columna de fecha a formato datetime, los errores se convertirán en NaT (Not a Time)
     df_filtrado = df.copy()
-    df_filtrado['fecha_publicacion'] = pd.to_datetime(df_filtrado['fecha_publicacion'], errors='coerce')
+    # (ya tipada si el DataFrame pasó por normalizar_dataframe)
+    if not pd.api.types.is_datetime64_any_dtype(df_filtrado['fecha_publicacion']):
+        df_filtrado['fecha_publicacion'] = pd.to_datetime(df_filtrado['fecha_publicacion'], errors='coerce')
 
     # Eliminar filas con fechas inválidas
     df_filtrado.dropna(subset=['fecha_publicacion'], inplace=True)
@@ -1,10 +1,11 @@
 import pandas as pd
-from typing import Optional, List
+from typing import Iterable, Optional, List
 
 # Importar todas las funciones de los filtros individuales
 from .Segundo_llamado import filtrar_por_estado_convocatoria
 from .monto import filtrar_por_monto
 from .fecha import filtrar_por_fecha
+from .texto import filtrar_por_texto
 from .ID import filtrar_por_codigo
 from .urgencia_filter import aplicar_criterio_urgencia
 from .keywords_filters import contar_keywords
@@ -24,6 +25,12 @@ from config.filters_config import (
 PUNTOS_OPORTUNIDAD = 3 # Bonus por alerta de urgencia
 PUNTOS_KEYWORD = 1     # Puntos por cada keyword encontrada
 
+# Columnas que lee el filtrado (y que muestra main.py): las únicas que se cargan de un snapshot
+COLUMNAS_FILTRADO = [
+    'codigo', 'nombre', 'organismo', 'estado_convocatoria', 'monto_disponible_CLP',
+    'fecha_publicacion', 'fecha_cierre', 'cantidad_provedores_cotizando'
+]
+
 class FiltradorAvanzado:
     """
     Clase que orquesta el proceso completo de filtrado y puntuación de compras.
@@ -34,11 +41,14 @@ class FiltradorAvanzado:
         self.df_original = df_compras.copy()
         self.df_procesado = df_compras.copy()
 
-    def _aplicar_filtros_duros(self, min_monto: Optional[float], max_monto: Optional[float], fecha_inicio: Optional[str], fecha_fin: Optional[str]):
+    def _aplicar_filtros_duros(self, min_monto: Optional[float], max_monto: Optional[float], fecha_inicio: Optional[str], fecha_fin: Optional[str], texto: Optional[str] = None):
         """Aplica los filtros que descartan compras."""
         print("-> Aplicando filtros duros...")
         self.df_procesado = filtrar_por_estado_convocatoria(self.df_procesado)
         print(f"   {len(self.df_procesado)} compras restantes tras filtro de estado.")
+        if texto:
+            self.df_procesado = filtrar_por_texto(self.df_procesado, texto)
+            print(f"   {len(self.df_procesado)} compras restantes tras filtro de texto.")
         self.df_procesado = filtrar_por_monto(self.df_procesado, min_monto, max_monto)
         print(f"   {len(self.df_procesado)} compras restantes tras filtro de monto.")
         self.df_procesado = filtrar_por_fecha(self.df_procesado, fecha_inicio, fecha_fin)
@@ -96,13 +106,13 @@ class FiltradorAvanzado:
         self.df_procesado['motivos_puntuacion'] = motivos_series
         print("   Puntuación calculada.")
 
-    def ejecutar_filtrado(self, keywords: List[str], min_monto: Optional[float] = None, max_monto: Optional[float] = None, fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None, codigo_exacto: Optional[str] = None) -> pd.DataFrame:
+    def ejecutar_filtrado(self, keywords: List[str], min_monto: Optional[float] = None, max_monto: Optional[float] = None, fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None, codigo_exacto: Optional[str] = None, texto: Optional[str] = None) -> pd.DataFrame:
         print("\n===== INICIANDO FILTRADO AVANZADO =====")
         if codigo_exacto:
             print(f"-> Búsqueda directa por código: {codigo_exacto}")
             self.df_procesado = filtrar_por_codigo(self.df_original, codigo_exacto)
         else:
-            self._aplicar_filtros_duros(min_monto, max_monto, fecha_inicio, fecha_fin)
+            self._aplicar_filtros_duros(min_monto, max_monto, fecha_inicio, fecha_fin, texto)
 
         self._enriquecer_datos(keywords)
         self._calcular_puntuacion()
@@ -112,4 +122,25 @@ class FiltradorAvanzado:
         print(f"Resultado: {len(df_final)} compras consideradas relevantes.")
         print("===== FILTRADO AVANZADO COMPLETADO =====\n")
         
-        return df_final.sort_values(by='puntuacion_relevancia', ascending=False)
\ No newline at end of file
+        return df_final.sort_values(by='puntuacion_relevancia', ascending=False)
+
+
+def filtrar_por_lotes(lotes: Iterable[pd.DataFrame], **argumentos) -> pd.DataFrame:
+    """
+    Aplica FiltradorAvanzado lote a lote (p. ej. sobre iterar_dataframes).
+
+    Cada compra se filtra y puntúa sin mirar las demás, así que el resultado es
+    el mismo que filtrar todo junto, pero solo un lote vive en memoria a la vez.
+
+    Args:
+        lotes: DataFrames de compras.
+        **argumentos: Los de FiltradorAvanzado.ejecutar_filtrado.
+
+    Returns:
+        DataFrame con las compras relevantes de todos los lotes, por puntuación.
+    """
+    relevantes = [FiltradorAvanzado(lote).ejecutar_filtrado(**argumentos) for lote in lotes]
+    relevantes = [df for df in relevantes if not df.empty]
+    if not relevantes:
+        return pd.DataFrame()
+    return pd.concat(relevantes).sort_values(by='puntuacion_relevancia', ascending=False, kind='stable')
@@ -17,7 +17,9 @@ def filtrar_por_monto(df: pd.DataFrame, min_monto: Optional[float] = None, max_m
         return pd.DataFrame()
 
     # Asegurarse de que la columna es numérica, convirtiendo errores a NaN
-    df['monto_disponible_CLP'] = pd.to_numeric(df['monto_disponible_CLP'], errors='coerce')
+    # (ya numérica si el DataFrame pasó por normalizar_dataframe)
+    if not pd.api.types.is_numeric_dtype(df['monto_disponible_CLP']):
+        df['monto_disponible_CLP'] = pd.to_numeric(df['monto_disponible_CLP'], errors='coerce')
     
     # Eliminar filas donde el monto es NaN (inválido)
     df_filtrado = df.dropna(subset=['monto_disponible_CLP']).copy()
@@ -44,8 +44,12 @@ def categorizar_organismos(df: pd.DataFrame, organismos_prioritarios: list, cate
                     return categoria, keyword # Retornamos la categoría y la keyword que coincidió
         return None, None
 
-    # Aplicar la función y dividir los resultados en dos nuevas columnas
-    resultados = df_resultado['organismo'].apply(encontrar_categoria)
+    # Una vez por organismo distinto (miles de compras comparten pocos organismos)
+    # y dividir los resultados en dos nuevas columnas
+    categoria_por_organismo = {
+        organismo: encontrar_categoria(organismo) for organismo in df_resultado['organismo'].dropna().unique()
+    }
+    resultados = [categoria_por_organismo.get(organismo, (None, None)) for organismo in df_resultado['organismo']]
     df_resultado['categoria_organismo'] = [res[0] for res in resultados]
     df_resultado['subcategoria_organismo'] = [res[1] for res in resultados]
     
@@ -0,0 +1,188 @@
+"""
+Planificador de consultas del listado.
+
+Traduce a parámetros de la API los filtros que el buscador resuelve (texto,
+región, estado, rango de fechas y orden) para que esas compras ni siquiera se
+descarguen; el resto queda para FiltradorAvanzado / FiltradorCompras.
+El texto se vuelve a filtrar localmente: el parámetro de búsqueda de la API
+es configurable (SEARCH_TEXT_PARAM) y, si no es el correcto, se ignora.
+"""
+import math
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .ID import filtrar_por_codigo
+from .monto import filtrar_por_monto
+from .texto import filtrar_por_texto
+from config.config import (
+    FECHA_SCRAPING,
+    PARAMETRO_TEXTO_BUSQUEDA,
+    ORDENES_API,
+    TAMANO_PAGINA_BASE
+)
+
+# Filtro -> parámetro de la API que lo resuelve en el servidor
+FILTROS_API = {
+    'texto': PARAMETRO_TEXTO_BUSQUEDA,
+    'region': 'region',
+    'estado': 'status',
+    'fecha_inicio': 'date_from',
+    'fecha_fin': 'date_to',
+    'orden': 'order_by',
+}
+
+# Filtros que se evalúan localmente (argumentos de ejecutar_filtrado); 'texto'
+# también va a la API, pero se confirma aquí
+FILTROS_LOCALES = ('keywords', 'min_monto', 'max_monto', 'codigo_exacto', 'texto')
+
+# Parámetros que definen qué se descarga aun sin planificador (la ventana de fechas y el orden)
+PARAMETROS_VENTANA = ('date_from', 'date_to', 'order_by')
+
+
+class PlanConsulta:
+    """
+    Consulta a la API más filtros restantes para aplicar localmente.
+
+    Atributos:
+        parametros: Parámetros para ScraperListado(parametros=...)
+        filtros_locales: Argumentos para FiltradorAvanzado.ejecutar_filtrado
+        empujados: Filtros que resuelve la API
+    """
+    def __init__(self, parametros: Dict, filtros_locales: Dict, empujados: List[str]):
+        self.parametros = parametros
+        self.filtros_locales = filtros_locales
+        self.empujados = empujados
+
+    @property
+    def parametros_sin_pushdown(self) -> Dict:
+        """Consulta que habría que descargar completa para filtrar todo localmente."""
+        return {k: v for k, v in self.parametros.items() if k in PARAMETROS_VENTANA}
+
+    def aplicar_filtros_locales(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplica a lo descargado los filtros locales que descartan compras.
+
+        Texto, montos y código exacto; las keywords solo puntúan y quedan para
+        FiltradorAvanzado.
+
+        Args:
+            df: Compras descargadas con self.parametros.
+
+        Returns:
+            DataFrame con las compras que cumplen los filtros locales.
+        """
+        filtros = self.filtros_locales
+        if filtros.get('codigo_exacto'):
+            return filtrar_por_codigo(df, filtros['codigo_exacto'])
+
+        df = filtrar_por_texto(df, filtros.get('texto'))
+        if filtros.get('min_monto') is not None or filtros.get('max_monto') is not None:
+            df = filtrar_por_monto(df, filtros.get('min_monto'), filtros.get('max_monto'))
+        return df
+
+    def reportar_ahorro(self, consultar_total: Callable[[Dict], Optional[int]],
+                        total_con_pushdown: Optional[int] = None,
+                        tamano_pagina: int = TAMANO_PAGINA_BASE) -> Dict:
+        """
+        Calcula cuántas páginas evitó el pushdown.
+
+        Args:
+            consultar_total: Función parametros -> resultCount de esa consulta.
+            total_con_pushdown: resultCount de la consulta planificada si ya se conoce
+                                (p. ej. ScraperListado.total_resultados tras la corrida).
+            tamano_pagina: Compras por página con que se recorre el listado.
+
+        Returns:
+            Diccionario con los totales y páginas de ambas consultas; None en los
+            valores que no se pudieron consultar.
+        """
+        if total_con_pushdown is None:
+            total_con_pushdown = consultar_total(self.parametros)
+
+        # Sin filtros empujados ambas consultas son la misma
+        if self.parametros_sin_pushdown == self.parametros:
+            total_sin_pushdown = total_con_pushdown
+        else:
+            total_sin_pushdown = consultar_total(self.parametros_sin_pushdown)
+
+        return calcular_paginas_ahorradas(total_sin_pushdown, total_con_pushdown, tamano_pagina)
+
+
+def calcular_paginas_ahorradas(total_sin_pushdown: Optional[int], total_con_pushdown: Optional[int],
+                               tamano_pagina: int = TAMANO_PAGINA_BASE) -> Dict:
+    """
+    Compara las páginas de la consulta completa con las de la consulta planificada.
+
+    Args:
+        total_sin_pushdown: resultCount descargando todo y filtrando localmente.
+        total_con_pushdown: resultCount con los filtros resueltos por la API.
+        tamano_pagina: Compras por página.
+
+    Returns:
+        Diccionario con totales, páginas de cada consulta y páginas ahorradas.
+    """
+    def paginas(total):
+        return None if total is None else math.ceil(total / tamano_pagina)
+
+    paginas_sin, paginas_con = paginas(total_sin_pushdown), paginas(total_con_pushdown)
+
+    return {
+        'total_sin_pushdown': total_sin_pushdown,
+        'total_con_pushdown': total_con_pushdown,
+        'paginas_sin_pushdown': paginas_sin,
+        'paginas_con_pushdown': paginas_con,
+        'paginas_ahorradas': None if None in (paginas_sin, paginas_con) else paginas_sin - paginas_con
+    }
+
+
+def planificar_consulta(**filtros) -> PlanConsulta:
+    """
+    Reparte los filtros entre la consulta a la API y el filtrado local.
+
+    Filtros de la API: texto, region, estado, fecha_inicio, fecha_fin, orden.
+    Filtros locales: keywords (solo puntúan), min_monto, max_monto, codigo_exacto
+    y texto (también en la API, por si esta ignora el parámetro).
+    El código exacto anula los demás filtros (como en FiltradorAvanzado): se busca
+    como texto en la API y se confirma localmente. Un rango con un solo extremo
+    nunca se envía invertido respecto del día por defecto de la API.
+
+    Args:
+        **filtros: Filtros con valor; los None o vacíos se ignoran.
+
+    Returns:
+        PlanConsulta con los parámetros de la API y los filtros restantes.
+
+    Raises:
+        ValueError: Si hay un filtro desconocido o un orden no soportado.
+    """
+    filtros = {k: v for k, v in filtros.items() if v not in (None, '', [])}
+
+    desconocidos = set(filtros) - set(FILTROS_API) - set(FILTROS_LOCALES)
+    if desconocidos:
+        raise ValueError(f"Filtros no soportados: {', '.join(sorted(desconocidos))}")
+
+    if filtros.get('orden') and filtros['orden'] not in ORDENES_API:
+        raise ValueError(f"Orden no soportado: {filtros['orden']} (válidos: {', '.join(ORDENES_API)})")
+
+    if filtros.get('codigo_exacto'):
+        filtros_api = {'texto': filtros['codigo_exacto']}
+        if filtros.get('orden'):
+            filtros_api['orden'] = filtros['orden']
+    else:
+        filtros_api = {k: v for k, v in filtros.items() if k in FILTROS_API}
+
+    parametros = {FILTROS_API[k]: v for k, v in filtros_api.items()}
+
+    # Con un solo extremo del rango, el otro queda en el día anterior (FECHA_SCRAPING);
+    # si eso invierte el rango, la API no devuelve nada: se usa el extremo dado
+    if 'date_to' in parametros and 'date_from' not in parametros and parametros['date_to'] < FECHA_SCRAPING:
+        parametros['date_from'] = parametros['date_to']
+    if 'date_from' in parametros and 'date_to' not in parametros and parametros['date_from'] > FECHA_SCRAPING:
+        parametros['date_to'] = parametros['date_from']
+
+    return PlanConsulta(
+        parametros=parametros,
+        filtros_locales={'keywords': [], **{k: v for k, v in filtros.items() if k in FILTROS_LOCALES}},
+        empujados=[k for k in filtros_api if k != 'orden']
+    )
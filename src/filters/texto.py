@@ -0,0 +1,33 @@
+import pandas as pd
+from typing import Optional
+
+from .keywords_filters import normalizar_texto
+
+def filtrar_por_texto(df: pd.DataFrame, texto: Optional[str] = None) -> pd.DataFrame:
+    """
+    Conserva las compras cuyo 'nombre' contiene todas las palabras del texto.
+
+    Es la misma búsqueda que se le pide al buscador, repetida localmente: si la
+    API no reconoce el parámetro de texto, las compras que no coinciden se
+    descartan aquí. No distingue mayúsculas ni tildes.
+
+    Args:
+        df: DataFrame de pandas con los datos de las compras.
+        texto: Texto buscado. Si es None o vacío, no se filtra.
+
+    Returns:
+        DataFrame de pandas con las compras que contienen el texto.
+    """
+    palabras = normalizar_texto(texto).split() if texto else []
+    if not palabras:
+        return df
+
+    if 'nombre' not in df.columns:
+        return pd.DataFrame()
+
+    nombres = df['nombre'].map(normalizar_texto)
+    coincide = pd.Series(True, index=df.index)
+    for palabra in palabras:
+        coincide &= nombres.str.contains(palabra, regex=False)
+
+    return df[coincide].copy()
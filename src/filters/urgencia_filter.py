@@ -26,12 +26,15 @@ def aplicar_criterio_urgencia(df: pd.DataFrame) -> pd.DataFrame:
 
     # --- Procesamiento de datos ---
     # Convertir 'cantidad_provedores_cotizando' a numérico, errores a NaN y luego rellenar con 0
-    df_resultado['cantidad_provedores_cotizando'] = pd.to_numeric(
-        df_resultado['cantidad_provedores_cotizando'], errors='coerce'
-    ).fillna(0).astype(int)
+    # (las columnas ya vienen tipadas si el DataFrame pasó por normalizar_dataframe)
+    proveedores = df_resultado['cantidad_provedores_cotizando']
+    if not pd.api.types.is_numeric_dtype(proveedores):
+        proveedores = pd.to_numeric(proveedores, errors='coerce')
+    df_resultado['cantidad_provedores_cotizando'] = proveedores.fillna(0).astype(int)
 
     # Convertir 'fecha_cierre' a datetime, errores resultarán en NaT
-    df_resultado['fecha_cierre'] = pd.to_datetime(df_resultado['fecha_cierre'], errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(df_resultado['fecha_cierre']):
+        df_resultado['fecha_cierre'] = pd.to_datetime(df_resultado['fecha_cierre'], errors='coerce')
 
     # --- Lógica de la alerta ---
     ahora = datetime.now()
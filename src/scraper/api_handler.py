@@ -2,17 +2,41 @@
 Manejador de respuestas de la API de Mercado Público
 Intercepta y procesa respuestas JSON
 """
-from playwright.sync_api import Response
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+from playwright.sync_api import Response, TimeoutError as PlaywrightTimeoutError
 from .utilidades.helpers import validar_respuesta_api
+from ..storage.normalizacion import internar_compras
+from config.config import TIMEOUT_CAPTURA_API
+
+
+# Fragmentos de URL que identifican cada tipo de respuesta
+URL_API_LISTADO = 'api.buscador.mercadopublico.cl/compra-agil'
+
+# Parámetros de URL que pueden traer el número de página o el código
+PARAMETROS_PAGINA = ('page_number', 'page', 'pageNumber')
+PARAMETROS_CODIGO = ('code', 'codigo')
+
+# Tramo máximo (segundos) de cada espera por eventos de respuesta
+INTERVALO_ESPERA = 0.5
+
+# Respuestas capturadas que nadie reclamó y se conservan como máximo
+MAX_RESPUESTAS_PENDIENTES = 100
 
 
 class ManejadorAPI:
     """
     Clase para interceptar y procesar respuestas de la API
     
+    Las respuestas se guardan por clave ('listado', numero_pagina),
+    ('ficha', codigo) o ('historial', codigo), de modo que varias páginas
+    o pestañas en vuelo no se pisan entre sí.
+    
     Atributos:
         logger: Logger para registrar eventos
-        datos_respuesta_actual: Última respuesta capturada
+        datos_respuesta_actual: Última respuesta de listado capturada
+        respuestas: Respuestas capturadas pendientes, por clave
     """
     
     def __init__(self, logger):
@@ -21,32 +45,140 @@ class ManejadorAPI:
     
         self.logger = logger
         self.datos_respuesta_actual = None
+        self.respuestas = {}
+        self._lock = threading.Lock()
+    
+    def clasificar_url(self, url):
+        
+        #Retorna el tipo de respuesta ('listado', 'ficha', 'historial') o None
+        
+        if 'action=ficha' in url:
+            return 'ficha'
+        if 'action=historial' in url:
+            return 'historial'
+        if URL_API_LISTADO in url:
+            return 'listado'
+        return None
+    
+    def extraer_clave(self, url, datos_json=None):
+        
+        #Calcula la clave de una respuesta a partir de su URL
+        #Para el listado, si la URL no trae la página se usa payload.page
+        
+        tipo = self.clasificar_url(url) or 'listado'
+        parametros = parse_qs(urlparse(url).query)
+        nombres = PARAMETROS_PAGINA if tipo == 'listado' else PARAMETROS_CODIGO
+        
+        valor = next((parametros[n][0] for n in nombres if n in parametros), None)
+        
+        if tipo == 'listado':
+            if valor is None and isinstance(datos_json, dict):
+                valor = (datos_json.get('payload') or {}).get('page')
+            try:
+                valor = int(valor) if valor is not None else None
+            except (TypeError, ValueError):
+                valor = None
+        
+        return (tipo, valor)
     
     def interceptar_respuesta(self, response: Response):
         
         #Intercepta respuestas de la API (callback de Playwright)
-        #Solo procesa respuestas de la API de compra-agil
+        #Solo procesa respuestas de listado, ficha e historial
 
         url = response.url # Obtener URL de la respuesta
         
-        # Solo procesar respuestas de la API de compra-agil
-        if 'api.buscador.mercadopublico.cl/compra-agil' not in url:
+        # Solo procesar respuestas de la API
+        if self.clasificar_url(url) is None:
             return
         
         try:
             # Intentar parsear como JSON
             datos_json = response.json()
-            
-            # Validar estructura
-            if validar_respuesta_api(datos_json):
-                self.datos_respuesta_actual = datos_json
-                self.logger.debug("Respuesta API capturada exitosamente")
-            else:
-                self.logger.warning(f"Respuesta con estructura inválida desde: {url}")
+            self.registrar_respuesta(datos_json, url)
                 
         except Exception as e:
             self.logger.error(f"ERROR al parsear respuesta JSON: {e}")
     
+    def registrar_respuesta(self, datos_json, url=''):
+        
+        #Valida y guarda una respuesta JSON ya obtenida (navegador o cliente HTTP)
+        #Retorna True si quedó registrada
+        
+        tipo = self.clasificar_url(url) or 'listado'
+        
+        if tipo == 'listado':
+            valida = validar_respuesta_api(datos_json)
+        else:
+            valida = isinstance(datos_json, dict) and datos_json.get('success') == 'OK'
+        
+        if not valida:
+            self.logger.warning(f"Respuesta con estructura inválida desde: {url}")
+            return False
+        
+        clave = self.extraer_clave(url, datos_json)
+        
+        with self._lock:
+            if tipo == 'listado':
+                self.datos_respuesta_actual = datos_json
+            
+            self.respuestas[clave] = datos_json
+            
+            # Descartar las más antiguas si nadie las reclama
+            while len(self.respuestas) > MAX_RESPUESTAS_PENDIENTES:
+                self.respuestas.pop(next(iter(self.respuestas)))
+        
+        self.logger.debug(f"Respuesta API capturada exitosamente: {clave}")
+        return True
+    
+    def tomar_respuesta(self, clave):
+        
+        #Retira y retorna la respuesta capturada para la clave (o None)
+        #Si la URL no traía página/código, acepta la respuesta sin clave del mismo tipo
+        
+        with self._lock:
+            if clave in self.respuestas:
+                return self.respuestas.pop(clave)
+            return self.respuestas.pop((clave[0], None), None)
+    
+    def descartar_respuesta(self, clave):
+        """Elimina una respuesta pendiente (p.ej. antes de volver a navegar)"""
+        with self._lock:
+            self.respuestas.pop(clave, None)
+            self.respuestas.pop((clave[0], None), None)
+    
+    def esperar_respuesta(self, page, clave, timeout=TIMEOUT_CAPTURA_API):
+        
+        #Espera la respuesta de la clave indicada y retorna apenas llega
+        #Bombea eventos de Playwright hasta que aparece o vence el timeout (segundos)
+        #Retorna: JSON de la respuesta o None
+        
+        tipo = clave[0]
+        limite = time.monotonic() + timeout
+        
+        def es_del_tipo(response):
+            return self.clasificar_url(response.url) == tipo
+        
+        while True:
+            datos = self.tomar_respuesta(clave)
+            if datos is not None:
+                return datos
+            
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return None
+            
+            # Despierta con cada respuesta del mismo tipo. La espera se corta en
+            # tramos cortos por si el callback termina de registrar después del evento
+            try:
+                page.wait_for_event(
+                    'response',
+                    predicate=es_del_tipo,
+                    timeout=min(restante, INTERVALO_ESPERA) * 1000
+                )
+            except PlaywrightTimeoutError:
+                continue
+    
     def obtener_respuesta_actual(self):
         
         #Obtiene la última respuesta capturada
@@ -63,23 +195,27 @@ class ManejadorAPI:
         """
         return self.datos_respuesta_actual is not None
     
-    def extraer_resultados(self):
+    def extraer_resultados(self, datos=None):
         """
         Extrae lista de resultados de la respuesta actual
+        (o de la respuesta entregada en datos)
         Lista de compras o lista vacía
         """
-        if not self.datos_respuesta_actual:
+        datos = datos if datos is not None else self.datos_respuesta_actual
+        if not datos:
             return []
         
         try:
-            return self.datos_respuesta_actual['payload']['resultados']
+            # Organismo/región compartidos entre compras (sys.intern) desde el ingreso
+            return internar_compras(datos['payload']['resultados'])
         except (KeyError, TypeError) as e:
             self.logger.error(f"ERROR al extraer resultados: {e}")
             return []
     
-    def extraer_metadata_paginacion(self):
+    def extraer_metadata_paginacion(self, datos=None):
         
-        #Extrae información de paginación de la respuesta
+        #Extrae información de paginación de la respuesta actual (o de datos)
+        datos = datos if datos is not None else self.datos_respuesta_actual
         metadata_default = {
             'resultCount': 0,
             'pageCount': 0,
@@ -87,11 +223,11 @@ class ManejadorAPI:
             'pageSize': 0
         }
         
-        if not self.datos_respuesta_actual:
+        if not datos:
             return metadata_default
         
         try:
-            payload = self.datos_respuesta_actual['payload']
+            payload = datos['payload']
             
             return {
                 'resultCount': payload.get('resultCount', 0),
@@ -0,0 +1,231 @@
+"""
+Backfill de rangos de fechas en paralelo
+Divide el rango en fragmentos por día (o por N días), los scrapea en procesos
+trabajadores, registra los fragmentos completos y fusiona sin duplicados
+"""
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from .list_scraper import ScraperListado
+from .utilidades.logger import configurar_logger
+from .utilidades.helpers import guardar_json, cargar_json, obtener_timestamp, deduplicar_compras
+from config.config import (
+    MODO_SCRAPING,
+    BACKFILL_PROCESOS,
+    BACKFILL_DIAS_POR_FRAGMENTO,
+    DIRECTORIO_BACKFILL
+)
+
+
+def generar_fragmentos(fecha_desde, fecha_hasta, dias_por_fragmento=1):
+    """
+    Divide un rango de fechas en fragmentos consecutivos
+
+    Args:
+        fecha_desde: Fecha inicial 'YYYY-MM-DD' (incluida)
+        fecha_hasta: Fecha final 'YYYY-MM-DD' (incluida)
+        dias_por_fragmento: Días que cubre cada fragmento
+
+    Returns:
+        list: Tuplas (desde, hasta) en formato 'YYYY-MM-DD'
+    """
+    inicio = date.fromisoformat(fecha_desde)
+    fin = date.fromisoformat(fecha_hasta)
+
+    if fin < inicio:
+        raise ValueError(f"Rango de fechas inválido: {fecha_desde} > {fecha_hasta}")
+
+    dias_por_fragmento = max(1, dias_por_fragmento)
+    fragmentos = []
+
+    while inicio <= fin:
+        hasta = min(fin, inicio + timedelta(days=dias_por_fragmento - 1))
+        fragmentos.append((inicio.isoformat(), hasta.isoformat()))
+        inicio = hasta + timedelta(days=1)
+
+    return fragmentos
+
+
+def _ejecutar_fragmento(argumentos):
+
+    #Punto de entrada de cada proceso: scrapea un fragmento y guarda su archivo
+    #El checkpoint por página permite retomar el fragmento si se corta
+
+    desde, hasta, parametros, modo, directorio = argumentos
+
+    scraper = ScraperListado(
+        modo=modo,
+        parametros={**parametros, 'date_from': desde, 'date_to': hasta}
+    )
+    compras, _ = scraper.ejecutar(guardar=False, reanudar=True)
+
+    archivo = guardar_json(compras, f"{desde}_{hasta}.json", directorio)
+    reporte = scraper.reporte_completitud or {}
+
+    return {
+        'desde': desde,
+        'hasta': hasta,
+        'archivo': str(archivo),
+        'compras': len(compras),
+        'compras_esperadas': reporte.get('compras_esperadas'),
+        'completo': bool(reporte) and not reporte.get('paginas_fallidas')
+    }
+
+
+class BackfillListado:
+    """
+    Backfill de un rango de fechas repartido en fragmentos y procesos
+
+    Atributos:
+        fecha_desde / fecha_hasta: Rango a cubrir (incluido)
+        fragmentos: Tuplas (desde, hasta) de cada fragmento
+        directorio: Carpeta con un JSON por fragmento y el manifiesto
+        manifiesto: Diccionario 'desde_hasta' -> resumen del fragmento
+    """
+
+    def __init__(self, fecha_desde, fecha_hasta, procesos=BACKFILL_PROCESOS,
+                 dias_por_fragmento=BACKFILL_DIAS_POR_FRAGMENTO, modo=MODO_SCRAPING,
+                 parametros=None):
+        self.fecha_desde = fecha_desde
+        self.fecha_hasta = fecha_hasta
+        self.procesos = max(1, procesos)
+        self.modo = modo
+        self.parametros = dict(parametros or {})
+        self.fragmentos = generar_fragmentos(fecha_desde, fecha_hasta, dias_por_fragmento)
+
+        # Un directorio por rango y parámetros: re-ejecutar lo mismo reutiliza el manifiesto
+        firma = json.dumps([dias_por_fragmento, self.parametros], sort_keys=True)
+        clave = hashlib.sha1(firma.encode('utf-8')).hexdigest()[:8]
+        self.directorio = DIRECTORIO_BACKFILL / f"{fecha_desde}_{fecha_hasta}_{clave}"
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.ruta_manifiesto = self.directorio / 'manifiesto.json'
+
+        nombre_log = f'backfill_{datetime.now().strftime("%Y%m%d")}.log'
+        self.logger = configurar_logger('backfill', nombre_log)
+
+        self.manifiesto = self._cargar_manifiesto()
+
+    # ============================================
+    # MANIFIESTO DE FRAGMENTOS
+    # ============================================
+
+    def _cargar_manifiesto(self):
+        if not self.ruta_manifiesto.exists():
+            return {}
+        return cargar_json(self.ruta_manifiesto)
+
+    def _guardar_manifiesto(self):
+        with open(self.ruta_manifiesto, 'w', encoding='utf-8') as archivo:
+            json.dump(self.manifiesto, archivo, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _id_fragmento(desde, hasta):
+        return f"{desde}_{hasta}"
+
+    def fragmentos_pendientes(self):
+        """
+        Fragmentos sin completar en corridas anteriores
+
+        Returns:
+            list: Tuplas (desde, hasta) pendientes
+        """
+        return [
+            (desde, hasta) for desde, hasta in self.fragmentos
+            if not self.manifiesto.get(self._id_fragmento(desde, hasta), {}).get('completo')
+        ]
+
+    def _registrar_fragmento(self, resumen):
+        self.manifiesto[self._id_fragmento(resumen['desde'], resumen['hasta'])] = resumen
+        self._guardar_manifiesto()
+
+        estado = "completo" if resumen['completo'] else "INCOMPLETO"
+        self.logger.info(
+            f"Fragmento {resumen['desde']}..{resumen['hasta']} {estado}: "
+            f"{resumen['compras']}/{resumen['compras_esperadas']} compras"
+        )
+
+    # ============================================
+    # EJECUCIÓN
+    # ============================================
+
+    def scrapear_fragmentos(self):
+
+        #Scrapea los fragmentos pendientes (en procesos si procesos > 1)
+
+        pendientes = self.fragmentos_pendientes()
+
+        self.logger.info("=" * 60)
+        self.logger.info(f"BACKFILL {self.fecha_desde} .. {self.fecha_hasta}")
+        self.logger.info(
+            f"Fragmentos: {len(self.fragmentos)} | Pendientes: {len(pendientes)} | "
+            f"Procesos: {self.procesos}"
+        )
+        self.logger.info("=" * 60)
+
+        argumentos = [
+            (desde, hasta, self.parametros, self.modo, self.directorio)
+            for desde, hasta in pendientes
+        ]
+
+        if self.procesos == 1 or len(argumentos) <= 1:
+            for argumento in argumentos:
+                desde, hasta = argumento[:2]
+                try:
+                    self._registrar_fragmento(_ejecutar_fragmento(argumento))
+                except Exception as e:
+                    self.logger.error(f"ERROR en fragmento {desde}..{hasta}: {e}")
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.procesos, len(argumentos))) as executor:
+            futuros = {
+                executor.submit(_ejecutar_fragmento, argumento): argumento
+                for argumento in argumentos
+            }
+            for futuro in as_completed(futuros):
+                desde, hasta = futuros[futuro][:2]
+                try:
+                    self._registrar_fragmento(futuro.result())
+                except Exception as e:
+                    self.logger.error(f"ERROR en fragmento {desde}..{hasta}: {e}")
+
+    def fusionar(self):
+
+        #Une los archivos de los fragmentos en orden de fecha y quita duplicados por id
+        #Retorna: Lista de compras
+
+        compras = []
+        for desde, hasta in self.fragmentos:
+            resumen = self.manifiesto.get(self._id_fragmento(desde, hasta))
+            if resumen:
+                compras.extend(cargar_json(resumen['archivo']))
+
+        unicas = deduplicar_compras(compras)
+        self.logger.info(
+            f"Fusión: {len(compras)} compras, {len(compras) - len(unicas)} duplicadas, "
+            f"{len(unicas)} únicas"
+        )
+        return unicas
+
+    def ejecutar(self, guardar=True):
+
+        #Ejecuta el backfill completo
+        #Retorna: (compras, ruta del archivo fusionado o None, fragmentos incompletos)
+
+        self.scrapear_fragmentos()
+        compras = self.fusionar()
+
+        incompletos = self.fragmentos_pendientes()
+        if incompletos:
+            self.logger.warning(
+                f"{len(incompletos)} fragmentos incompletos; vuelve a ejecutar para completarlos: "
+                f"{incompletos}"
+            )
+
+        ruta = None
+        if guardar and compras:
+            nombre = f"compras_backfill_{self.fecha_desde}_{self.fecha_hasta}_{obtener_timestamp()}.json"
+            ruta = str(guardar_json(compras, nombre))
+            self.logger.info(f"Backfill guardado en: {ruta}")
+
+        return compras, ruta, incompletos
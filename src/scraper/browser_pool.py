@@ -0,0 +1,350 @@
+"""
+Pool de trabajadores Playwright para el camino con navegador
+Un único lanzamiento de Chromium con N páginas (o contextos) que consumen
+números de página o códigos desde una cola compartida
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from playwright.async_api import async_playwright
+from .url_builder import construir_url_listado, construir_url_ficha
+from .enrutador import EnrutadorRecursos
+from .utilidades.helpers import validar_respuesta_api
+from .utilidades.stats import EstadisticasScraper
+from .utilidades.limitador import obtener_limitador
+from .utilidades.logger import configurar_logger
+from config.config import (
+    URL_BASE_API,
+    MODO_HEADLESS,
+    TIMEOUT_REQUESTS,
+    TIMEOUT_CAPTURA_API,
+    TIMEOUT_CAPTURA_HISTORIAL,
+    USER_AGENT,
+    POOL_NAVEGADOR_TAMANO,
+    POOL_NAVEGADOR_AISLAMIENTO,
+    POOL_NAVEGADOR_PAUSA,
+    POOL_NAVEGADOR_SLOW_MO,
+    BLOQUEO_RECURSOS_ACTIVO
+)
+
+
+class PoolNavegador:
+    """
+    Pool de páginas Playwright sobre un event loop propio
+
+    Se usa como context manager. Los métodos procesar/procesar_lote son
+    síncronos y seguros entre hilos: cada tarea toma una página libre del
+    pool, la usa y la devuelve.
+
+    Atributos:
+        logger: Logger para registrar eventos
+        tamano: Cantidad de trabajadores (páginas o contextos)
+        aislamiento: 'paginas' (un contexto compartido) o 'contextos'
+        pausa: Segundos que cada trabajador espera tras cada navegación (sin limitador)
+        limitador: LimitadorTasa compartido que regula las navegaciones (o None)
+        enrutador: EnrutadorRecursos instalado en cada contexto (o None)
+    """
+
+    def __init__(self, logger, tamano=POOL_NAVEGADOR_TAMANO,
+                 aislamiento=POOL_NAVEGADOR_AISLAMIENTO, pausa=POOL_NAVEGADOR_PAUSA,
+                 slow_mo=POOL_NAVEGADOR_SLOW_MO, estadisticas=None, limitador=None):
+        if aislamiento not in ('paginas', 'contextos'):
+            raise ValueError(f"Aislamiento de pool inválido: {aislamiento}")
+
+        self.logger = logger
+        self.tamano = max(1, tamano)
+        self.aislamiento = aislamiento
+        self.pausa = pausa
+        self.slow_mo = slow_mo
+        self.estadisticas = estadisticas or EstadisticasScraper()
+
+        # Con limitador activo la pausa fija no se aplica
+        self.limitador = limitador if limitador and limitador.activo else None
+
+        self.enrutador = None
+        if BLOQUEO_RECURSOS_ACTIVO:
+            self.enrutador = EnrutadorRecursos(logger, self.estadisticas)
+
+        self._loop = None
+        self._hilo = None
+        self._playwright = None
+        self._browser = None
+        self._contextos = []
+        self._paginas_libres = None
+
+    # ============================================
+    # CICLO DE VIDA
+    # ============================================
+
+    def __enter__(self):
+        # Event loop dedicado en un hilo para poder usarlo desde código síncrono
+        self._loop = asyncio.new_event_loop()
+        self._hilo = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._hilo.start()
+
+        try:
+            self._ejecutar_en_loop(self._iniciar())
+        except Exception:
+            # Falló el lanzamiento: se cierra lo que alcanzó a abrirse y se
+            # detiene el loop (__exit__ no se llama si __enter__ falla)
+            try:
+                self._ejecutar_en_loop(self._cerrar())
+            except Exception as e:
+                self.logger.debug(f"Error al cerrar pool no iniciado: {e}")
+            finally:
+                self._detener_loop()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._ejecutar_en_loop(self._cerrar())
+        finally:
+            self._detener_loop()
+
+    def _detener_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._hilo.join()
+        self._loop.close()
+
+    def _ejecutar_en_loop(self, corrutina):
+        return asyncio.run_coroutine_threadsafe(corrutina, self._loop).result()
+
+    async def _iniciar(self):
+        self.logger.info(
+            f"Iniciando pool de navegador: {self.tamano} {self.aislamiento}"
+        )
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=MODO_HEADLESS,
+            slow_mo=self.slow_mo
+        )
+
+        self._paginas_libres = asyncio.Queue()
+        cantidad_contextos = self.tamano if self.aislamiento == 'contextos' else 1
+
+        for _ in range(cantidad_contextos):
+            contexto = await self._browser.new_context(
+                user_agent=USER_AGENT,
+                viewport={'width': 1920, 'height': 1080},
+                locale='es-CL'
+            )
+            if self.enrutador:
+                await self.enrutador.instalar_async(contexto)
+            self._contextos.append(contexto)
+
+        for indice in range(self.tamano):
+            contexto = self._contextos[indice % cantidad_contextos]
+            self._paginas_libres.put_nowait(await contexto.new_page())
+
+    async def _cerrar(self):
+        for contexto in self._contextos:
+            await contexto.close()
+        if self._browser:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+        self.logger.info("Pool de navegador cerrado")
+
+    # ============================================
+    # EJECUCIÓN DE TAREAS
+    # ============================================
+
+    async def _procesar_uno(self, item, tarea):
+        page = await self._paginas_libres.get()
+        error = None
+        inicio = time.time()
+        try:
+            if self.limitador:
+                # adquirir bloquea: se espera fuera del event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.limitador.adquirir)
+            inicio = time.time()
+
+            resultado = await tarea(page, item)
+            if resultado is None:
+                error = 'timeout'
+            return resultado
+        except Exception as e:
+            error = e
+            self.logger.error(f"ERROR en trabajador del pool ({item}): {e}")
+            return None
+        finally:
+            if self.limitador:
+                self.limitador.registrar_resultado(
+                    time.time() - inicio, error, estadisticas=self.estadisticas
+                )
+            elif self.pausa:
+                await asyncio.sleep(self.pausa)
+            self._paginas_libres.put_nowait(page)
+
+    async def _procesar_cola(self, items, tarea):
+        cola = asyncio.Queue()
+        for item in items:
+            cola.put_nowait(item)
+
+        resultados = {}
+
+        async def trabajador():
+            while not cola.empty():
+                item = cola.get_nowait()
+                resultados[item] = await self._procesar_uno(item, tarea)
+
+        await asyncio.gather(*(trabajador() for _ in range(self.tamano)))
+        return resultados
+
+    def procesar(self, item, tarea):
+
+        #Ejecuta tarea(page, item) en la próxima página libre
+        #Retorna: Resultado de la tarea o None si falla
+
+        return self._ejecutar_en_loop(self._procesar_uno(item, tarea))
+
+    def procesar_lote(self, items, tarea):
+
+        #Reparte items entre todos los trabajadores desde una cola compartida
+        #Retorna: Diccionario item -> resultado
+
+        return self._ejecutar_en_loop(self._procesar_cola(list(items), tarea))
+
+
+# ============================================
+# TAREAS DE CAPTURA (una captura por trabajador)
+# ============================================
+
+async def navegar_y_capturar(page, url, patrones, wait_until='commit', timeout=TIMEOUT_CAPTURA_API,
+                             opcionales=(), timeout_opcional=TIMEOUT_CAPTURA_HISTORIAL):
+
+    #Navega a url y captura las respuestas JSON cuya URL contiene cada patrón
+    #No espera a que la red quede inactiva: retorna apenas cada patrón tiene
+    #un JSON capturado, o al vencer el timeout (segundos) con lo que haya
+    #opcionales: patrones que pueden no llegar; tras los obligatorios se
+    #esperan a lo más timeout_opcional (si un obligatorio no llegó, no se esperan)
+    #La captura vive solo durante esta navegación y en esta página
+    #Retorna: Diccionario patron -> lista de JSON capturados
+
+    todos = list(patrones) + list(opcionales)
+    capturas = {patron: [] for patron in todos}
+    recibidos = {patron: asyncio.Event() for patron in todos}
+    lecturas = []
+
+    async def leer(patron, response):
+        try:
+            datos = await response.json()
+        except Exception:
+            return
+        if isinstance(datos, dict):
+            capturas[patron].append(datos)
+            recibidos[patron].set()
+
+    def al_responder(response):
+        for patron in todos:
+            if patron in response.url:
+                lecturas.append(asyncio.ensure_future(leer(patron, response)))
+
+    async def esperar(grupo, limite):
+        await asyncio.wait_for(
+            asyncio.gather(*(recibidos[patron].wait() for patron in grupo)),
+            timeout=limite
+        )
+
+    page.on('response', al_responder)
+    try:
+        await page.goto(url, timeout=TIMEOUT_REQUESTS * 1000, wait_until=wait_until)
+        await esperar(patrones, timeout)
+        if opcionales:
+            await esperar(opcionales, timeout_opcional)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        page.remove_listener('response', al_responder)
+        for lectura in lecturas:
+            lectura.cancel()
+
+    return capturas
+
+
+async def capturar_listado(page, numero_pagina, parametros=None):
+
+    #Tarea de pool: JSON de una página del listado o None
+    #parametros: reemplazos de la consulta (usar functools.partial para fijarlos)
+
+    capturas = await navegar_y_capturar(
+        page, construir_url_listado(numero_pagina, parametros), [URL_BASE_API]
+    )
+
+    for datos in capturas[URL_BASE_API]:
+        if validar_respuesta_api(datos):
+            return datos
+
+    return None
+
+
+async def capturar_detalle(page, codigo_compra):
+
+    #Tarea de pool: payloads de ficha e historial de una compra
+    #El historial no siempre existe: se espera TIMEOUT_CAPTURA_HISTORIAL tras la ficha
+    #Retorna: {'ficha': ..., 'historial': ...} o None si no hubo ficha
+
+    capturas = await navegar_y_capturar(
+        page, construir_url_ficha(codigo_compra), ['action=ficha'],
+        opcionales=['action=historial'], timeout_opcional=TIMEOUT_CAPTURA_HISTORIAL
+    )
+
+    def primer_payload(patron):
+        for datos in capturas[patron]:
+            if datos.get('success') == 'OK':
+                return datos.get('payload')
+        return None
+
+    ficha = primer_payload('action=ficha')
+    if not ficha:
+        return None
+
+    return {
+        'ficha': ficha,
+        'historial': primer_payload('action=historial') or []
+    }
+
+
+# ============================================
+# VARIOS PROCESOS DE NAVEGADOR
+# ============================================
+
+def _iniciar_proceso():
+
+    #Inicializador de cada proceso: el logger del proceso hijo no hereda
+    #los handlers del padre (spawn), así que se configura aquí
+    configurar_logger('pool_navegador')
+
+
+def _procesar_en_proceso(argumentos):
+
+    #Punto de entrada de cada proceso: su propio navegador y su propio pool
+    #El ritmo se coordina con los demás procesos mediante el limitador compartido
+
+    items, tarea = argumentos
+    logger = logging.getLogger('pool_navegador')
+
+    with PoolNavegador(logger, limitador=obtener_limitador()) as pool:
+        return pool.procesar_lote(items, tarea)
+
+
+def procesar_en_procesos(items, tarea, procesos):
+
+    #Reparte items entre varios procesos, cada uno con un navegador y un pool
+    #tarea debe ser una corrutina de nivel de módulo (capturar_listado, capturar_detalle)
+    #o un functools.partial de una de ellas
+    #Retorna: Diccionario item -> resultado
+
+    items = list(items)
+    procesos = max(1, min(procesos, len(items)))
+    grupos = [(items[i::procesos], tarea) for i in range(procesos)]
+
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso) as executor:
+        for parcial in executor.map(_procesar_en_proceso, grupos):
+            resultados.update(parcial)
+
+    return resultados
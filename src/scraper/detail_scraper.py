@@ -2,19 +2,34 @@
 Scraper de detalles de fichas individuales
 Extrae información completa de cada compra ágil
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from playwright.sync_api import Page, Response
 from .utilidades.logger import configurar_logger
 from .utilidades.helpers import (
     guardar_json,
-    obtener_timestamp,
-    aplicar_delay
+    obtener_timestamp
 )
 from .utilidades.stats import EstadisticasScraper
+from .utilidades.limitador import obtener_limitador
+from .utilidades.reintentos import ColaReintentos
+from .utilidades.checkpoint import GestorCheckpoint
+from .utilidades.cache_detalles import CacheDetalles
 from .url_builder import construir_url_ficha
+from .api_handler import ManejadorAPI
+from .enrutador import EnrutadorRecursos
+from .browser_pool import PoolNavegador, capturar_detalle, procesar_en_procesos
+from .http_client import ClienteAPI
+from ..storage.base_datos import AlmacenCompras
 from config.config import (
-    DELAY_ENTRE_REQUESTS,
-    TIMEOUT_REQUESTS
+    TIMEOUT_REQUESTS,
+    TIMEOUT_CAPTURA_HISTORIAL,
+    POOL_NAVEGADOR_PROCESOS,
+    BLOQUEO_RECURSOS_ACTIVO,
+    HTTP_POOL_CONEXIONES,
+    CONCURRENCIA_DETALLES,
+    CACHE_DETALLES_ACTIVO,
+    BASE_DATOS_ACTIVA
 )
 
 
@@ -24,7 +39,8 @@ class ScraperDetalles:
     
     
     
-    def __init__(self):
+    def __init__(self, limitador=None, cache=None, usar_cache=CACHE_DETALLES_ACTIVO,
+                 base_datos=BASE_DATOS_ACTIVA):
         #Inicializa el scraper de detalles
         # Logger con archivo por fecha
         nombre_log = f'scraper_detalles_{datetime.now().strftime("%Y%m%d")}.log'
@@ -33,34 +49,43 @@ class ScraperDetalles:
         # Estadísticas
         self.estadisticas = EstadisticasScraper()
         
+        # Ritmo de solicitudes compartido con el listado y otros procesos
+        self.limitador = limitador or obtener_limitador()
+        
+        # Captura por clave (ficha/historial de cada código)
+        self.manejador_api = ManejadorAPI(self.logger)
+        
         # Variables para datos capturados
         self.datos_ficha_actual = None
         self.datos_historial_actual = None
+        
+        # Checkpoint de la última corrida de scrapear_multiples_detalles
+        self.checkpoint = None
+        
+        # Caché en disco entre corridas: evita volver a pedir fichas que no cambiaron
+        if cache is None and usar_cache:
+            cache = CacheDetalles()
+        self.cache = cache
+        
+        # Fichas e historial también en la base de datos al guardar resultados
+        self.base_datos = base_datos
     
-    def interceptar_respuesta(self, response: Response):
+    def configurar_pagina(self, page: Page):
         
-        #Handler para interceptar respuestas de APIs de ficha e historial
+        #Conecta la captura de ficha/historial a la página
+        #Con bloqueo activo, solo las respuestas de la API pasan por Python
         
+        if BLOQUEO_RECURSOS_ACTIVO:
+            EnrutadorRecursos(self.logger, self.estadisticas, self.interceptar_respuesta).instalar(page)
+        else:
+            page.on('response', self.interceptar_respuesta)
+    
+    def interceptar_respuesta(self, response: Response):
         
-        url = response.url
+        #Handler para interceptar respuestas de APIs de ficha e historial
+        #Las guarda por código para que varias fichas en vuelo no se mezclen
         
-        try:
-            # Capturar respuesta de ficha
-            if 'action=ficha' in url:
-                datos = response.json()
-                if datos.get('success') == 'OK':
-                    self.datos_ficha_actual = datos.get('payload')
-                    self.logger.debug("Ficha capturada")
-            
-            # Capturar respuesta de historial
-            elif 'action=historial' in url:
-                datos = response.json()
-                if datos.get('success') == 'OK':
-                    self.datos_historial_actual = datos.get('payload')
-                    self.logger.debug("Historial capturado")
-                    
-        except Exception as e:
-            self.logger.error(f"ERROR al parsear respuesta: {e}")
+        self.manejador_api.interceptar_respuesta(response)
     
     def scrapear_detalle_individual(self, page: Page, codigo_compra):
         
@@ -71,6 +96,8 @@ class ScraperDetalles:
             # Resetear datos capturados
             self.datos_ficha_actual = None
             self.datos_historial_actual = None
+            self.manejador_api.descartar_respuesta(('ficha', codigo_compra))
+            self.manejador_api.descartar_respuesta(('historial', codigo_compra))
             
             # Construir URL
             url_ficha = construir_url_ficha(codigo_compra)
@@ -78,25 +105,32 @@ class ScraperDetalles:
             # Log de navegación
             self.logger.info(f"Obteniendo detalle: {codigo_compra}")
             
-            # Navegar a la ficha
-            page.goto(url_ficha, timeout=TIMEOUT_REQUESTS * 1000, wait_until='networkidle')
-            
-            # Esperar carga de APIs
-            page.wait_for_timeout(3000)
+            with self.limitador.turno(self.estadisticas) as turno:
+                # Navegar a la ficha (la SPA pide ficha e historial después del DOM)
+                page.goto(url_ficha, timeout=TIMEOUT_REQUESTS * 1000, wait_until='domcontentloaded')
+                
+                # Esperar exactamente las respuestas de este código
+                datos_ficha = self.manejador_api.esperar_respuesta(page, ('ficha', codigo_compra))
+                if not datos_ficha:
+                    turno.fallar('timeout')
             
             # Validar captura de ficha
-            if not self.datos_ficha_actual:
+            if not datos_ficha:
                 self.logger.warning(f"No se capturó ficha: {codigo_compra}")
                 self.estadisticas.incrementar_errores()
                 return None
             
+            datos_historial = self.manejador_api.esperar_respuesta(
+                page, ('historial', codigo_compra), timeout=TIMEOUT_CAPTURA_HISTORIAL
+            )
+            
+            self.datos_ficha_actual = datos_ficha.get('payload')
+            self.datos_historial_actual = datos_historial.get('payload') if datos_historial else None
+            
             # Construir objeto con datos completos
-            detalle_completo = {
-                'codigo': codigo_compra,
-                'ficha': self.datos_ficha_actual,
-                'historial': self.datos_historial_actual if self.datos_historial_actual else [],
-                'fecha_scraping_detalle': datetime.now().isoformat()
-            }
+            detalle_completo = self._construir_detalle(
+                codigo_compra, self.datos_ficha_actual, self.datos_historial_actual
+            )
             
             # Actualizar estadísticas
             self.estadisticas.incrementar_items()
@@ -108,9 +142,21 @@ class ScraperDetalles:
             self.estadisticas.incrementar_errores()
             return None
     
-    def scrapear_multiples_detalles(self, page: Page, compras, max_compras=None):
+    def _construir_detalle(self, codigo_compra, ficha, historial):
+        
+        #Arma el objeto de detalle a partir de los payloads capturados
+        
+        return {
+            'codigo': codigo_compra,
+            'ficha': ficha,
+            'historial': historial if historial else [],
+            'fecha_scraping_detalle': datetime.now().isoformat()
+        }
+    
+    def scrapear_multiples_detalles(self, page: Page, compras, max_compras=None, reanudar=False):
         
         #Scrapea detalles de múltiples compras
+        #reanudar: omite los códigos ya capturados en una corrida cortada (mismas compras)
         #Retorna: Lista de compras con detalles completos
         
         # Log de inicio
@@ -132,6 +178,22 @@ class ScraperDetalles:
         # Lista para resultados
         compras_con_detalle = []
         
+        # Códigos fallidos: se reintentan al final con backoff
+        cola_reintentos = ColaReintentos(self.logger, self.estadisticas)
+        posiciones_fallidas = {}
+        
+        # Checkpoint por código para estas mismas compras (se borra al guardar resultados)
+        # La clave sale de los códigos de entrada: otro archivo de compras no lo reutiliza
+        codigos = [str(compra.get('codigo')) for compra in compras[:compras_a_procesar]]
+        checkpoint = GestorCheckpoint('detalles', ','.join(codigos))
+        self.checkpoint = checkpoint
+        if reanudar:
+            detalles_guardados = checkpoint.cargar()
+            self.logger.info(f"Reanudando: {len(detalles_guardados)} detalles ya capturados")
+        else:
+            checkpoint.eliminar()
+            detalles_guardados = {}
+        
         # Procesar cada compra
         for indice, compra in enumerate(compras[:compras_a_procesar], 1):
             # Obtener código
@@ -141,12 +203,22 @@ class ScraperDetalles:
                 self.logger.warning(f"Compra sin código en índice {indice}")
                 continue
             
-            # Aplicar delay (excepto primera)
-            if indice > 1:
-                aplicar_delay(DELAY_ENTRE_REQUESTS)
+            # Detalle ya capturado antes del corte
+            if codigo in detalles_guardados:
+                compras_con_detalle.append({**compra, 'detalle': detalles_guardados[codigo]})
+                continue
+            
+            # Detalle vigente de una corrida anterior
+            detalle_cache = self._consultar_cache(codigo)
+            if detalle_cache:
+                compras_con_detalle.append({**compra, 'detalle': detalle_cache})
+                continue
             
-            # Obtener detalle
+            # Obtener detalle (el limitador regula el ritmo)
             detalle = self.scrapear_detalle_individual(page, codigo)
+            if detalle:
+                checkpoint.guardar(codigo, detalle)
+                self._guardar_en_cache(codigo, detalle, compra)
             
             # Combinar con datos originales
             if detalle:
@@ -161,18 +233,223 @@ class ScraperDetalles:
                     f"Exitosos: {len(compras_con_detalle)}"
                 )
             else:
-                self.logger.warning(f"No se obtuvo detalle: {codigo}")
+                self.logger.warning(f"No se obtuvo detalle: {codigo}, se reintentará al final")
+                posiciones_fallidas[codigo] = len(compras_con_detalle)
+                cola_reintentos.agregar(codigo)
                 compras_con_detalle.append(compra)
         
+        # Reintentos: el detalle recuperado reemplaza a la compra sin detalle
+        recuperados = cola_reintentos.procesar(
+            lambda codigo: self.scrapear_detalle_individual(page, codigo)
+        )
+        for codigo, detalle in recuperados.items():
+            checkpoint.guardar(codigo, detalle)
+            posicion = posiciones_fallidas[codigo]
+            self._guardar_en_cache(codigo, detalle, compras_con_detalle[posicion])
+            compras_con_detalle[posicion] = {**compras_con_detalle[posicion], 'detalle': detalle}
+        
         # Log final
         self.logger.info("-" * 60)
         self.logger.info("SCRAPING DE DETALLES COMPLETADO")
-        self.logger.info(f"Compras procesadas: {indice}")
-        self.logger.info(f"Detalles obtenidos: {len(compras_con_detalle)}")
+        self.logger.info(f"Compras procesadas: {compras_a_procesar}")
+        self.logger.info(
+            f"Detalles obtenidos: {sum(1 for compra in compras_con_detalle if 'detalle' in compra)}"
+        )
+        if cola_reintentos.fallidos:
+            self.logger.warning(f"Códigos sin detalle tras reintentos: {cola_reintentos.fallidos}")
         self.logger.info("=" * 60)
         
         return compras_con_detalle
     
+    def scrapear_multiples_detalles_pool(self, compras, max_compras=None,
+                                         procesos=POOL_NAVEGADOR_PROCESOS):
+        
+        #Scrapea detalles repartiendo los códigos entre los trabajadores del pool
+        #de navegador (y opcionalmente varios procesos de navegador)
+        #Retorna: Lista de compras con detalles, en el orden de entrada
+        
+        compras_a_procesar = compras[:max_compras] if max_compras else compras
+        detalles_cache, codigos = self._separar_cacheados(compras_a_procesar)
+        
+        self.logger.info("=" * 60)
+        self.logger.info("INICIANDO SCRAPING DE DETALLES (POOL)")
+        self.logger.info("=" * 60)
+        self.logger.info(f"Compras a procesar: {len(compras_a_procesar)}")
+        
+        if procesos > 1:
+            capturas = procesar_en_procesos(codigos, capturar_detalle, procesos)
+            fallidos = [codigo for codigo in codigos if not capturas.get(codigo)]
+            if fallidos:
+                with PoolNavegador(self.logger, estadisticas=self.estadisticas,
+                                   limitador=self.limitador) as pool:
+                    capturas.update(self._reintentar_capturas(pool, fallidos))
+        else:
+            with PoolNavegador(self.logger, estadisticas=self.estadisticas,
+                               limitador=self.limitador) as pool:
+                capturas = pool.procesar_lote(codigos, capturar_detalle)
+                fallidos = [codigo for codigo in codigos if not capturas.get(codigo)]
+                capturas.update(self._reintentar_capturas(pool, fallidos))
+        
+        return self._combinar_capturas(compras_a_procesar, capturas, detalles_cache)
+    
+    def scrapear_multiples_detalles_http(self, compras, max_compras=None,
+                                         concurrencia=CONCURRENCIA_DETALLES, cliente=None):
+        
+        #Scrapea detalles llamando directo a los endpoints action=ficha y
+        #action=historial, con varios códigos en vuelo a la vez
+        #El ritmo global lo impone el limitador en cada solicitud del cliente
+        #Retorna: Lista de compras con detalles, en el orden de entrada
+        
+        compras_a_procesar = compras[:max_compras] if max_compras else compras
+        detalles_cache, codigos = self._separar_cacheados(compras_a_procesar)
+        concurrencia = max(1, concurrencia)
+        
+        self.logger.info("=" * 60)
+        self.logger.info("INICIANDO SCRAPING DE DETALLES (HTTP)")
+        self.logger.info("=" * 60)
+        self.logger.info(f"Compras a procesar: {len(compras_a_procesar)} | Concurrencia: {concurrencia}")
+        
+        cliente_propio = cliente is None
+        if cliente_propio:
+            cliente = ClienteAPI(
+                self.logger,
+                tamano_pool=max(HTTP_POOL_CONEXIONES, concurrencia),
+                limitador=self.limitador,
+                estadisticas=self.estadisticas
+            )
+        
+        def capturar(codigo):
+            return self.capturar_detalle_http(cliente, codigo)
+        
+        try:
+            # map entrega las capturas en el orden de los códigos
+            with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+                capturas = dict(zip(codigos, executor.map(capturar, codigos)))
+            
+            # Reintentos con backoff de los códigos sin ficha
+            cola_reintentos = ColaReintentos(self.logger, self.estadisticas)
+            for codigo in codigos:
+                if not capturas.get(codigo):
+                    cola_reintentos.agregar(codigo)
+            capturas.update(cola_reintentos.procesar(capturar))
+            
+            if cola_reintentos.fallidos:
+                self.logger.warning(f"Códigos sin detalle tras reintentos: {cola_reintentos.fallidos}")
+        finally:
+            if cliente_propio:
+                cliente.cerrar()
+        
+        return self._combinar_capturas(compras_a_procesar, capturas, detalles_cache)
+    
+    def capturar_detalle_http(self, cliente, codigo_compra):
+        
+        #Pide ficha e historial de un código por la API
+        #Retorna: {'ficha': ..., 'historial': ...} o None si no hubo ficha
+        #Sin historial la captura sigue siendo válida (historial vacío)
+        
+        try:
+            ficha = cliente.obtener_ficha(codigo_compra).get('payload')
+        except Exception as e:
+            self.logger.warning(f"No se obtuvo ficha {codigo_compra}: {e}")
+            return None
+        
+        if not ficha:
+            return None
+        
+        try:
+            historial = cliente.obtener_historial(codigo_compra).get('payload')
+        except Exception as e:
+            self.logger.warning(f"No se obtuvo historial {codigo_compra}: {e}")
+            historial = None
+        
+        return {'ficha': ficha, 'historial': historial or []}
+    
+    def _combinar_capturas(self, compras_a_procesar, capturas, detalles_cache=None):
+        
+        #Combina las capturas (codigo -> ficha/historial) y los detalles de la caché
+        #con las compras en el orden original; las capturas nuevas se guardan en caché
+        
+        detalles_cache = detalles_cache or {}
+        compras_con_detalle = []
+        for compra in compras_a_procesar:
+            codigo = compra.get('codigo')
+            captura = capturas.get(codigo) if codigo else None
+            
+            if codigo in detalles_cache:
+                compras_con_detalle.append({**compra, 'detalle': detalles_cache[codigo]})
+            elif captura:
+                detalle = self._construir_detalle(codigo, captura['ficha'], captura['historial'])
+                self._guardar_en_cache(codigo, detalle, compra)
+                self.estadisticas.incrementar_items()
+                compras_con_detalle.append({**compra, 'detalle': detalle})
+            else:
+                self.logger.warning(f"No se obtuvo detalle: {codigo}")
+                self.estadisticas.incrementar_errores()
+                compras_con_detalle.append(compra)
+        
+        self.logger.info("-" * 60)
+        self.logger.info("SCRAPING DE DETALLES COMPLETADO")
+        self.logger.info(
+            f"Detalles obtenidos: {sum(1 for compra in compras_con_detalle if 'detalle' in compra)}"
+        )
+        self.logger.info("=" * 60)
+        
+        return compras_con_detalle
+    
+    def _reintentar_capturas(self, pool, codigos):
+        
+        #Reintenta con backoff los códigos que el pool no pudo capturar
+        #Retorna: Diccionario codigo -> captura de los recuperados
+        
+        cola_reintentos = ColaReintentos(self.logger, self.estadisticas)
+        for codigo in codigos:
+            cola_reintentos.agregar(codigo)
+        
+        recuperados = cola_reintentos.procesar(
+            lambda codigo: pool.procesar(codigo, capturar_detalle)
+        )
+        
+        if cola_reintentos.fallidos:
+            self.logger.warning(f"Códigos sin detalle tras reintentos: {cola_reintentos.fallidos}")
+        
+        return recuperados
+    
+    def _consultar_cache(self, codigo):
+        
+        #Detalle vigente en la caché (None si no hay caché, no está o venció)
+        
+        if self.cache is None:
+            return None
+        
+        detalle = self.cache.obtener(codigo)
+        self.estadisticas.registrar_cache(detalle is not None)
+        return detalle
+    
+    def _guardar_en_cache(self, codigo, detalle, compra=None):
+        if self.cache is not None:
+            self.cache.guardar(codigo, detalle, compra)
+    
+    def _separar_cacheados(self, compras_a_procesar):
+        
+        #Retorna: (codigo -> detalle de la caché, códigos que hay que pedir)
+        
+        detalles_cache = {}
+        codigos = []
+        for compra in compras_a_procesar:
+            codigo = compra.get('codigo')
+            if not codigo:
+                continue
+            detalle = self._consultar_cache(codigo)
+            if detalle:
+                detalles_cache[codigo] = detalle
+            else:
+                codigos.append(codigo)
+        
+        if detalles_cache:
+            self.logger.info(f"Detalles desde caché: {len(detalles_cache)} | Por descargar: {len(codigos)}")
+        
+        return detalles_cache, codigos
+    
     def guardar_resultados(self, compras_con_detalle, nombre_archivo=None):
         
         #Guarda resultados con detalles en JSON
@@ -185,4 +462,17 @@ class ScraperDetalles:
         ruta = guardar_json(compras_con_detalle, nombre_archivo)
         self.logger.info(f"Resultados guardados en: {ruta}")
         
+        if self.base_datos:
+            try:
+                almacen = AlmacenCompras()
+                guardados = almacen.guardar_detalles(compras_con_detalle)
+                almacen.cerrar()
+                self.logger.info(f"Base de datos: {guardados} detalles guardados")
+            except Exception as e:
+                self.logger.warning(f"No se pudo guardar en la base de datos: {e}")
+        
+        # Lo capturado ya está en disco: el checkpoint ya no hace falta
+        if self.checkpoint and all('detalle' in compra for compra in compras_con_detalle):
+            self.checkpoint.eliminar()
+        
         return str(ruta)
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Enrutamiento de solicitudes del navegador de scraping
+Aborta recursos no esenciales y solo entrega a Python las respuestas de la API
+"""
+from urllib.parse import urlparse
+from config.config import (
+    TIPOS_RECURSO_BLOQUEADOS,
+    DOMINIOS_PERMITIDOS,
+    PATRONES_RESPUESTA_API,
+    BYTES_ESTIMADOS_POR_TIPO,
+    BYTES_ESTIMADOS_OTROS
+)
+
+
+class EnrutadorRecursos:
+    """
+    Handler de page.route / context.route para el navegador de scraping
+
+    - Respuestas de la API (listado, ficha, historial): se obtienen, se
+      entregan a la página y se pasan a callback_api
+    - Tipos no esenciales y hosts de terceros: se abortan
+    - Todo lo demás continúa sin pasar por Python
+
+    Atributos:
+        logger: Logger para registrar eventos
+        estadisticas: EstadisticasScraper donde se contabilizan bloqueos
+        callback_api: Función (response) llamada con cada respuesta de la API
+    """
+
+    def __init__(self, logger, estadisticas, callback_api=None):
+        self.logger = logger
+        self.estadisticas = estadisticas
+        self.callback_api = callback_api
+
+    def instalar(self, destino):
+
+        #Registra el enrutador en una página o contexto de Playwright (API síncrona)
+
+        destino.route('**/*', self.enrutar)
+
+    async def instalar_async(self, destino):
+
+        #Registra el enrutador en una página o contexto de Playwright (API async)
+
+        await destino.route('**/*', self.enrutar_async)
+
+    def es_respuesta_api(self, url):
+        """
+        Verifica si la URL corresponde a una respuesta que interesa a Python
+        True si coincide con algún patrón de API
+        """
+        return any(patron in url for patron in PATRONES_RESPUESTA_API)
+
+    def motivo_bloqueo(self, request):
+
+        #Retorna el motivo por el que la solicitud se aborta, o None si se permite
+
+        if request.resource_type in TIPOS_RECURSO_BLOQUEADOS:
+            return request.resource_type
+
+        host = urlparse(request.url).hostname
+        if host and not any(
+            host == dominio or host.endswith('.' + dominio) for dominio in DOMINIOS_PERMITIDOS
+        ):
+            return 'tercero'
+
+        return None
+
+    def _registrar_bloqueo(self, request, motivo):
+
+        #Los bytes no se miden (el recurso nunca se descarga): se estiman por tipo
+
+        bytes_estimados = BYTES_ESTIMADOS_POR_TIPO.get(request.resource_type, BYTES_ESTIMADOS_OTROS)
+        self.estadisticas.registrar_solicitud_bloqueada(bytes_estimados)
+        self.logger.debug(f"Bloqueado ({motivo}): {request.url[:100]}")
+
+    def enrutar(self, route):
+
+        #Handler de route para la API síncrona de Playwright
+
+        request = route.request
+
+        try:
+            if self.callback_api and self.es_respuesta_api(request.url):
+                respuesta = route.fetch()
+                self.estadisticas.registrar_solicitud_permitida()
+                # Registrar antes de entregarla a la página: quien espere el evento
+                # 'response' ya la encuentra capturada
+                try:
+                    self.callback_api(respuesta)
+                finally:
+                    route.fulfill(response=respuesta)
+                return
+
+            motivo = self.motivo_bloqueo(request)
+            if motivo:
+                self._registrar_bloqueo(request, motivo)
+                route.abort()
+                return
+
+            self.estadisticas.registrar_solicitud_permitida()
+            route.continue_()
+
+        except Exception as e:
+            self.logger.error(f"ERROR al enrutar {request.url[:100]}: {e}")
+            # Sin respuesta la solicitud quedaría colgada hasta el timeout de la página
+            try:
+                route.continue_()
+            except Exception as e_continuar:
+                self.logger.debug(f"No se pudo continuar {request.url[:100]}: {e_continuar}")
+
+    async def enrutar_async(self, route):
+
+        #Handler de route para la API async (pool de navegador)
+        #Las respuestas de la API siguen su curso normal y las captura cada trabajador
+
+        request = route.request
+
+        try:
+            motivo = self.motivo_bloqueo(request)
+            if motivo:
+                self._registrar_bloqueo(request, motivo)
+                await route.abort()
+                return
+
+            self.estadisticas.registrar_solicitud_permitida()
+            await route.continue_()
+
+        except Exception as e:
+            self.logger.error(f"ERROR al enrutar {request.url[:100]}: {e}")
+            # Sin respuesta la solicitud quedaría colgada hasta el timeout de la página
+            try:
+                await route.continue_()
+            except Exception as e_continuar:
+                self.logger.debug(f"No se pudo continuar {request.url[:100]}: {e_continuar}")
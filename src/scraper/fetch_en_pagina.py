@@ -0,0 +1,160 @@
+"""
+Obtención del listado en lotes desde dentro de la página del buscador
+Carga la SPA una sola vez y llama a la API con fetch() en el contexto de la página,
+reutilizando las cookies y cabeceras propias del sitio
+"""
+import time
+from playwright.sync_api import sync_playwright
+from .enrutador import EnrutadorRecursos
+from .api_handler import URL_API_LISTADO
+from .http_client import CABECERAS_EXCLUIDAS
+from .url_builder import construir_url_listado, construir_url_api_listado
+from .utilidades.stats import EstadisticasScraper
+from config.config import (
+    MODO_HEADLESS,
+    TIMEOUT_REQUESTS,
+    USER_AGENT,
+    TAMANO_LOTE_PAGINAS,
+    BLOQUEO_RECURSOS_ACTIVO
+)
+
+
+# Pide todas las URLs en paralelo dentro de la página y retorna la lista de JSON
+SCRIPT_FETCH_LOTE = """
+async ({urls, headers}) => Promise.all(urls.map(async (url) => {
+    try {
+        const respuesta = await fetch(url, {headers, credentials: 'include'});
+        if (!respuesta.ok) {
+            return {error: `HTTP ${respuesta.status}`};
+        }
+        return await respuesta.json();
+    } catch (e) {
+        return {error: String(e)};
+    }
+}))
+"""
+
+
+class ClienteEnPagina:
+    """
+    Cliente que obtiene páginas del listado con fetch() dentro del buscador
+
+    Se usa como context manager: al entrar lanza el navegador y carga la
+    SPA una vez; al salir lo cierra.
+
+    Atributos:
+        logger: Logger para registrar eventos
+        tamano_lote: Páginas pedidas por cada ida y vuelta a Python
+        cabeceras: Cabeceras que la SPA usa al llamar a la API
+        limitador: LimitadorTasa que regula el ritmo (un turno por página del lote)
+        parametros: Reemplazos de la consulta del listado (fechas, región, estado)
+    """
+
+    def __init__(self, logger, estadisticas=None, tamano_lote=TAMANO_LOTE_PAGINAS, limitador=None,
+                 parametros=None):
+        self.logger = logger
+        self.parametros = parametros
+        self.estadisticas = estadisticas or EstadisticasScraper()
+        self.tamano_lote = max(1, tamano_lote)
+        self.limitador = limitador
+        self.cabeceras = {}
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self.page = None
+
+    def __enter__(self):
+        self._playwright = sync_playwright().start()
+        try:
+            self.inicializar()
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._context:
+            self._context.close()
+        if self._browser:
+            self._browser.close()
+        self._playwright.stop()
+        self.logger.info("Navegador cerrado")
+
+    def inicializar(self):
+
+        #Carga el buscador una vez y captura las cabeceras de la llamada a la API
+
+        self.logger.info("Cargando buscador (una sola vez) para fetch en lote...")
+        self._browser = self._playwright.chromium.launch(headless=MODO_HEADLESS)
+        self._context = self._browser.new_context(
+            user_agent=USER_AGENT,
+            viewport={'width': 1920, 'height': 1080},
+            locale='es-CL'
+        )
+        self.page = self._context.new_page()
+
+        if BLOQUEO_RECURSOS_ACTIVO:
+            EnrutadorRecursos(self.logger, self.estadisticas).instalar(self.page)
+
+        with self.page.expect_request(
+            lambda request: URL_API_LISTADO in request.url,
+            timeout=TIMEOUT_REQUESTS * 1000
+        ) as info_solicitud:
+            self.page.goto(
+                construir_url_listado(1, self.parametros),
+                timeout=TIMEOUT_REQUESTS * 1000,
+                wait_until='domcontentloaded'
+            )
+
+        self.cabeceras = {
+            clave: valor for clave, valor in info_solicitud.value.headers.items()
+            if clave.lower() not in CABECERAS_EXCLUIDAS and not clave.startswith(':')
+        }
+        self.logger.info(f"Buscador listo: {len(self.cabeceras)} cabeceras de API")
+
+    def obtener_lote(self, numeros_pagina):
+
+        #Pide varias páginas en una sola llamada a page.evaluate
+        #Retorna: Diccionario numero_pagina -> JSON (None si falló)
+
+        numeros_pagina = list(numeros_pagina)
+        urls = [construir_url_api_listado(numero, self.parametros) for numero in numeros_pagina]
+
+        # Un turno del limitador por página: el lote sale cuando hay cupo para todas
+        if self.limitador:
+            for _ in numeros_pagina:
+                self.limitador.adquirir()
+
+        inicio = time.time()
+        try:
+            respuestas = self.page.evaluate(
+                SCRIPT_FETCH_LOTE, {'urls': urls, 'headers': self.cabeceras}
+            )
+        except Exception as e:
+            self.logger.error(f"ERROR en fetch en lote {numeros_pagina[0]}-{numeros_pagina[-1]}: {e}")
+            self._registrar_en_limitador(time.time() - inicio, e)
+            return {numero: None for numero in numeros_pagina}
+
+        latencia = time.time() - inicio
+        resultados = {}
+        for numero, datos in zip(numeros_pagina, respuestas):
+            error = None
+            if isinstance(datos, dict) and 'error' in datos and 'payload' not in datos:
+                self.logger.warning(f"Página {numero} falló en el lote: {datos['error']}")
+                error = datos['error']
+                datos = None
+            self._registrar_en_limitador(latencia, error)
+            resultados[numero] = datos
+
+        return resultados
+
+    def _registrar_en_limitador(self, latencia, error):
+        if self.limitador:
+            self.limitador.registrar_resultado(latencia, error, estadisticas=self.estadisticas)
+
+    def obtener_listado(self, numero_pagina):
+
+        #Obtiene una sola página (misma interfaz que ClienteAPI)
+
+        return self.obtener_lote([numero_pagina]).get(numero_pagina)
@@ -61,22 +61,9 @@ class FiltradorCompras:
         compras_filtradas = []
         
         for compra in compras:
-            self.total_procesadas += 1
-            
-            # Verificar si es segundo llamado
-            if self.es_segundo_llamado(compra):
-                # Agregar metadata
-                compra_con_metadata = {
-                    **compra,
-                    'metadata_filtrado': {
-                        'es_segundo_llamado': True,
-                        'estado_convocatoria': compra.get('estado_convocatoria'),
-                        'fecha_filtrado': datetime.now().isoformat()
-                    }
-                }
-                
+            compra_con_metadata = self._evaluar_compra(compra)
+            if compra_con_metadata:
                 compras_filtradas.append(compra_con_metadata)
-                self.total_segundo_llamado += 1
         
         self.logger.info(f"Compras con segundo llamado: {len(compras_filtradas)}")
         
@@ -88,6 +75,55 @@ class FiltradorCompras:
         
         return compras_filtradas
     
+    def filtrar_en_flujo(self, paginas):
+        """
+        Filtra segundo llamado a medida que llegan las páginas del listado
+        
+        Args:
+            paginas: Iterable de (numero_pagina, compras), p. ej. ScraperListado.iterar_paginas()
+        
+        Yields:
+            tuple: (numero_pagina, compras con segundo llamado de esa página)
+                   Una página puede repetirse con compras adicionales: acumular por página
+        """
+        self.logger.info("FILTRADO EN FLUJO POR ESTADO_CONVOCATORIA")
+        
+        for numero_pagina, compras in paginas:
+            compras_filtradas = [
+                compra_con_metadata for compra_con_metadata in map(self._evaluar_compra, compras)
+                if compra_con_metadata
+            ]
+            
+            if compras_filtradas:
+                self.logger.info(
+                    f"Página {numero_pagina}: {len(compras_filtradas)} compras con segundo llamado"
+                )
+            
+            yield numero_pagina, compras_filtradas
+    
+    def _evaluar_compra(self, compra):
+        
+        #Cuenta la compra y, si es segundo llamado, la retorna con metadata de filtrado
+        #Retorna: Compra con metadata o None
+        
+        self.total_procesadas += 1
+        
+        # Verificar si es segundo llamado
+        if not self.es_segundo_llamado(compra):
+            return None
+        
+        self.total_segundo_llamado += 1
+        
+        # Agregar metadata
+        return {
+            **compra,
+            'metadata_filtrado': {
+                'es_segundo_llamado': True,
+                'estado_convocatoria': compra.get('estado_convocatoria'),
+                'fecha_filtrado': datetime.now().isoformat()
+            }
+        }
+    
     def generar_estadisticas(self, compras_totales, compras_filtradas):
         """
         Genera estadísticas del filtrado
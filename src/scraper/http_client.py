@@ -0,0 +1,203 @@
+"""
+Cliente HTTP directo para la API de compra-agil
+Usa Playwright solo para obtener cookies y cabeceras de sesión
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from playwright.sync_api import sync_playwright
+from .url_builder import (
+    construir_url_listado,
+    construir_url_api_listado,
+    construir_url_api_ficha,
+    construir_url_api_historial
+)
+from config.config import (
+    URL_BASE_API,
+    MODO_HEADLESS,
+    TIMEOUT_REQUESTS,
+    USER_AGENT,
+    HTTP_POOL_CONEXIONES,
+    HTTP_TTL_SESION
+)
+
+
+# Cabeceras del navegador que no se copian (las maneja requests)
+CABECERAS_EXCLUIDAS = {'host', 'content-length', 'connection', 'accept-encoding', 'cookie'}
+
+# Códigos HTTP que indican cookies o cabeceras vencidas
+CODIGOS_SESION_EXPIRADA = {401, 403, 419, 440}
+
+
+class ClienteAPI:
+    """
+    Cliente HTTP con pool de conexiones keep-alive para la API de compra-agil
+
+    Atributos:
+        logger: Logger para registrar eventos
+        sesion: Sesión de requests con pool de conexiones
+        cabeceras: Cabeceras capturadas desde la SPA del buscador
+        expira_en: Momento (time.time) en que se deben refrescar cookies/cabeceras
+        limitador: LimitadorTasa que regula y ajusta el ritmo de solicitudes (o None)
+    """
+
+    def __init__(self, logger, tamano_pool=HTTP_POOL_CONEXIONES, limitador=None, estadisticas=None):
+
+        #Inicializa la sesión HTTP (el bootstrap se hace en la primera solicitud)
+
+        self.logger = logger
+        self.limitador = limitador
+        self.estadisticas = estadisticas
+        self.sesion = requests.Session()
+
+        adaptador = HTTPAdapter(pool_connections=tamano_pool, pool_maxsize=tamano_pool)
+        self.sesion.mount('https://', adaptador)
+        self.sesion.mount('http://', adaptador)
+
+        self.cabeceras = {}
+        self.expira_en = 0
+        self._lock_sesion = threading.Lock()
+
+    def inicializar_sesion(self):
+
+        #Abre el buscador una vez con Playwright para capturar cookies y cabeceras
+        #que la SPA envía a la API
+
+        self.logger.info("Inicializando sesión HTTP (bootstrap con navegador)...")
+        cabeceras_api = {}
+
+        def capturar_solicitud(request):
+            if URL_BASE_API in request.url and not cabeceras_api:
+                cabeceras_api.update(request.headers)
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=MODO_HEADLESS)
+            context = browser.new_context(
+                user_agent=USER_AGENT,
+                viewport={'width': 1920, 'height': 1080},
+                locale='es-CL'
+            )
+            page = context.new_page()
+            page.on('request', capturar_solicitud)
+
+            try:
+                page.goto(
+                    construir_url_listado(1),
+                    timeout=TIMEOUT_REQUESTS * 1000,
+                    wait_until='networkidle'
+                )
+                cookies = context.cookies()
+            finally:
+                context.close()
+                browser.close()
+
+        if not cabeceras_api:
+            self.logger.warning("No se capturaron cabeceras de la API, usando cabeceras por defecto")
+
+        # Cabeceras: las del navegador (sin las de transporte) o un mínimo equivalente
+        self.cabeceras = {
+            clave: valor for clave, valor in cabeceras_api.items()
+            if clave.lower() not in CABECERAS_EXCLUIDAS and not clave.startswith(':')
+        }
+        self.cabeceras.setdefault('user-agent', USER_AGENT)
+        self.cabeceras.setdefault('accept', 'application/json, text/plain, */*')
+
+        # Cookies de la sesión del navegador
+        self.sesion.cookies.clear()
+        for cookie in cookies:
+            self.sesion.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain'),
+                path=cookie.get('path', '/')
+            )
+
+        # Expiración: la cookie más próxima a vencer o el TTL configurado
+        ahora = time.time()
+        vencimientos = [c['expires'] for c in cookies if c.get('expires', -1) > ahora]
+        self.expira_en = min(vencimientos + [ahora + HTTP_TTL_SESION])
+
+        self.logger.info(
+            f"Sesión HTTP lista: {len(cookies)} cookies, {len(self.cabeceras)} cabeceras"
+        )
+
+    def sesion_expirada(self):
+        """
+        Verifica si las cookies/cabeceras deben refrescarse
+        True si expiraron o nunca se inicializaron
+        """
+        return time.time() >= self.expira_en
+
+    def asegurar_sesion(self, forzar=False):
+
+        #Inicializa o refresca la sesión si es necesario (seguro entre hilos)
+
+        with self._lock_sesion:
+            if forzar or self.sesion_expirada():
+                self.inicializar_sesion()
+
+    def obtener_json(self, url):
+
+        #GET con la sesión keep-alive; refresca la sesión una vez si el servidor la rechaza
+        #Retorna: Diccionario con la respuesta JSON
+
+        self.asegurar_sesion()
+        expira_usada = self.expira_en
+
+        respuesta = self._get_limitado(url)
+
+        if respuesta.status_code in CODIGOS_SESION_EXPIRADA:
+            self.logger.warning(
+                f"Sesión rechazada (HTTP {respuesta.status_code}), refrescando cookies..."
+            )
+            # Solo refrescar si otro hilo no lo hizo ya
+            with self._lock_sesion:
+                if self.expira_en == expira_usada:
+                    self.inicializar_sesion()
+            respuesta = self._get_limitado(url)
+
+        respuesta.raise_for_status()
+        return respuesta.json()
+
+    def _get_limitado(self, url):
+
+        #GET que espera turno en el limitador y le informa latencia y código HTTP
+
+        if not self.limitador:
+            return self.sesion.get(url, headers=self.cabeceras, timeout=TIMEOUT_REQUESTS)
+
+        with self.limitador.turno(self.estadisticas) as turno:
+            respuesta = self.sesion.get(url, headers=self.cabeceras, timeout=TIMEOUT_REQUESTS)
+
+            if respuesta.status_code >= 400:
+                reintentar_en = getattr(respuesta, 'headers', {}).get('Retry-After', '')
+                turno.fallar(
+                    respuesta.status_code,
+                    espera_servidor=float(reintentar_en) if reintentar_en.isdigit() else None
+                )
+
+        return respuesta
+
+    def obtener_listado(self, numero_pagina, parametros=None):
+
+        #Obtiene el JSON de una página del listado directamente desde la API
+        #parametros: reemplazos de la consulta (fechas, región, estado)
+
+        return self.obtener_json(construir_url_api_listado(numero_pagina, parametros))
+
+    def obtener_ficha(self, codigo_compra):
+
+        #Obtiene el JSON de la ficha de una compra (action=ficha)
+
+        return self.obtener_json(construir_url_api_ficha(codigo_compra))
+
+    def obtener_historial(self, codigo_compra):
+
+        #Obtiene el JSON del historial de una compra (action=historial)
+
+        return self.obtener_json(construir_url_api_historial(codigo_compra))
+
+    def cerrar(self):
+        """Cierra las conexiones del pool"""
+        self.sesion.close()
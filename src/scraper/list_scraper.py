@@ -2,33 +2,116 @@
 Scraper principal de listado de compras ágiles
 Extrae todas las CA del día usando Playwright
 """
+import asyncio
+import itertools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from pathlib import Path
 from playwright.sync_api import sync_playwright
 from .utilidades.logger import configurar_logger
 from .utilidades.helpers import (
     guardar_json,
-    obtener_timestamp,
-    aplicar_delay
+    obtener_timestamp
 )
 from .utilidades.stats import EstadisticasScraper
+from .utilidades.limitador import obtener_limitador
+from .utilidades.reintentos import ColaReintentos
+from .utilidades.checkpoint import GestorCheckpoint
+from .utilidades.indice import IndiceCompras, identificador_compra
+from .utilidades.cache_respuestas import CacheRespuestas
+from .utilidades.tamano_pagina import leer_tamano_pagina, guardar_tamano_pagina
+from .utilidades.escritor_jsonl import EscritorJSONL
+from ..storage.snapshot import guardar_snapshot
+from ..storage.base_datos import AlmacenCompras
 from .api_handler import ManejadorAPI
-from .url_builder import construir_url_listado
+from .http_client import ClienteAPI
+from .fetch_en_pagina import ClienteEnPagina
+from .enrutador import EnrutadorRecursos
+from .browser_pool import PoolNavegador, capturar_listado, procesar_en_procesos
+from .url_builder import (
+    construir_url_listado,
+    construir_url_api_listado,
+    construir_parametros_listado
+)
 from config.config import (
     FECHA_SCRAPING,
     MODO_HEADLESS,
     TIMEOUT_REQUESTS,
-    DELAY_ENTRE_REQUESTS
+    USER_AGENT,
+    MODO_SCRAPING,
+    CONCURRENCIA_PAGINAS,
+    HTTP_POOL_CONEXIONES,
+    POOL_NAVEGADOR_TAMANO,
+    POOL_NAVEGADOR_PROCESOS,
+    BLOQUEO_RECURSOS_ACTIVO,
+    SCRAPING_INCREMENTAL,
+    CACHE_RESPUESTAS_TTL,
+    CACHE_RESPUESTAS_OMITIR,
+    TAMANO_BUFFER_FLUJO,
+    DERIVA_MAXIMO_REPETICIONES,
+    TAMANO_PAGINA_AUTO,
+    PARAMETRO_TAMANO_PAGINA,
+    TAMANO_PAGINA_CANDIDATOS,
+    TAMANO_PAGINA_BASE,
+    SALIDA_JSONL,
+    DIRECTORIO_DATOS_RAW,
+    SNAPSHOT_ACTIVO,
+    BASE_DATOS_ACTIVA
 )
 
 
+# Modos de obtención del listado
+MODOS_SCRAPING = ('navegador', 'http', 'pool', 'lote')
+
+# Marca de fin del flujo de páginas
+_FIN_FLUJO = object()
+
+
+class FlujoDetenido(Exception):
+    """El consumidor de iterar_paginas dejó de leer: se corta el recorrido"""
+
+
 class ScraperListado:
     
     
-    def __init__(self, max_paginas=None):
+    def __init__(self, max_paginas=None, modo=MODO_SCRAPING, concurrencia=CONCURRENCIA_PAGINAS,
+                 procesos=POOL_NAVEGADOR_PROCESOS, limitador=None, incremental=SCRAPING_INCREMENTAL,
+                 parametros=None, omitir_cache=CACHE_RESPUESTAS_OMITIR,
+                 tamano_pagina_auto=TAMANO_PAGINA_AUTO, salida_jsonl=SALIDA_JSONL,
+                 snapshot=SNAPSHOT_ACTIVO, base_datos=BASE_DATOS_ACTIVA):
         #inicializa el scraper de listado
         # Configuración
         self.max_paginas = max_paginas
         
+        # Reemplazos de la consulta por defecto (date_from/date_to, region, status...)
+        self.parametros = dict(parametros or {})
+        
+        # Incremental: solo compras nuevas respecto del índice de corridas anteriores
+        self.incremental = incremental
+        self.indice = None
+        
+        if modo not in MODOS_SCRAPING:
+            raise ValueError(f"Modo de scraping inválido: {modo} (opciones: {MODOS_SCRAPING})")
+        self.modo = modo
+        
+        # Páginas en paralelo (en modo navegador la página no se comparte entre hilos)
+        if modo == 'http':
+            self.concurrencia = max(1, concurrencia)
+        elif modo == 'pool':
+            self.concurrencia = max(1, POOL_NAVEGADOR_TAMANO)
+        else:
+            self.concurrencia = 1
+        
+        self.procesos = max(1, procesos)
+        
+        # Ritmo de solicitudes: limitador adaptativo compartido con el scraper
+        # de detalles y con otros procesos del equipo
+        self.limitador = limitador or obtener_limitador()
+        
         # Logger con archivo por fecha
         nombre_log = f'scraper_listado_{datetime.now().strftime("%Y%m%d")}.log'
         self.logger = configurar_logger('scraper_listado', nombre_log)
@@ -38,6 +121,36 @@ class ScraperListado:
         
         # Lista de compras
         self.compras = []
+        
+        # resultCount anunciado por la página 1 y comparación final contra él
+        self.total_resultados = None
+        self.reporte_completitud = None
+        
+        # Checkpoint por página (lo activa ejecutar); reanudar omite lo ya capturado
+        self.checkpoint = None
+        self.reanudar = False
+        
+        # Caché de respuestas por URL (la abre ejecutar); omitir_cache fuerza
+        # pedir todo de nuevo, pero las respuestas nuevas igual se guardan
+        self.cache_respuestas = None
+        self.omitir_cache = omitir_cache
+        
+        # Páginas más grandes si la API lo acepta (se sondea una vez por modo)
+        self.tamano_pagina_auto = tamano_pagina_auto
+        self._sondear_tamano = False
+        
+        # Receptor de cada página apenas llega (lo instala iterar_paginas) e
+        # identificadores ya entregados, para no repetir compras corridas de página
+        self._al_recibir_pagina = None
+        self._ids_emitidos = set()
+        
+        # Salida JSONL escrita página a página (la abre ejecutar si se guarda)
+        self.salida_jsonl = salida_jsonl
+        self.escritor = None
+        
+        # Snapshot columnar y base de datos junto a cada archivo guardado
+        self.snapshot = snapshot
+        self.base_datos = base_datos
     
     def scrapear_pagina(self, page, manejador_api, numero_pagina):
         
@@ -46,48 +159,125 @@ class ScraperListado:
         
         try:
             # Limpiar respuesta anterior
+            clave = ('listado', numero_pagina)
             manejador_api.limpiar_respuesta_actual()
+            manejador_api.descartar_respuesta(clave)
             
             # Construir URL
-            url = construir_url_listado(numero_pagina)
+            url = construir_url_listado(numero_pagina, self.parametros)
             
             # Log de navegación
             self.logger.info(f"Navegando a página {numero_pagina}")
             
-            # Navegar y esperar carga completa
-            page.goto(url, timeout=TIMEOUT_REQUESTS * 1000, wait_until='networkidle')
-            
-            # Esperar captura de respuesta
-            page.wait_for_timeout(2000)
-            
-            # Verificar captura
-            if manejador_api.hay_respuesta_disponible():
-                datos = manejador_api.obtener_respuesta_actual()
-                resultados = manejador_api.extraer_resultados()
-                
-                # Actualizar estadísticas
-                self.estadisticas.incrementar_paginas()
-                self.estadisticas.incrementar_items(len(resultados))
+            with self.limitador.turno(self.estadisticas) as turno:
+                # Navegar hasta tener el DOM; la SPA pide la API después
+                page.goto(url, timeout=TIMEOUT_REQUESTS * 1000, wait_until='domcontentloaded')
                 
-                self.logger.info(f"Página {numero_pagina} procesada: {len(resultados)} compras")
-                return datos
-            else:
-                self.logger.error(f"ERROR: No se capturó respuesta en página {numero_pagina}")
-                self.estadisticas.incrementar_errores()
-                return None
+                # Esperar exactamente la respuesta de esta página
+                datos = manejador_api.esperar_respuesta(page, clave)
+                if datos is None:
+                    turno.fallar('timeout')
+            
+            return self._registrar_datos_pagina(datos, numero_pagina)
                 
         except Exception as e:
             self.logger.error(f"ERROR al scrapear página {numero_pagina}: {e}")
             self.estadisticas.incrementar_errores()
             return None
     
+    def scrapear_pagina_http(self, cliente, manejador_api, numero_pagina):
+        
+        #Obtiene una página del listado llamando directamente a la API
+        #retorna:Datos de la página o None si falla
+        
+        try:
+            manejador_api.limpiar_respuesta_actual()
+            
+            self.logger.info(f"Solicitando página {numero_pagina} (HTTP)")
+            
+            datos = cliente.obtener_listado(numero_pagina, self.parametros)
+            manejador_api.registrar_respuesta(
+                datos, construir_url_api_listado(numero_pagina, self.parametros)
+            )
+            
+            return self._procesar_respuesta_pagina(manejador_api, numero_pagina)
+            
+        except Exception as e:
+            self.logger.error(f"ERROR al solicitar página {numero_pagina}: {e}")
+            self.estadisticas.incrementar_errores()
+            return None
+    
+    def scrapear_pagina_pool(self, pool, numero_pagina):
+        
+        #Obtiene una página del listado con el próximo trabajador libre del pool
+        #retorna:Datos de la página o None si falla
+        
+        try:
+            self.logger.info(f"Navegando a página {numero_pagina} (pool)")
+            
+            datos = pool.procesar(
+                numero_pagina, partial(capturar_listado, parametros=self.parametros)
+            )
+            return self._registrar_datos_pagina(datos, numero_pagina)
+            
+        except Exception as e:
+            self.logger.error(f"ERROR al scrapear página {numero_pagina}: {e}")
+            self.estadisticas.incrementar_errores()
+            return None
+    
+    def _registrar_datos_pagina(self, datos, numero_pagina):
+        
+        #Registra un JSON ya obtenido (pool o proceso hijo) y actualiza estadísticas
+        
+        manejador_api = ManejadorAPI(self.logger)
+        if datos is not None:
+            manejador_api.registrar_respuesta(datos, construir_url_listado(numero_pagina, self.parametros))
+        
+        return self._procesar_respuesta_pagina(manejador_api, numero_pagina)
+    
+    def _procesar_respuesta_pagina(self, manejador_api, numero_pagina):
+        
+        #Verifica la respuesta capturada y actualiza estadísticas
+        
+        if manejador_api.hay_respuesta_disponible():
+            datos = manejador_api.obtener_respuesta_actual()
+            resultados = manejador_api.extraer_resultados()
+            
+            # Actualizar estadísticas
+            self.estadisticas.incrementar_paginas()
+            self.estadisticas.incrementar_items(len(resultados))
+            
+            self.logger.info(f"Página {numero_pagina} procesada: {len(resultados)} compras")
+            return datos
+        else:
+            self.logger.error(f"ERROR: No se capturó respuesta en página {numero_pagina}")
+            self.estadisticas.incrementar_errores()
+            return None
+    
     def scrapear_todas_las_paginas(self):
         
         # Log de inicio
         self.logger.info("INICIANDO SCRAPING DE LISTADO")
         self.logger.info(f"Fecha: {FECHA_SCRAPING}")
+        if self.parametros:
+            self.logger.info(f"Parámetros de consulta: {self.parametros}")
+        self.logger.info(f"Modo: {self.modo} | Concurrencia: {self.concurrencia}")
         self.logger.info(f"Límite páginas: {self.max_paginas if self.max_paginas else 'Sin límite'}")
 
+        if self.modo == 'http':
+            return self._scrapear_con_http()
+        
+        if self.modo == 'pool':
+            return self._scrapear_con_pool()
+        
+        if self.modo == 'lote':
+            return self._scrapear_con_lotes()
+        
+        return self._scrapear_con_navegador()
+    
+    def _scrapear_con_navegador(self):
+        
+        #Recorre el listado navegando cada página con Playwright
         
         # Iniciar Playwright
         with sync_playwright() as p:
@@ -100,7 +290,7 @@ class ScraperListado:
             
             # Crear contexto
             context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                user_agent=USER_AGENT,
                 viewport={'width': 1920, 'height': 1080},
                 locale='es-CL'
             )
@@ -111,90 +301,747 @@ class ScraperListado:
             # Crear manejador de API
             manejador_api = ManejadorAPI(self.logger)
             
-            # Configurar interceptor
-            page.on('response', manejador_api.interceptar_respuesta)
+            # Configurar interceptor: con enrutador solo llegan a Python las respuestas de la API
+            if BLOQUEO_RECURSOS_ACTIVO:
+                EnrutadorRecursos(
+                    self.logger, self.estadisticas, manejador_api.interceptar_respuesta
+                ).instalar(page)
+            else:
+                page.on('response', manejador_api.interceptar_respuesta)
             
             try:
-                # Primera página (obtener metadata de paginación)
+                self._recorrer_paginas(
+                    lambda numero: self.scrapear_pagina(page, manejador_api, numero)
+                )
+            
+            finally:
+                # Cerrar navegador
+                context.close()
+                browser.close()
+                self.logger.info("Navegador cerrado")
+        
+        return self.compras
+    
+    def _scrapear_con_http(self):
+        
+        #Recorre el listado con el cliente HTTP keep-alive (sin renderizar la SPA)
+        
+        cliente = ClienteAPI(
+            self.logger,
+            tamano_pool=max(HTTP_POOL_CONEXIONES, self.concurrencia),
+            limitador=self.limitador,
+            estadisticas=self.estadisticas
+        )
+        
+        try:
+            # Un manejador por solicitud: la respuesta no se comparte entre hilos
+            self._recorrer_paginas(
+                lambda numero: self.scrapear_pagina_http(cliente, ManejadorAPI(self.logger), numero)
+            )
+        
+        finally:
+            cliente.cerrar()
+            self.logger.info("Cliente HTTP cerrado")
+        
+        return self.compras
+    
+    def _scrapear_con_pool(self):
+        
+        #Recorre el listado con N páginas de un único navegador (y opcionalmente
+        #varios procesos de navegador para las páginas 2..N)
+        
+        with PoolNavegador(self.logger, tamano=self.concurrencia,
+                           estadisticas=self.estadisticas, limitador=self.limitador) as pool:
+            obtener_lote = None
+            if self.procesos > 1:
+                self.logger.info(f"Repartiendo páginas entre {self.procesos} procesos de navegador")
+                obtener_lote = lambda paginas: procesar_en_procesos(
+                    paginas, partial(capturar_listado, parametros=self.parametros), self.procesos
+                )
+            
+            self._recorrer_paginas(
+                lambda numero: self.scrapear_pagina_pool(pool, numero),
+                obtener_lote=obtener_lote
+            )
+        
+        return self.compras
+    
+    def _scrapear_con_lotes(self):
+        
+        #Carga el buscador una vez y pide las páginas con fetch() en lotes
+        #desde la propia página (sin re-renderizar la SPA por cada página)
+        
+        with ClienteEnPagina(self.logger, self.estadisticas, limitador=self.limitador,
+                             parametros=self.parametros) as cliente:
+            self._recorrer_paginas(
+                lambda numero: self._registrar_datos_pagina(cliente.obtener_listado(numero), numero),
+                obtener_lote=cliente.obtener_lote,
+                tamano_lote=cliente.tamano_lote
+            )
+        
+        return self.compras
+    
+    def _recorrer_paginas(self, obtener_pagina, obtener_lote=None, tamano_lote=None):
+        
+        #Obtiene la página 1, lee la paginación y recorre las páginas restantes
+        #obtener_pagina: función (numero_pagina) -> datos o None
+        #obtener_lote: función opcional (paginas) -> {numero_pagina: datos crudos}
+        #tamano_lote: si se indica, obtener_lote se llama por tramos de ese tamaño
+        
+        if self.incremental:
+            return self._recorrer_incremental(obtener_pagina)
+        
+        # Las correcciones por corrimiento deben ver el listado actual, no la caché
+        obtener_pagina_directo = obtener_pagina
+        if self.cache_respuestas is not None:
+            obtener_pagina, obtener_lote = self._con_cache(obtener_pagina, obtener_lote)
+        
+        manejador_api = ManejadorAPI(self.logger)
+        
+        # Páginas fallidas: se reintentan al final sin frenar el barrido
+        cola_reintentos = ColaReintentos(self.logger, self.estadisticas)
+        inicio_compras = len(self.compras)
+        compras_por_pagina = {}
+        self._ids_emitidos = set()
+        
+        # resultCount visto al pedir cada página: si cambia, el listado se corrió
+        conteos_por_pagina = {}
+        
+        # Páginas ya capturadas en una corrida anterior con los mismos parámetros
+        paginas_guardadas = self._cargar_checkpoint()
+        
+        try:
+            if 1 in paginas_guardadas:
+                metadata = paginas_guardadas[1]['metadata']
+                resultados_p1 = paginas_guardadas[1]['resultados']
+                self.logger.info(f"Reanudando: {len(paginas_guardadas)} páginas ya capturadas")
+            else:
+                # Primera página (obtener metadata de paginación); el sondeo de
+                # tamaño de página puede entregarla ya obtenida
                 self.logger.info("Obteniendo información de paginación...")
-                datos_pagina_1 = self.scrapear_pagina(page, manejador_api, 1)
+                datos_pagina_1 = None
+                if self._sondear_tamano:
+                    datos_pagina_1 = self._sondear_tamano_pagina(obtener_pagina, manejador_api)
+                if not datos_pagina_1:
+                    datos_pagina_1 = obtener_pagina(1)
+                
+                if not datos_pagina_1:
+                    # Sin la página 1 no hay paginación: se reintenta de inmediato
+                    cola_reintentos.agregar(1)
+                    datos_pagina_1 = cola_reintentos.procesar(obtener_pagina).get(1)
                 
                 if not datos_pagina_1:
                     self.logger.error("ERROR: No se pudo obtener primera página")
-                    return []
+                    return
                 
                 # Extraer metadata
-                metadata = manejador_api.extraer_metadata_paginacion()
-                total_paginas = metadata['pageCount']
-                total_resultados = metadata['resultCount']
+                metadata = manejador_api.extraer_metadata_paginacion(datos_pagina_1)
+                resultados_p1 = manejador_api.extraer_resultados(datos_pagina_1)
+                self._guardar_checkpoint(1, resultados_p1, metadata)
+            
+            total_paginas = metadata['pageCount']
+            total_resultados = metadata['resultCount']
+            self.total_resultados = total_resultados
+            conteos_por_pagina[1] = total_resultados
+            
+            self.logger.info(f"Total de resultados: {total_resultados}")
+            self.logger.info(f"Total de páginas: {total_paginas}")
+            
+            # Agregar resultados de página 1
+            compras_por_pagina[1] = resultados_p1
+            self.compras.extend(resultados_p1)
+            self._emitir_pagina(1, resultados_p1)
+            
+            # Determinar páginas a procesar
+            if self.max_paginas:
+                paginas_a_procesar = min(total_paginas, self.max_paginas)
+            else:
+                paginas_a_procesar = total_paginas
+            
+            self.logger.info(f"Páginas a procesar: {paginas_a_procesar}")
+            self.logger.info("-" * 60)
+            
+            # Páginas restantes (desde 2), en orden de página, sin las ya capturadas
+            paginas_restantes = []
+            for num_pagina in range(2, paginas_a_procesar + 1):
+                if num_pagina in paginas_guardadas:
+                    compras_por_pagina[num_pagina] = paginas_guardadas[num_pagina]['resultados']
+                    self.compras.extend(compras_por_pagina[num_pagina])
+                    self._emitir_pagina(num_pagina, compras_por_pagina[num_pagina])
+                else:
+                    paginas_restantes.append(num_pagina)
+            
+            if obtener_lote:
+                paginas_obtenidas = self._obtener_lote(obtener_lote, paginas_restantes, tamano_lote)
+            else:
+                paginas_obtenidas = self._obtener_paginas(obtener_pagina, paginas_restantes)
+            
+            for num_pagina, datos_pagina in paginas_obtenidas:
+                if datos_pagina:
+                    resultados = manejador_api.extraer_resultados(datos_pagina)
+                    compras_por_pagina[num_pagina] = resultados
+                    conteos_por_pagina[num_pagina] = self._conteo_pagina(manejador_api, datos_pagina)
+                    self.compras.extend(resultados)
+                    self._guardar_checkpoint(num_pagina, resultados)
+                    self._emitir_pagina(num_pagina, resultados)
+                    
+                    self.logger.info(
+                        f"Progreso: {num_pagina}/{paginas_a_procesar} | "
+                        f"Total compras: {len(self.compras)}"
+                    )
+                else:
+                    self.logger.warning(f"Página {num_pagina} falló, se reintentará al final")
+                    cola_reintentos.agregar(num_pagina)
+            
+            # Reintentos con backoff; las páginas recuperadas vuelven a su posición
+            recuperadas = cola_reintentos.procesar(obtener_pagina)
+            for num_pagina, datos_pagina in recuperadas.items():
+                compras_por_pagina[num_pagina] = manejador_api.extraer_resultados(datos_pagina)
+                conteos_por_pagina[num_pagina] = self._conteo_pagina(manejador_api, datos_pagina)
+                self._guardar_checkpoint(num_pagina, compras_por_pagina[num_pagina])
+                self._emitir_pagina(num_pagina, compras_por_pagina[num_pagina])
+            
+            if recuperadas:
+                self.logger.info(f"Páginas recuperadas en reintentos: {sorted(recuperadas)}")
+            
+            # Duplicados y huecos por publicaciones nuevas o retiradas durante el recorrido
+            self._corregir_deriva(
+                compras_por_pagina, conteos_por_pagina, obtener_pagina_directo,
+                manejador_api, paginas_a_procesar, metadata['pageSize']
+            )
+            
+            self.compras[inicio_compras:] = [
+                compra for num_pagina in sorted(compras_por_pagina)
+                for compra in compras_por_pagina[num_pagina]
+            ]
+            
+            # Log final
+            self.logger.info("-" * 60)
+            self.logger.info(f"Scraping completado: {len(self.compras)} compras")
+            
+            self._reportar_completitud(
+                metadata, paginas_a_procesar,
+                len(self.compras) - inicio_compras, cola_reintentos.fallidos
+            )
+            
+        except FlujoDetenido:
+            self.logger.info("Recorrido cortado: el consumidor del flujo dejó de leer")
+        except Exception as e:
+            self.logger.error(f"ERROR crítico durante scraping: {e}")
+    
+    def _recorrer_incremental(self, obtener_pagina):
+        
+        #Con order_by=recent las compras nuevas aparecen primero: se prueba la
+        #página 1 y se avanza solo hasta una página formada por compras ya vistas
+        #Deja en self.compras únicamente las compras nuevas
+        
+        manejador_api = ManejadorAPI(self.logger)
+        if self.indice is None:
+            self.indice = IndiceCompras(construir_parametros_listado(1, self.parametros))
+        indice = self.indice
+        
+        try:
+            self.logger.info(f"Modo incremental: {len(indice)} compras conocidas")
+            
+            datos_pagina_1 = obtener_pagina(1)
+            if not datos_pagina_1:
+                self.logger.error("ERROR: No se pudo obtener primera página")
+                return
+            
+            metadata = manejador_api.extraer_metadata_paginacion(datos_pagina_1)
+            resultados = manejador_api.extraer_resultados(datos_pagina_1)
+            self.total_resultados = metadata['resultCount']
+            
+            # Sondeo barato: mismo resultCount y página 1 ya conocida => nada nuevo
+            if (metadata['resultCount'] == indice.ultimo_result_count
+                    and all(compra in indice for compra in resultados)):
+                self.logger.info("Sin cambios desde la última corrida (sondeo de página 1)")
+                return
+            
+            total_paginas = metadata['pageCount']
+            if self.max_paginas:
+                total_paginas = min(total_paginas, self.max_paginas)
+            
+            completo = True
+            numero_pagina = 1
+            
+            while True:
+                nuevas = [compra for compra in resultados if compra not in indice]
+                self.compras.extend(nuevas)
+                self._emitir_pagina(numero_pagina, nuevas)
+                self.logger.info(f"Página {numero_pagina}: {len(nuevas)} compras nuevas")
                 
-                self.logger.info(f"Total de resultados: {total_resultados}")
-                self.logger.info(f"Total de páginas: {total_paginas}")
+                if not nuevas and indice:
+                    self.logger.info(f"Página {numero_pagina} ya conocida: fin del recorrido incremental")
+                    break
                 
-                # Agregar resultados de página 1
-                resultados_p1 = manejador_api.extraer_resultados()
-                self.compras.extend(resultados_p1)
+                if numero_pagina >= total_paginas:
+                    break
                 
-                # Determinar páginas a procesar
-                if self.max_paginas:
-                    paginas_a_procesar = min(total_paginas, self.max_paginas)
-                else:
-                    paginas_a_procesar = total_paginas
+                numero_pagina += 1
+                datos_pagina = obtener_pagina(numero_pagina)
+                if not datos_pagina:
+                    self.logger.warning(f"Página {numero_pagina} falló, recorrido incremental incompleto")
+                    completo = False
+                    break
                 
-                self.logger.info(f"Páginas a procesar: {paginas_a_procesar}")
-                self.logger.info("-" * 60)
+                resultados = manejador_api.extraer_resultados(datos_pagina)
+            
+            # El resultCount solo se confirma si se llegó a compras conocidas
+            indice.agregar(self.compras)
+            indice.guardar(metadata['resultCount'] if completo else None)
+            
+            self.logger.info("-" * 60)
+            self.logger.info(
+                f"Incremental completado: {len(self.compras)} compras nuevas "
+                f"en {numero_pagina} páginas"
+            )
+            
+        except FlujoDetenido:
+            self.logger.info("Recorrido cortado: el consumidor del flujo dejó de leer")
+        except Exception as e:
+            self.logger.error(f"ERROR crítico durante scraping incremental: {e}")
+    
+    def _aplicar_tamano_pagina(self):
+        
+        #Usa el tamaño de página recordado para este modo o programa un sondeo
+        #No aplica al modo incremental (su índice depende de los parámetros)
+        
+        self._sondear_tamano = False
+        if not self.tamano_pagina_auto or self.incremental or PARAMETRO_TAMANO_PAGINA in self.parametros:
+            return
+        
+        conocido, tamano = leer_tamano_pagina(self.modo)
+        if not conocido:
+            self._sondear_tamano = True
+        elif tamano:
+            self.parametros[PARAMETRO_TAMANO_PAGINA] = tamano
+            self.logger.info(f"Tamaño de página: {tamano}")
+    
+    def _sondear_tamano_pagina(self, obtener_pagina, manejador_api):
+        
+        #Pide la página 1 con tamaños candidatos (de mayor a menor) hasta que
+        #uno sea aceptado; si el servidor lo recorta se usa su máximo
+        #Un parámetro ignorado (sigue llegando el tamaño base) corta el sondeo
+        #Las solicitudes del sondeo no cuentan en las estadísticas de la corrida
+        #Retorna: Datos de la página 1 con el tamaño elegido, o None si hay que pedirla
+        
+        self._sondear_tamano = False
+        parametro = PARAMETRO_TAMANO_PAGINA
+        tamano_elegido = None
+        datos_elegidos = None
+        sin_decidir = False
+        
+        estadisticas = self.estadisticas
+        self.estadisticas = EstadisticasScraper()
+        try:
+            for candidato in TAMANO_PAGINA_CANDIDATOS:
+                if candidato <= TAMANO_PAGINA_BASE:
+                    continue
                 
-                # Scrapear páginas restantes (desde 2)
-                for num_pagina in range(2, paginas_a_procesar + 1):
-                    # Aplicar delay
-                    aplicar_delay(DELAY_ENTRE_REQUESTS)
-                    
-                    # Scrapear página
-                    datos_pagina = self.scrapear_pagina(page, manejador_api, num_pagina)
-                    
-                    if datos_pagina:
-                        resultados = manejador_api.extraer_resultados()
-                        self.compras.extend(resultados)
-                        
-                        self.logger.info(
-                            f"Progreso: {num_pagina}/{paginas_a_procesar} | "
-                            f"Total compras: {len(self.compras)}"
-                        )
-                    else:
-                        self.logger.warning(f"Saltando página {num_pagina} por error")
-                
-                # Log final
-                self.logger.info("-" * 60)
-                self.logger.info(f"Scraping completado: {len(self.compras)} compras")
+                self.parametros[parametro] = candidato
+                self.logger.info(f"Sondeando tamaño de página {candidato}...")
+                datos = obtener_pagina(1)
                 
-            except Exception as e:
-                self.logger.error(f"ERROR crítico durante scraping: {e}")
+                if not datos:
+                    self.logger.info(f"Tamaño de página {candidato} rechazado")
+                    continue
+                
+                metadata = manejador_api.extraer_metadata_paginacion(datos)
+                resultados = manejador_api.extraer_resultados(datos)
+                
+                # Con pocos resultados no se distingue aceptado de ignorado: sin decidir
+                if metadata['resultCount'] <= TAMANO_PAGINA_BASE:
+                    sin_decidir = True
+                    break
+                
+                if len(resultados) <= TAMANO_PAGINA_BASE:
+                    self.logger.info(f"El servidor ignora '{parametro}'")
+                    break
+                
+                tamano_elegido = min(candidato, metadata['pageSize'] or len(resultados))
+                if tamano_elegido == candidato:
+                    datos_elegidos = datos
+                break
+        finally:
+            self.estadisticas = estadisticas
+        
+        guardar_tamano_pagina(self.modo, tamano_elegido, sin_decidir=sin_decidir)
+        
+        if tamano_elegido:
+            self.parametros[parametro] = tamano_elegido
+            self.logger.info(f"Tamaño de página aceptado: {tamano_elegido}")
+        else:
+            self.parametros.pop(parametro, None)
+            if sin_decidir:
+                self.logger.info("Muy pocos resultados para decidir el tamaño de página")
+            self.logger.info(f"Se usa el tamaño de página por defecto ({TAMANO_PAGINA_BASE})")
+        
+        # La página 1 del sondeo se reutiliza: cuenta como página de la corrida
+        if datos_elegidos:
+            self.estadisticas.incrementar_paginas()
+            self.estadisticas.incrementar_items(len(manejador_api.extraer_resultados(datos_elegidos)))
+        
+        # El checkpoint depende de los parámetros de la consulta
+        if self.checkpoint is not None:
+            self.checkpoint = GestorCheckpoint(
+                'listado', construir_parametros_listado(1, self.parametros)
+            )
+        
+        return datos_elegidos
+    
+    def _emitir_pagina(self, numero_pagina, compras):
+        
+        #Entrega las compras de una página al archivo JSONL y al consumidor del
+        #flujo, si los hay, sin las que ya se entregaron en otra página
+        #Una página puede entregarse más de una vez (reintentos, corrección de
+        #corrimiento): cada entrega trae solo compras nuevas y se acumula a las
+        #anteriores de esa página, nunca las reemplaza
+        
+        if self._al_recibir_pagina is None and self.escritor is None:
+            return
+        
+        nuevas = []
+        for compra in compras:
+            identificador = identificador_compra(compra)
+            if identificador is not None:
+                if identificador in self._ids_emitidos:
+                    continue
+                self._ids_emitidos.add(identificador)
+            nuevas.append(compra)
+        
+        # Cada página es un checkpoint: se pide fsync (lo hace el hilo escritor)
+        if self.escritor is not None:
+            self.escritor.escribir(nuevas, sincronizar=True)
+        
+        if self._al_recibir_pagina is not None:
+            self._al_recibir_pagina(numero_pagina, nuevas)
+    
+    def _conteo_pagina(self, manejador_api, datos_pagina):
+        
+        #resultCount informado junto con una página (None si no viene)
+        
+        return manejador_api.extraer_metadata_paginacion(datos_pagina).get('resultCount')
+    
+    def _corregir_deriva(self, compras_por_pagina, conteos_por_pagina, obtener_pagina,
+                         manejador_api, paginas_a_procesar, tamano_pagina):
+        
+        #Con order_by=recent, una publicación nueva empuja compras a la página
+        #siguiente (se repiten) y una retirada las sube a la anterior (se saltan)
+        #- Repetidas: se descartan y se vuelven a pedir las primeras páginas
+        #  hasta no encontrar compras nuevas (ahí quedaron las publicaciones nuevas)
+        #- resultCount menor que en la página anterior: se vuelve a pedir la
+        #  página del borde para recoger lo que subió
+        #- Si el listado creció lo suficiente, las más antiguas pasan a páginas
+        #  nuevas al final: se piden también (salvo límite de páginas)
+        #Modifica compras_por_pagina en su lugar
+        
+        vistos = set()
+        duplicados = 0
+        bordes_con_hueco = []
+        
+        for num_pagina in sorted(compras_por_pagina):
+            unicas = []
+            for compra in compras_por_pagina[num_pagina]:
+                identificador = identificador_compra(compra)
+                if identificador is not None:
+                    if identificador in vistos:
+                        duplicados += 1
+                        continue
+                    vistos.add(identificador)
+                unicas.append(compra)
+            compras_por_pagina[num_pagina] = unicas
+            
+            conteo_anterior = conteos_por_pagina.get(num_pagina - 1)
+            conteo = conteos_por_pagina.get(num_pagina)
+            if conteo is not None and conteo_anterior is not None and conteo < conteo_anterior:
+                bordes_con_hueco.append(num_pagina - 1)
+        
+        conteo_inicial = conteos_por_pagina.get(1)
+        hubo_inserciones = duplicados > 0 or any(
+            conteo is not None and conteo_inicial is not None and conteo > conteo_inicial
+            for conteo in conteos_por_pagina.values()
+        )
+        
+        if not duplicados and not bordes_con_hueco and not hubo_inserciones:
+            return
+        
+        self.logger.warning(
+            f"Corrimiento del listado: {duplicados} compras repetidas, "
+            f"{len(bordes_con_hueco)} bordes con posibles saltos {bordes_con_hueco}"
+        )
+        
+        repeticiones = DERIVA_MAXIMO_REPETICIONES
+        recuperadas = 0
+        
+        def repetir(num_pagina, al_inicio):
+            
+            #Vuelve a pedir una página y agrega sus compras no vistas
+            #Retorna: Cantidad de compras agregadas (None si la página falló)
+            
+            datos = obtener_pagina(num_pagina)
+            if not datos:
+                return None
+            
+            nuevas = []
+            for compra in manejador_api.extraer_resultados(datos):
+                identificador = identificador_compra(compra)
+                if identificador is not None and identificador not in vistos:
+                    vistos.add(identificador)
+                    nuevas.append(compra)
+            
+            if nuevas:
+                actuales = compras_por_pagina.get(num_pagina, [])
+                compras_por_pagina[num_pagina] = nuevas + actuales if al_inicio else actuales + nuevas
+                self._emitir_pagina(num_pagina, nuevas)
+            return len(nuevas)
+        
+        # Publicaciones nuevas: quedan al comienzo del listado
+        if hubo_inserciones:
+            num_pagina = 1
+            while repeticiones > 0 and num_pagina <= paginas_a_procesar:
+                repeticiones -= 1
+                agregadas = repetir(num_pagina, al_inicio=True)
+                if not agregadas:
+                    break
+                recuperadas += agregadas
+                num_pagina += 1
+        
+        # Publicaciones retiradas: lo saltado subió a la página del borde
+        paginas_finales = []
+        if hubo_inserciones and not self.max_paginas and tamano_pagina:
+            conteo_maximo = max(conteo for conteo in conteos_por_pagina.values() if conteo is not None)
+            total_paginas = -(-conteo_maximo // tamano_pagina)
+            paginas_finales = list(range(paginas_a_procesar + 1, total_paginas + 1))
+        
+        for num_pagina in bordes_con_hueco + paginas_finales:
+            if repeticiones <= 0:
+                self.logger.warning("Límite de páginas repetidas alcanzado (DRIFT_MAX_REFETCH)")
+                break
+            repeticiones -= 1
+            recuperadas += repetir(num_pagina, al_inicio=False) or 0
+        
+        self.estadisticas.registrar_deriva(duplicados, len(bordes_con_hueco), recuperadas)
+        self.logger.info(f"Corrimiento corregido: {recuperadas} compras recuperadas")
+    
+    def _con_cache(self, obtener_pagina, obtener_lote=None):
+        
+        #Envuelve las funciones de obtención para servir desde la caché de respuestas
+        #las páginas vigentes y guardar las que se piden al sitio
+        #La clave es la URL de la API: es la misma en todos los modos
+        
+        cache = self.cache_respuestas
+        
+        def buscar(numero_pagina):
+            if self.omitir_cache:
+                return None
+            datos = cache.obtener(construir_url_api_listado(numero_pagina, self.parametros))
+            self.estadisticas.registrar_cache_listado(datos is not None)
+            return datos
+        
+        def guardar(numero_pagina, datos):
+            if datos:
+                cache.guardar(construir_url_api_listado(numero_pagina, self.parametros), datos)
+        
+        def pagina_con_cache(numero_pagina):
+            datos = buscar(numero_pagina)
+            if datos is not None:
+                self.logger.info(f"Página {numero_pagina} desde caché")
+                return self._registrar_datos_pagina(datos, numero_pagina)
+            
+            datos = obtener_pagina(numero_pagina)
+            guardar(numero_pagina, datos)
+            return datos
+        
+        def lote_con_cache(paginas):
+            datos_por_pagina = {}
+            pendientes = []
+            for numero in paginas:
+                datos = buscar(numero)
+                if datos is not None:
+                    datos_por_pagina[numero] = datos
+                else:
+                    pendientes.append(numero)
+            
+            if pendientes:
+                nuevos = obtener_lote(pendientes)
+                for numero, datos in nuevos.items():
+                    guardar(numero, datos)
+                datos_por_pagina.update(nuevos)
             
+            return datos_por_pagina
+        
+        return pagina_con_cache, (lote_con_cache if obtener_lote else None)
+    
+    def _cargar_checkpoint(self):
+        
+        #Páginas del checkpoint si se está reanudando; si no, parte desde cero
+        #Retorna: Diccionario numero_pagina -> {'resultados': [...], 'metadata': {...}}
+        
+        if not self.checkpoint:
+            return {}
+        
+        if not self.reanudar:
+            self.checkpoint.eliminar()
+            return {}
+        
+        return self.checkpoint.cargar()
+    
+    def _guardar_checkpoint(self, numero_pagina, resultados, metadata=None):
+        
+        #Registra una página capturada para poder reanudar si la corrida se corta
+        
+        if not self.checkpoint:
+            return
+        
+        registro = {'resultados': resultados}
+        if metadata is not None:
+            registro['metadata'] = metadata
+        
+        self.checkpoint.guardar(numero_pagina, registro)
+    
+    def _reportar_completitud(self, metadata, paginas_a_procesar, compras_obtenidas, paginas_fallidas):
+        
+        #Compara las compras obtenidas con las que anuncia resultCount
+        #(acotado a las páginas procesadas si hay límite de páginas)
+        
+        compras_esperadas = metadata['resultCount']
+        if paginas_a_procesar < metadata['pageCount'] and metadata['pageSize']:
+            compras_esperadas = min(compras_esperadas, paginas_a_procesar * metadata['pageSize'])
+        
+        faltantes = max(0, compras_esperadas - compras_obtenidas)
+        
+        self.reporte_completitud = {
+            'compras_esperadas': compras_esperadas,
+            'compras_obtenidas': compras_obtenidas,
+            'compras_faltantes': faltantes,
+            'paginas_fallidas': sorted(paginas_fallidas),
+            'completitud': round(100 * compras_obtenidas / compras_esperadas, 2) if compras_esperadas else 100.0
+        }
+        
+        self.logger.info("REPORTE DE COMPLETITUD")
+        for clave, valor in self.reporte_completitud.items():
+            self.logger.info(f"{clave}: {valor}")
+        
+        if faltantes or paginas_fallidas:
+            self.logger.warning(
+                f"Listado incompleto: faltan {faltantes} compras "
+                f"({len(paginas_fallidas)} páginas sin recuperar)"
+            )
+    
+    def _obtener_paginas(self, obtener_pagina, paginas):
+        
+        #Genera (numero_pagina, datos) en orden de página
+        #Con concurrencia > 1 las páginas se piden en paralelo (máximo self.concurrencia a la vez)
+        #El ritmo lo impone el limitador en cada solicitud, no una pausa fija
+        
+        if self.concurrencia <= 1:
+            for numero in paginas:
+                yield numero, obtener_pagina(numero)
+            return
+        
+        # Solo self.concurrencia páginas en vuelo: cada una que se entrega libera
+        # el lugar de la siguiente, así un consumidor lento o un corte no dejan
+        # todo el recorrido encolado en el executor
+        pendientes = iter(paginas)
+        en_vuelo = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.concurrencia) as executor:
+            try:
+                for numero in itertools.islice(pendientes, self.concurrencia):
+                    en_vuelo.append((numero, executor.submit(obtener_pagina, numero)))
+                
+                while en_vuelo:
+                    numero, futuro = en_vuelo.popleft()
+                    datos = futuro.result()
+                    
+                    for siguiente in itertools.islice(pendientes, 1):
+                        en_vuelo.append((siguiente, executor.submit(obtener_pagina, siguiente)))
+                    
+                    yield numero, datos
             finally:
-                # Cerrar navegador
-                context.close()
-                browser.close()
-                self.logger.info("Navegador cerrado")
+                for _, futuro in en_vuelo:
+                    futuro.cancel()
+    
+    def _obtener_lote(self, obtener_lote, paginas, tamano_lote=None):
         
-        return self.compras
+        #Obtiene las páginas en bloque (otros procesos o fetch en lote) y las
+        #registra en orden de página en este proceso
+        
+        paginas = list(paginas)
+        tamano_lote = tamano_lote or len(paginas) or 1
+        
+        for inicio in range(0, len(paginas), tamano_lote):
+            tramo = paginas[inicio:inicio + tamano_lote]
+            datos_por_pagina = obtener_lote(tramo)
+            
+            for numero in tramo:
+                yield numero, self._registrar_datos_pagina(datos_por_pagina.get(numero), numero)
     
     def guardar_resultados(self, nombre_archivo=None):
         #Guarda resultados en JSON
         #y retorna ruta del archivo guardado
+        #Con salida JSONL las compras ya están en disco: solo se cierra el archivo
+        if self.escritor is not None and not nombre_archivo:
+            try:
+                self.escritor.cerrar()
+                self.logger.info(
+                    f"Resultados guardados en: {self.escritor.ruta} "
+                    f"({self.escritor.total_escritas} compras)"
+                )
+                self._guardar_snapshot(self.escritor.ruta)
+                self._guardar_en_base_datos()
+                return str(self.escritor.ruta)
+            except Exception as e:
+                self.logger.error(f"{e} - se guarda en JSON")
+        
         if not nombre_archivo:
-            timestamp = obtener_timestamp()
-            nombre_archivo = f"compras_completas_{timestamp}.json"
+            nombre_archivo = self._nombre_salida('json')
         
         ruta = guardar_json(self.compras, nombre_archivo)
         self.logger.info(f"Resultados guardados en: {ruta}")
+        self._guardar_snapshot(ruta)
+        self._guardar_en_base_datos()
         
         return str(ruta)
     
-    def ejecutar(self, guardar=True):
+    def _guardar_snapshot(self, ruta_salida):
+        
+        #Copia tipada y columnar del listado (la que main.py carga al iniciar)
+        #Un fallo aquí no afecta al archivo ya guardado
+        
+        if not self.snapshot or not self.compras:
+            return
+        
+        try:
+            ruta = guardar_snapshot(self.compras, Path(ruta_salida).stem)
+            self.logger.info(f"Snapshot columnar: {ruta}")
+        except Exception as e:
+            self.logger.warning(f"No se pudo escribir el snapshot: {e}")
+    
+    def _guardar_en_base_datos(self):
+        
+        #Inserta o actualiza las compras por id en la base (SQLite o PostgreSQL)
+        
+        if not self.base_datos or not self.compras:
+            return
+        
+        try:
+            almacen = AlmacenCompras()
+            guardadas = almacen.guardar_compras(self.compras)
+            almacen.cerrar()
+            self.logger.info(f"Base de datos: {guardadas} compras guardadas")
+        except Exception as e:
+            self.logger.warning(f"No se pudo guardar en la base de datos: {e}")
+    
+    def ejecutar(self, guardar=True, reanudar=False):
         
         #Ejecuta el scraping completo
+        #reanudar: retoma el checkpoint de una corrida cortada con los mismos parámetros
         
         try:
+            self._preparar_corrida(reanudar, guardar)
+            
             # Scrapear
             compras = self.scrapear_todas_las_paginas()
             
@@ -203,12 +1050,162 @@ class ScraperListado:
             if guardar and compras:
                 ruta_archivo = self.guardar_resultados()
             
-            # Registrar estadísticas
-            self.estadisticas.registrar_resumen_en_log(self.logger)
+            self._finalizar_corrida()
             
             return compras, ruta_archivo
             
         except Exception as e:
             self.logger.error(f"ERROR en ejecución: {e}")
+            self._cerrar_escritor()
+            self._cerrar_cache()
             self.estadisticas.registrar_resumen_en_log(self.logger)
-            return [], None
\ No newline at end of file
+            return [], None
+    
+    def iterar_paginas(self, tamano_buffer=TAMANO_BUFFER_FLUJO, reanudar=False, guardar=False):
+        
+        #Recorre el listado en segundo plano y entrega (numero_pagina, compras)
+        #apenas llega cada página, para filtrar/guardar sin esperar el total
+        #El buffer acotado aplica contrapresión: con tamano_buffer páginas sin
+        #consumir, el recorrido se detiene hasta que el consumidor lea
+        #Un mismo numero_pagina puede llegar otra vez con compras adicionales
+        #(ver _emitir_pagina): el consumidor acumula por página, no reemplaza
+        #Al terminar, self.compras tiene todas las compras en orden de página
+        #guardar: escribe el JSONL en paralelo (guardar_resultados retorna su ruta)
+        
+        buffer = queue.Queue(maxsize=max(1, tamano_buffer))
+        detenido = threading.Event()
+        errores = []
+        
+        def encolar(elemento):
+            while not detenido.is_set():
+                try:
+                    buffer.put(elemento, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            raise FlujoDetenido()
+        
+        def recorrer():
+            try:
+                self.scrapear_todas_las_paginas()
+            except FlujoDetenido:
+                pass
+            except Exception as e:
+                errores.append(e)
+            finally:
+                try:
+                    encolar(_FIN_FLUJO)
+                except FlujoDetenido:
+                    pass
+        
+        self._preparar_corrida(reanudar, guardar)
+        self._al_recibir_pagina = lambda numero, compras: encolar((numero, compras))
+        productor = threading.Thread(target=recorrer, name='listado-flujo', daemon=True)
+        productor.start()
+        
+        try:
+            while True:
+                elemento = buffer.get()
+                if elemento is _FIN_FLUJO:
+                    break
+                yield elemento
+        finally:
+            detenido.set()
+            productor.join()
+            self._al_recibir_pagina = None
+            self._cerrar_escritor()
+            self._cerrar_cache()
+        
+        if errores:
+            raise errores[0]
+        
+        self._finalizar_corrida()
+    
+    async def aiterar_paginas(self, tamano_buffer=TAMANO_BUFFER_FLUJO, reanudar=False, guardar=False):
+        
+        #Versión asíncrona de iterar_paginas: la espera de cada página no
+        #bloquea el event loop
+        
+        loop = asyncio.get_running_loop()
+        paginas = self.iterar_paginas(tamano_buffer, reanudar, guardar)
+        
+        try:
+            while True:
+                elemento = await loop.run_in_executor(None, next, paginas, _FIN_FLUJO)
+                if elemento is _FIN_FLUJO:
+                    break
+                yield elemento
+        finally:
+            await loop.run_in_executor(None, paginas.close)
+    
+    def hay_corrida_interrumpida(self):
+        
+        #True si quedó un checkpoint de una corrida anterior con estos parámetros
+        #(incluido el tamaño de página que se usaría)
+        
+        self._aplicar_tamano_pagina()
+        return GestorCheckpoint('listado', construir_parametros_listado(1, self.parametros)).existe()
+    
+    def _preparar_corrida(self, reanudar=False, guardar=False):
+        
+        #Checkpoint por página y caché de respuestas para los parámetros de consulta
+        #guardar: abre el JSONL de salida para escribir cada página al llegar
+        
+        self._aplicar_tamano_pagina()
+        
+        self.checkpoint = GestorCheckpoint(
+            'listado', construir_parametros_listado(1, self.parametros)
+        )
+        self.reanudar = reanudar
+        
+        # Caché de respuestas compartida con otros puntos de entrada del día
+        if CACHE_RESPUESTAS_TTL > 0 and not self.incremental:
+            self.cache_respuestas = CacheRespuestas()
+        
+        if guardar and self.salida_jsonl:
+            self.escritor = EscritorJSONL(DIRECTORIO_DATOS_RAW / self._nombre_salida('jsonl'))
+    
+    def _nombre_salida(self, extension):
+        prefijo = 'compras_nuevas' if self.incremental else 'compras_completas'
+        return f"{prefijo}_{obtener_timestamp()}.{extension}"
+    
+    def _cerrar_escritor(self):
+        
+        #Cierra el JSONL de salida; un archivo sin compras se borra
+        
+        if self.escritor is None:
+            return
+        
+        try:
+            self.escritor.cerrar()
+        except Exception as e:
+            self.logger.error(str(e))
+        
+        if self.escritor.total_escritas == 0 and self.escritor.ruta.exists():
+            self.escritor.ruta.unlink()
+            self.escritor = None
+    
+    def _cerrar_cache(self):
+        
+        #Cierra la conexión de la caché de respuestas (ejecutar la vuelve a abrir)
+        
+        if self.cache_respuestas is None:
+            return
+        
+        try:
+            self.cache_respuestas.cerrar()
+        except Exception as e:
+            self.logger.debug(f"Error al cerrar la caché de respuestas: {e}")
+        self.cache_respuestas = None
+    
+    def _finalizar_corrida(self):
+        
+        self._cerrar_escritor()
+        self._cerrar_cache()
+        
+        # Corrida completa: el checkpoint ya no hace falta
+        if self.reporte_completitud and not self.reporte_completitud['paginas_fallidas']:
+            self.checkpoint.eliminar()
+        
+        # Registrar estadísticas
+        self.estadisticas.registrar_resumen_en_log(self.logger)
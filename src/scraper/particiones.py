@@ -0,0 +1,173 @@
+"""
+Crawl del listado particionado por región (y opcionalmente por estado)
+Cada partición tiene menos páginas que la consulta global, se scrapean en
+paralelo y el resultado se une sin duplicados y se contrasta con el
+resultCount global (si ya se conoce, p. ej. por el planificador)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .list_scraper import ScraperListado
+from .utilidades.logger import configurar_logger
+from .utilidades.helpers import guardar_json, obtener_timestamp, deduplicar_compras
+from config.config import (
+    MODO_SCRAPING,
+    REGIONES,
+    PARTICIONES_CONCURRENTES
+)
+
+
+def generar_particiones(regiones, estados=None):
+    """
+    Combina regiones y estados en particiones de la consulta
+
+    Args:
+        regiones: Códigos de región
+        estados: Códigos de estado (None = el estado de la consulta base)
+
+    Returns:
+        list: Diccionarios de parámetros {'region': ..., 'status': ...}
+    """
+    if not estados:
+        return [{'region': region} for region in regiones]
+
+    return [
+        {'region': region, 'status': estado}
+        for estado in estados
+        for region in regiones
+    ]
+
+
+def _scrapear_particion(parametros, modo, max_paginas=None):
+
+    #Scrapea una partición y retorna sus compras, su resultCount y si quedó completa
+    #El limitador es el del proceso, compartido por todas las particiones
+
+    scraper = ScraperListado(max_paginas=max_paginas, modo=modo, parametros=parametros)
+    compras, _ = scraper.ejecutar(guardar=False)
+    reporte = scraper.reporte_completitud or {}
+
+    return {
+        'compras': compras,
+        'total_resultados': scraper.total_resultados,
+        'completo': bool(reporte) and not reporte.get('paginas_fallidas')
+    }
+
+
+class ScraperParticionado:
+    """
+    Scraper del listado repartido en particiones por región/estado
+
+    Atributos:
+        particiones: Parámetros de cada partición
+        concurrencia: Particiones scrapeadas a la vez
+        total_global: resultCount de la consulta sin partir, ya conocido (None = no se verifica)
+        reporte: Totales por partición contra el resultCount global (tras ejecutar)
+    """
+
+    def __init__(self, regiones=None, estados=None, modo=MODO_SCRAPING,
+                 concurrencia=PARTICIONES_CONCURRENTES, max_paginas=None, parametros=None,
+                 total_global=None):
+        self.regiones = list(regiones or REGIONES)
+        self.estados = list(estados or [])
+        self.modo = modo
+        self.concurrencia = max(1, concurrencia)
+        self.max_paginas = max_paginas
+        self.parametros = dict(parametros or {})
+        self.particiones = generar_particiones(self.regiones, self.estados)
+        self.total_global = total_global
+        self.reporte = None
+
+        nombre_log = f'scraper_particiones_{datetime.now().strftime("%Y%m%d")}.log'
+        self.logger = configurar_logger('scraper_particiones', nombre_log)
+
+    @staticmethod
+    def _nombre(particion):
+        return ' '.join(f"{clave}={valor}" for clave, valor in particion.items())
+
+    def scrapear_particiones(self):
+
+        #Scrapea todas las particiones (en hilos si concurrencia > 1)
+        #Retorna: Lista de resultados en el orden de self.particiones
+
+        def scrapear(particion):
+            try:
+                resultado = _scrapear_particion(
+                    {**self.parametros, **particion}, self.modo, self.max_paginas
+                )
+            except Exception as e:
+                self.logger.error(f"ERROR en partición {self._nombre(particion)}: {e}")
+                resultado = {'compras': [], 'total_resultados': None, 'completo': False}
+
+            self.logger.info(
+                f"Partición {self._nombre(particion)}: {len(resultado['compras'])}/"
+                f"{resultado['total_resultados']} compras"
+            )
+            return resultado
+
+        self.logger.info("=" * 60)
+        self.logger.info(
+            f"CRAWL PARTICIONADO: {len(self.particiones)} particiones | "
+            f"Concurrencia: {self.concurrencia}"
+        )
+        self.logger.info("=" * 60)
+
+        if self.concurrencia == 1:
+            return [scrapear(particion) for particion in self.particiones]
+
+        with ThreadPoolExecutor(max_workers=self.concurrencia) as executor:
+            return list(executor.map(scrapear, self.particiones))
+
+    def _verificar_totales(self, resultados, compras_unicas):
+
+        #Suma los resultCount de las particiones y los compara con el global
+        #El global no se consulta aquí: pedirlo es otra corrida del listado por estado
+
+        suma_particiones = sum(r['total_resultados'] or 0 for r in resultados)
+        total_global = self.total_global
+
+        self.reporte = {
+            'particiones': len(self.particiones),
+            'particiones_incompletas': [
+                self._nombre(particion)
+                for particion, resultado in zip(self.particiones, resultados)
+                if not resultado['completo']
+            ],
+            'total_particiones': suma_particiones,
+            'total_global': total_global,
+            'compras_obtenidas': sum(len(r['compras']) for r in resultados),
+            'compras_unicas': compras_unicas,
+            'coincide': None if total_global is None else total_global == suma_particiones
+        }
+
+        self.logger.info("VERIFICACIÓN DE PARTICIONES")
+        for clave, valor in self.reporte.items():
+            self.logger.info(f"{clave}: {valor}")
+
+        if total_global is None:
+            self.logger.info("Total global desconocido: no se verificó la suma de particiones")
+        elif not self.reporte['coincide']:
+            self.logger.warning(
+                f"La suma de particiones ({suma_particiones}) no coincide con el total "
+                f"global ({total_global}): revisa la lista de regiones"
+            )
+
+    def ejecutar(self, guardar=True):
+
+        #Ejecuta el crawl particionado completo
+        #Retorna: (compras, ruta del archivo o None, reporte de verificación)
+
+        resultados = self.scrapear_particiones()
+
+        # Unión en el orden de las particiones, sin duplicados
+        compras = deduplicar_compras([
+            compra for resultado in resultados for compra in resultado['compras']
+        ])
+
+        self._verificar_totales(resultados, len(compras))
+
+        ruta = None
+        if guardar and compras:
+            ruta = str(guardar_json(compras, f"compras_particionadas_{obtener_timestamp()}.json"))
+            self.logger.info(f"Resultados guardados en: {ruta}")
+
+        return compras, ruta, self.reporte
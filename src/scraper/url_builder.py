@@ -3,33 +3,51 @@ Constructor de URLs para Mercado Público
 Genera URLs para páginas web y endpoints de API
 """
 from typing import Dict
+from urllib.parse import urlencode
 from config.config import (
     URL_BASE_WEB,
+    URL_BASE_API,
     PARAMETROS_API,
     FECHA_SCRAPING
 )
 
 
-def construir_url_listado(numero_pagina=1):
-    
-    #Construye URL para página de listado de compras ágiles
+def construir_parametros_listado(numero_pagina=1, parametros=None):
     
+    #Construye el string de parámetros del listado (key=value&key=value, codificado)
+    #parametros: valores que reemplazan a los por defecto (date_from, region, status...)
     
-    # Combinar parámetros por defecto con fecha y paginación
+    # Combinar parámetros por defecto con fecha, reemplazos y paginación
     parametros = {
         **PARAMETROS_API,
         'date_from': FECHA_SCRAPING,
         'date_to': FECHA_SCRAPING,
+        **(parametros or {}),
         'page_number': numero_pagina
     }
     
-    # Construir string de parámetros (key=value&key=value)
-    string_parametros = '&'.join([f"{k}={v}" for k, v in parametros.items()])
+    # urlencode escapa espacios, '&' y tildes del texto buscado
+    return urlencode(parametros)
+
+
+def construir_url_listado(numero_pagina=1, parametros=None):
+    
+    #Construye URL para página de listado de compras ágiles
+    
+    string_parametros = construir_parametros_listado(numero_pagina, parametros)
     
     # Retornar URL completa
     return f"{URL_BASE_WEB}/compra-agil?{string_parametros}"
 
 
+def construir_url_api_listado(numero_pagina=1, parametros=None):
+    
+    #Construye URL del endpoint JSON de la API con los mismos parámetros del listado
+    
+    string_parametros = construir_parametros_listado(numero_pagina, parametros)
+    return f"{URL_BASE_API}?{string_parametros}"
+
+
 def construir_url_ficha(codigo_compra):
     return f"{URL_BASE_WEB}/ficha?code={codigo_compra}"
 
@@ -38,6 +56,20 @@ def construir_url_historial(codigo_compra):
     return f"{URL_BASE_WEB}/compra-agil?action=historial&code={codigo_compra}"
 
 
+def construir_url_api_ficha(codigo_compra):
+    
+    #Endpoint JSON que la SPA consulta para la ficha de una compra
+    
+    return f"{URL_BASE_API}?action=ficha&code={codigo_compra}"
+
+
+def construir_url_api_historial(codigo_compra):
+    
+    #Endpoint JSON con el historial de una compra
+    
+    return f"{URL_BASE_API}?action=historial&code={codigo_compra}"
+
+
 def validar_url(url):
     """
     Valida que una URL tenga formato básico correcto
@@ -0,0 +1,168 @@
+"""
+Caché persistente de detalles (ficha + historial) por código de compra
+Las compras cerradas o adjudicadas no vencen; las abiertas vencen antes
+mientras más cerca está su fecha_cierre
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from config.config import (
+    RUTA_CACHE_DETALLES,
+    CACHE_DETALLES_MAXIMO,
+    CACHE_DETALLES_FRACCION_TTL,
+    CACHE_DETALLES_TTL_MINIMO,
+    CACHE_DETALLES_TTL_MAXIMO
+)
+
+
+# Estados sin cambios posteriores en la ficha (se comparan sin mayúsculas)
+ESTADOS_FINALES = ('cerrada', 'adjudicada', 'desierta', 'cancelada', 'revocada', 'suspendida')
+
+
+def _leer_fecha(valor):
+
+    #Convierte 'YYYY-MM-DD HH:MM:SS' o ISO 8601 a timestamp (None si no se puede)
+
+    if not valor or not isinstance(valor, str):
+        return None
+    try:
+        return datetime.fromisoformat(valor.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def calcular_expiracion(compra, ahora=None, fraccion=CACHE_DETALLES_FRACCION_TTL,
+                        ttl_minimo=CACHE_DETALLES_TTL_MINIMO, ttl_maximo=CACHE_DETALLES_TTL_MAXIMO):
+    """
+    Calcula hasta cuándo es válido el detalle de una compra
+
+    Args:
+        compra: Datos de la compra (listado y/o ficha) con 'estado' y 'fecha_cierre'
+        ahora: Timestamp de referencia (por defecto time.time())
+
+    Returns:
+        float: Timestamp de vencimiento, o None si no vence (cerrada/adjudicada)
+    """
+    ahora = time.time() if ahora is None else ahora
+
+    estado = str(compra.get('estado') or '').lower()
+    if any(final in estado for final in ESTADOS_FINALES):
+        return None
+
+    cierre = _leer_fecha(compra.get('fecha_cierre'))
+    if cierre is not None and cierre <= ahora:
+        return None
+
+    if cierre is None:
+        return ahora + ttl_minimo
+
+    ttl = min(ttl_maximo, max(ttl_minimo, (cierre - ahora) * fraccion))
+    return ahora + ttl
+
+
+class CacheDetalles:
+    """
+    Caché en SQLite con vencimiento por entrada y descarte LRU
+
+    Atributos:
+        ruta: Archivo SQLite de la caché
+        maximo: Entradas conservadas; al superarlo se descartan las de acceso más antiguo
+    """
+
+    def __init__(self, ruta=RUTA_CACHE_DETALLES, maximo=CACHE_DETALLES_MAXIMO):
+        self.ruta = ruta
+        self.maximo = maximo
+        self._lock = threading.Lock()
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._conexion = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS detalles ("
+            "codigo TEXT PRIMARY KEY, detalle TEXT NOT NULL, "
+            "expira_en REAL, ultimo_acceso REAL NOT NULL)"
+        )
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_acceso ON detalles (ultimo_acceso)"
+        )
+        self._conexion.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM detalles").fetchone()[0]
+
+    def obtener(self, codigo):
+        """
+        Busca el detalle vigente de un código
+
+        Args:
+            codigo: Código de la compra
+
+        Returns:
+            dict: Detalle guardado, o None si no está o venció
+        """
+        ahora = time.time()
+
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT detalle, expira_en FROM detalles WHERE codigo = ?", (codigo,)
+            ).fetchone()
+
+            if fila is None:
+                return None
+
+            detalle, expira_en = fila
+            if expira_en is not None and expira_en <= ahora:
+                self._conexion.execute("DELETE FROM detalles WHERE codigo = ?", (codigo,))
+                self._conexion.commit()
+                return None
+
+            self._conexion.execute(
+                "UPDATE detalles SET ultimo_acceso = ? WHERE codigo = ?", (ahora, codigo)
+            )
+            self._conexion.commit()
+
+        return json.loads(detalle)
+
+    def guardar(self, codigo, detalle, compra=None):
+
+        #Guarda el detalle con el vencimiento que corresponde al estado de la compra
+        #compra: datos del listado; se combinan con la ficha para leer estado y cierre
+
+        ficha = detalle.get('ficha') if isinstance(detalle.get('ficha'), dict) else {}
+        expira_en = calcular_expiracion({**(compra or {}), **ficha})
+        ahora = time.time()
+
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO detalles (codigo, detalle, expira_en, ultimo_acceso) "
+                "VALUES (?, ?, ?, ?)",
+                (codigo, json.dumps(detalle, ensure_ascii=False), expira_en, ahora)
+            )
+            self._descartar_exceso()
+            self._conexion.commit()
+
+    def _descartar_exceso(self):
+
+        #Borra las entradas de acceso más antiguo por sobre el máximo (requiere el lock)
+
+        total = self._conexion.execute("SELECT COUNT(*) FROM detalles").fetchone()[0]
+        exceso = total - self.maximo
+        if exceso > 0:
+            self._conexion.execute(
+                "DELETE FROM detalles WHERE codigo IN ("
+                "SELECT codigo FROM detalles ORDER BY ultimo_acceso LIMIT ?)",
+                (exceso,)
+            )
+
+    def limpiar(self):
+        """Borra todas las entradas"""
+        with self._lock:
+            self._conexion.execute("DELETE FROM detalles")
+            self._conexion.commit()
+
+    def cerrar(self):
+        """Cierra la conexión a la base"""
+        with self._lock:
+            self._conexion.close()
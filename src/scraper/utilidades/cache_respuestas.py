@@ -0,0 +1,115 @@
+"""
+Caché local de respuestas JSON del listado, por URL y con vigencia fija
+Un archivo SQLite compartido por todos los puntos de entrada (y procesos)
+del equipo
+"""
+import json
+import sqlite3
+import threading
+import time
+from config.config import (
+    RUTA_CACHE_RESPUESTAS,
+    CACHE_RESPUESTAS_TTL,
+    CACHE_RESPUESTAS_MAXIMO
+)
+
+
+class CacheRespuestas:
+    """
+    Respuestas por URL que vencen ttl segundos después de guardarse
+
+    Atributos:
+        ruta: Archivo SQLite de la caché
+        ttl: Segundos de vigencia de cada respuesta
+        maximo: Respuestas conservadas; al superarlo se descartan las de acceso más antiguo
+    """
+
+    def __init__(self, ruta=RUTA_CACHE_RESPUESTAS, ttl=CACHE_RESPUESTAS_TTL,
+                 maximo=CACHE_RESPUESTAS_MAXIMO):
+        self.ruta = ruta
+        self.ttl = ttl
+        self.maximo = maximo
+        self._lock = threading.Lock()
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        # timeout: otro proceso puede estar escribiendo la misma base
+        self._conexion = sqlite3.connect(str(ruta), timeout=30, check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas ("
+            "url TEXT PRIMARY KEY, contenido TEXT NOT NULL, "
+            "guardado_en REAL NOT NULL, ultimo_acceso REAL NOT NULL)"
+        )
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_respuestas_acceso ON respuestas (ultimo_acceso)"
+        )
+        self._conexion.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM respuestas").fetchone()[0]
+
+    def obtener(self, url):
+        """
+        Busca la respuesta vigente de una URL
+
+        Args:
+            url: URL solicitada (incluye todos los parámetros de la consulta)
+
+        Returns:
+            dict: JSON guardado, o None si no está o venció
+        """
+        ahora = time.time()
+
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT contenido, guardado_en FROM respuestas WHERE url = ?", (url,)
+            ).fetchone()
+
+            if fila is None:
+                return None
+
+            contenido, guardado_en = fila
+            if ahora - guardado_en >= self.ttl:
+                self._conexion.execute("DELETE FROM respuestas WHERE url = ?", (url,))
+                self._conexion.commit()
+                return None
+
+            self._conexion.execute(
+                "UPDATE respuestas SET ultimo_acceso = ? WHERE url = ?", (ahora, url)
+            )
+            self._conexion.commit()
+
+        return json.loads(contenido)
+
+    def guardar(self, url, datos):
+
+        #Guarda la respuesta de una URL y descarta el exceso por sobre el máximo
+
+        ahora = time.time()
+
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO respuestas (url, contenido, guardado_en, ultimo_acceso) "
+                "VALUES (?, ?, ?, ?)",
+                (url, json.dumps(datos, ensure_ascii=False), ahora, ahora)
+            )
+
+            exceso = self._conexion.execute("SELECT COUNT(*) FROM respuestas").fetchone()[0] - self.maximo
+            if exceso > 0:
+                self._conexion.execute(
+                    "DELETE FROM respuestas WHERE url IN ("
+                    "SELECT url FROM respuestas ORDER BY ultimo_acceso LIMIT ?)",
+                    (exceso,)
+                )
+            self._conexion.commit()
+
+    def limpiar(self):
+        """Borra todas las respuestas"""
+        with self._lock:
+            self._conexion.execute("DELETE FROM respuestas")
+            self._conexion.commit()
+
+    def cerrar(self):
+        """Cierra la conexión a la base"""
+        with self._lock:
+            self._conexion.close()
@@ -0,0 +1,69 @@
+"""
+Checkpoints en disco para reanudar corridas largas de listado y detalles
+Un archivo JSONL por tipo de corrida y parámetros de consulta; una línea por
+página o código capturado
+"""
+import hashlib
+import json
+import threading
+from config.config import DIRECTORIO_CHECKPOINTS
+
+
+class GestorCheckpoint:
+    """
+    Registro incremental de lo ya capturado en una corrida
+
+    Atributos:
+        tipo: 'listado' o 'detalles'
+        clave: Hash corto de los parámetros de consulta
+        ruta: Archivo JSONL del checkpoint
+    """
+
+    def __init__(self, tipo, parametros, directorio=DIRECTORIO_CHECKPOINTS):
+        self.tipo = tipo
+        self.clave = hashlib.sha1(f"{tipo}|{parametros}".encode('utf-8')).hexdigest()[:12]
+        self.ruta = directorio / f"{tipo}_{self.clave}.jsonl"
+        self._lock = threading.Lock()
+
+    def existe(self):
+        """True si hay un checkpoint previo para estos parámetros"""
+        return self.ruta.exists()
+
+    def cargar(self):
+        """
+        Lee los registros guardados
+
+        Returns:
+            dict: identificador -> datos (una línea truncada por un corte se ignora)
+        """
+        registros = {}
+
+        if not self.ruta.exists():
+            return registros
+
+        with open(self.ruta, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue
+                registros[registro['id']] = registro['datos']
+
+        return registros
+
+    def guardar(self, identificador, datos):
+
+        #Agrega un registro al checkpoint y lo baja a disco de inmediato
+
+        linea = json.dumps({'id': identificador, 'datos': datos}, ensure_ascii=False)
+
+        with self._lock:
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(linea + '\n')
+                archivo.flush()
+
+    def eliminar(self):
+        """Borra el checkpoint (corrida completada o inicio desde cero)"""
+        with self._lock:
+            if self.ruta.exists():
+                self.ruta.unlink()
@@ -0,0 +1,110 @@
+"""
+Escritura incremental de compras en JSON Lines (una compra por línea)
+Un hilo en segundo plano escribe en disco para que el recorrido no espere la
+E/S; lo escrito sobrevive a un corte del proceso
+"""
+import json
+import os
+import queue
+import threading
+
+# Marcas para el hilo escritor
+_SINCRONIZAR = object()
+_CERRAR = object()
+
+
+class EscritorJSONL:
+    """
+    Archivo JSONL de solo agregado alimentado desde una cola
+
+    Atributos:
+        ruta: Archivo de salida
+        total_escritas: Compras escritas en disco
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.total_escritas = 0
+        self._cola = queue.Queue()
+        self._error = None
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._archivo = open(ruta, 'a', encoding='utf-8')
+        self._hilo = threading.Thread(target=self._escribir_en_fondo, name='escritor-jsonl', daemon=True)
+        self._hilo.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def escribir(self, compras, sincronizar=False):
+        """
+        Encola compras para escribir sin esperar al disco
+
+        Args:
+            compras: Lista de compras (dict serializables)
+            sincronizar: Pedir fsync una vez escritas (p. ej. al guardar un checkpoint)
+
+        Un error de escritura no interrumpe a quien encola: se informa al cerrar
+        """
+        if compras:
+            self._cola.put(list(compras))
+        if sincronizar:
+            self._cola.put(_SINCRONIZAR)
+
+    def sincronizar(self):
+
+        #Pide un fsync de lo encolado hasta ahora (lo hace el hilo escritor)
+
+        self._cola.put(_SINCRONIZAR)
+
+    def cerrar(self):
+        """Escribe lo pendiente, sincroniza y cierra el archivo"""
+        if self._hilo.is_alive():
+            self._cola.put(_CERRAR)
+            self._hilo.join()
+        self._verificar_error()
+
+    def _verificar_error(self):
+        if self._error is not None:
+            raise Exception(f"ERROR al escribir {self.ruta}: {self._error}")
+
+    def _escribir_en_fondo(self):
+
+        #Vacía la cola; varios fsync pedidos mientras hay trabajo pendiente se
+        #agrupan en uno solo al quedar la cola vacía
+
+        pendiente_sincronizar = False
+
+        try:
+            while True:
+                elemento = self._cola.get()
+
+                if elemento is _CERRAR:
+                    break
+
+                if elemento is _SINCRONIZAR:
+                    pendiente_sincronizar = True
+                else:
+                    self._archivo.write(''.join(
+                        json.dumps(compra, ensure_ascii=False) + '\n' for compra in elemento
+                    ))
+                    self.total_escritas += len(elemento)
+
+                if pendiente_sincronizar and self._cola.empty():
+                    self._sincronizar_archivo()
+                    pendiente_sincronizar = False
+
+            self._sincronizar_archivo()
+
+        except Exception as e:
+            self._error = e
+
+        finally:
+            self._archivo.close()
+
+    def _sincronizar_archivo(self):
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
@@ -11,6 +11,8 @@ from config.config import (
     DIRECTORIO_DATOS_RAW,
     DELAY_ENTRE_REQUESTS
 )
+from .lector_json import abrir_texto, es_jsonl, iterar_compras
+from .indice import identificador_compra
 
 
 # ============================================
@@ -43,24 +45,45 @@ def guardar_json(datos, nombre_archivo, directorio=DIRECTORIO_DATOS_RAW):
 
 def cargar_json(ruta_archivo):
     """
-    Carga datos desde un archivo JSON
+    Carga datos desde un archivo JSON o JSON Lines (.jsonl), también comprimido (.gz/.bz2/.xz)
+    
+    Para archivos grandes usar iterar_compras/iterar_dataframes (lector_json)
     
     Args:
-        ruta_archivo: Ruta completa del archivo JSON
+        ruta_archivo: Ruta completa del archivo
     
     Returns:
-        Any: Datos cargados desde el JSON
+        Any: Datos cargados desde el JSON; lista de registros si es JSONL
     """
     try:
-        with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+        if es_jsonl(ruta_archivo):
+            return cargar_jsonl(ruta_archivo)
+        
+        with abrir_texto(ruta_archivo) as archivo:
             return json.load(archivo)
             
     except FileNotFoundError:
         raise FileNotFoundError(f"ERROR: Archivo no encontrado {ruta_archivo}")
     except json.JSONDecodeError as e:
+        # Varios documentos seguidos: JSON Lines con otra extensión
+        if e.msg == 'Extra data':
+            return cargar_jsonl(ruta_archivo)
         raise Exception(f"ERROR: JSON inválido en {ruta_archivo}: {e}")
 
 
+def cargar_jsonl(ruta_archivo):
+    """
+    Carga un archivo JSON Lines
+    
+    Args:
+        ruta_archivo: Ruta completa del archivo
+    
+    Returns:
+        list: Un registro por línea (la última línea truncada por un corte se ignora)
+    """
+    return list(iterar_compras(ruta_archivo))
+
+
 def validar_json_serializable(datos):
     """
     Valida si los datos son serializables a JSON
@@ -258,4 +281,31 @@ def validar_lista_no_vacia(lista):
     Returns:
         bool: True si es lista no vacía, False si no
     """
-    return isinstance(lista, list) and len(lista) > 0
\ No newline at end of file
+    return isinstance(lista, list) and len(lista) > 0
+
+
+def deduplicar_compras(compras):
+    """
+    Elimina compras repetidas conservando la primera aparición
+    
+    Args:
+        compras: Lista de compras (se identifican con identificador_compra,
+                 igual que el índice incremental y los checkpoints)
+    
+    Returns:
+        list: Compras sin duplicados, en el orden original
+    """
+    vistas = set()
+    unicas = []
+    
+    for compra in compras:
+        identificador = identificador_compra(compra)
+        if identificador is None:
+            unicas.append(compra)
+            continue
+        if identificador in vistas:
+            continue
+        vistas.add(identificador)
+        unicas.append(compra)
+    
+    return unicas
@@ -0,0 +1,93 @@
+"""
+Índice de compras ya vistas en corridas anteriores
+Permite el scraping incremental: solo se piden páginas hasta llegar a
+compras conocidas
+"""
+import hashlib
+import json
+from config.config import DIRECTORIO_ESTADO, INDICE_MAXIMO_COMPRAS
+
+
+def identificador_compra(compra):
+    """
+    Identificador estable de una compra del listado
+
+    Args:
+        compra: Diccionario de la compra
+
+    Returns:
+        str: codigo (o id si no hay código), None si no tiene ninguno
+    """
+    identificador = compra.get('codigo') or compra.get('id')
+    return str(identificador) if identificador is not None else None
+
+
+class IndiceCompras:
+    """
+    Conjunto persistente de identificadores conocidos para una consulta
+
+    Atributos:
+        ruta: Archivo JSON del índice
+        ultimo_result_count: resultCount visto en la última corrida completa
+        maximo: Identificadores que se conservan (los más antiguos se descartan)
+    """
+
+    def __init__(self, parametros, directorio=DIRECTORIO_ESTADO, maximo=INDICE_MAXIMO_COMPRAS):
+        clave = hashlib.sha1(parametros.encode('utf-8')).hexdigest()[:12]
+        self.ruta = directorio / f"indice_compras_{clave}.json"
+        self.maximo = maximo
+        self.ultimo_result_count = None
+        self._conocidos = {}
+
+        self.cargar()
+
+    def __len__(self):
+        return len(self._conocidos)
+
+    def __contains__(self, compra):
+        return identificador_compra(compra) in self._conocidos
+
+    def cargar(self):
+
+        #Lee el índice de disco (vacío si no existe o está dañado)
+
+        try:
+            datos = json.loads(self.ruta.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return
+
+        self.ultimo_result_count = datos.get('ultimo_result_count')
+        self._conocidos = dict.fromkeys(datos.get('conocidos', []))
+
+    def agregar(self, compras):
+
+        #Marca compras como conocidas
+        #Retorna: Cantidad de compras nuevas
+
+        nuevas = 0
+        for compra in compras:
+            identificador = identificador_compra(compra)
+            if identificador and identificador not in self._conocidos:
+                self._conocidos[identificador] = None
+                nuevas += 1
+
+        # Conservar solo los más recientes
+        exceso = len(self._conocidos) - self.maximo
+        if exceso > 0:
+            for identificador in list(self._conocidos)[:exceso]:
+                del self._conocidos[identificador]
+
+        return nuevas
+
+    def guardar(self, result_count=None):
+
+        #Persiste el índice; result_count se actualiza solo si se indica
+
+        if result_count is not None:
+            self.ultimo_result_count = result_count
+
+        datos = {
+            'ultimo_result_count': self.ultimo_result_count,
+            'conocidos': list(self._conocidos)
+        }
+        self.ruta.write_text(json.dumps(datos, ensure_ascii=False), encoding='utf-8')
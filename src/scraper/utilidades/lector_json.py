@@ -0,0 +1,223 @@
+"""
+Lectura en flujo de archivos de compras (JSON, JSON Lines y comprimidos)
+Las compras se entregan de a una o por lotes sin cargar el archivo completo:
+la memoria usada depende del tamaño del lote, no del archivo
+"""
+import bz2
+import gzip
+import itertools
+import json
+import lzma
+from pathlib import Path
+
+import pandas as pd
+
+from config.config import TAMANO_LOTE_LECTURA
+
+# Caracteres leídos del archivo por bloque
+TAMANO_BLOQUE = 1 << 16
+
+# Caracteres máximos de un elemento del arreglo: más allá, un valor que no
+# termina de decodificarse se da por inválido en vez de leer el resto del archivo
+TAMANO_MAXIMO_ELEMENTO = 1 << 26
+
+APERTURAS_COMPRIMIDAS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+_ESPACIOS = ' \t\r\n'
+
+
+def abrir_texto(ruta_archivo):
+    """
+    Abre un archivo de texto UTF-8, descomprimiéndolo según la extensión
+
+    Args:
+        ruta_archivo: Ruta (.json, .jsonl, y sus variantes .gz/.bz2/.xz)
+
+    Returns:
+        Archivo de texto abierto para lectura
+    """
+    ruta_archivo = Path(ruta_archivo)
+    abrir = APERTURAS_COMPRIMIDAS.get(ruta_archivo.suffix)
+    if abrir:
+        return abrir(ruta_archivo, 'rt', encoding='utf-8')
+    return open(ruta_archivo, 'r', encoding='utf-8')
+
+
+def es_jsonl(ruta_archivo):
+    """True si la extensión (sin la de compresión) es .jsonl"""
+    ruta_archivo = Path(ruta_archivo)
+    if ruta_archivo.suffix in APERTURAS_COMPRIMIDAS:
+        ruta_archivo = ruta_archivo.with_suffix('')
+    return ruta_archivo.suffix == '.jsonl'
+
+
+class _LectorArreglo:
+    """
+    Elementos de un arreglo JSON, decodificados de a uno desde un buffer acotado
+    """
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.buffer = ''
+        self.posicion = 0
+        self.fin = False
+        self.decodificador = json.JSONDecoder()
+
+    def _leer_bloque(self):
+
+        #Descarta lo ya decodificado y agrega un bloque; False al final del archivo
+        bloque = self.archivo.read(TAMANO_BLOQUE)
+        self.buffer = self.buffer[self.posicion:] + bloque
+        self.posicion = 0
+        if not bloque:
+            self.fin = True
+        return bool(bloque)
+
+    def _siguiente_caracter(self, ignorar=_ESPACIOS):
+
+        #Primer carácter no ignorado, sin consumirlo ('' al final del archivo)
+        while True:
+            while self.posicion < len(self.buffer) and self.buffer[self.posicion] in ignorar:
+                self.posicion += 1
+            if self.posicion < len(self.buffer):
+                return self.buffer[self.posicion]
+            if not self._leer_bloque():
+                return ''
+
+    def _valor(self):
+
+        #Un valor completo; si el buffer lo corta se lee otro bloque y se reintenta
+        while True:
+            try:
+                valor, fin = self.decodificador.raw_decode(self.buffer, self.posicion)
+                # Un número al borde del buffer puede seguir en el próximo bloque
+                if fin < len(self.buffer) or self.fin:
+                    self.posicion = fin
+                    return valor
+            except json.JSONDecodeError as e:
+                if self.fin:
+                    raise
+                pendiente = len(self.buffer) - self.posicion
+                if pendiente > TAMANO_MAXIMO_ELEMENTO:
+                    raise json.JSONDecodeError(
+                        f"{e.msg}; elemento sin cerrar tras {pendiente} caracteres",
+                        self.buffer[self.posicion:self.posicion + 200], 0
+                    )
+            self._leer_bloque()
+
+    def es_arreglo(self):
+        """True si el documento empieza con '['"""
+        return self._siguiente_caracter() == '['
+
+    def elementos(self):
+        """Itera los elementos del arreglo de nivel superior"""
+        if not self.es_arreglo():
+            raise json.JSONDecodeError("Se esperaba un arreglo", self.buffer, self.posicion)
+        self.posicion += 1
+
+        while True:
+            caracter = self._siguiente_caracter(_ESPACIOS + ',')
+            if caracter == ']':
+                return
+            if caracter == '':
+                raise json.JSONDecodeError("Arreglo sin cerrar", self.buffer, self.posicion)
+            yield self._valor()
+
+
+def _lineas_jsonl(archivo, ruta_archivo):
+
+    #Un registro por línea; la última línea truncada por un corte se ignora
+    pendiente = None
+
+    for numero, linea in enumerate(archivo, start=1):
+        if not linea.strip():
+            continue
+        if pendiente:
+            raise Exception(f"ERROR: JSON inválido en {ruta_archivo}, línea {pendiente[0]}: {pendiente[1]}")
+        try:
+            yield json.loads(linea)
+        except json.JSONDecodeError as e:
+            pendiente = (numero, e)
+
+
+def iterar_compras(ruta_archivo):
+    """
+    Itera las compras de un archivo de a una, sin cargarlo completo
+
+    Acepta un arreglo JSON, JSON Lines (también con extensión .json) y sus
+    versiones comprimidas (.gz, .bz2, .xz)
+
+    Args:
+        ruta_archivo: Ruta del archivo (Path)
+
+    Yields:
+        dict: Cada compra, en el orden del archivo
+    """
+    ruta_archivo = Path(ruta_archivo)
+    try:
+        with abrir_texto(ruta_archivo) as archivo:
+            if es_jsonl(ruta_archivo):
+                yield from _lineas_jsonl(archivo, ruta_archivo)
+                return
+
+            lector = _LectorArreglo(archivo)
+            if lector.es_arreglo():
+                yield from lector.elementos()
+                return
+
+            # No es un arreglo: JSON Lines guardado con extensión .json si trae
+            # más de un documento (uno solo es un objeto, como en cargar_json)
+            archivo.seek(0)
+            registros = _lineas_jsonl(archivo, ruta_archivo)
+            primeros = list(itertools.islice(registros, 2))
+            if len(primeros) == 1:
+                raise Exception(f"ERROR: {ruta_archivo} no contiene una lista de compras")
+            yield from primeros
+            yield from registros
+
+    except FileNotFoundError:
+        raise FileNotFoundError(f"ERROR: Archivo no encontrado {ruta_archivo}")
+    except json.JSONDecodeError as e:
+        raise Exception(f"ERROR: JSON inválido en {ruta_archivo}: {e}")
+
+
+def iterar_lotes(ruta_archivo, tamano_lote=TAMANO_LOTE_LECTURA):
+    """
+    Itera las compras de un archivo en listas de hasta tamano_lote
+
+    Args:
+        ruta_archivo: Ruta del archivo (Path)
+        tamano_lote: Compras por lote
+
+    Yields:
+        list: Lote de compras
+    """
+    lote = []
+    for compra in iterar_compras(ruta_archivo):
+        lote.append(compra)
+        if len(lote) >= tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def iterar_dataframes(ruta_archivo, tamano_lote=TAMANO_LOTE_LECTURA, columnas=None):
+    """
+    Itera un archivo de compras como DataFrames de hasta tamano_lote filas
+
+    Permite filtrar archivos más grandes que la memoria lote a lote
+
+    Args:
+        ruta_archivo: Ruta del archivo (Path)
+        tamano_lote: Filas por DataFrame
+        columnas: Claves a conservar de cada compra (None = todas); descartar
+                  p. ej. 'detalle' al leer reduce la memoria de cada lote
+
+    Yields:
+        pd.DataFrame: Lote de compras
+    """
+    for lote in iterar_lotes(ruta_archivo, tamano_lote):
+        if columnas is not None:
+            lote = [{columna: compra[columna] for columna in columnas if columna in compra} for compra in lote]
+        yield pd.DataFrame(lote)
@@ -0,0 +1,318 @@
+"""
+Limitador de tasa adaptativo (token bucket + AIMD) para las solicitudes al sitio
+Compartido entre scrapers del mismo proceso y, mediante un archivo de estado
+con lock, entre procesos del mismo equipo
+"""
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from config.config import (
+    DIRECTORIO_ESTADO,
+    LIMITADOR_TASA_INICIAL,
+    LIMITADOR_TASA_MINIMA,
+    LIMITADOR_TASA_MAXIMA,
+    LIMITADOR_INCREMENTO,
+    LIMITADOR_FACTOR_REDUCCION,
+    LIMITADOR_FACTOR_LATENCIA,
+    LIMITADOR_ENFRIAMIENTO,
+    LIMITADOR_RAFAGA,
+    LIMITADOR_COMPARTIDO
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: el estado queda compartido solo dentro del proceso
+    fcntl = None
+
+
+# Peso del promedio móvil de latencias sanas
+ALFA_LATENCIA = 0.2
+
+# Espera máxima entre revisiones del bucket (otro proceso puede liberar antes)
+ESPERA_MAXIMA_SONDEO = 0.5
+
+# Segundos sin uso tras los cuales el estado compartido se descarta (corrida nueva)
+VIGENCIA_ESTADO = 600
+
+
+def clasificar_error(error):
+    """
+    Determina si un error es señal de saturación del servidor
+
+    Args:
+        error: Código HTTP (int), excepción o texto ('HTTP 503', 'timeout', ...)
+
+    Returns:
+        str: 'http_429', 'http_5xx', 'timeout' o None si no amerita reducir la tasa
+    """
+    if error is None:
+        return None
+
+    codigo = error if isinstance(error, int) else None
+
+    # Excepciones de requests con respuesta adjunta
+    respuesta = getattr(error, 'response', None)
+    if codigo is None and respuesta is not None:
+        codigo = getattr(respuesta, 'status_code', None)
+
+    if codigo is None:
+        coincidencia = re.search(r'HTTP (\d{3})', str(error))
+        if coincidencia:
+            codigo = int(coincidencia.group(1))
+
+    if codigo is not None:
+        if codigo == 429:
+            return 'http_429'
+        if codigo >= 500:
+            return 'http_5xx'
+        return None
+
+    texto = f"{type(error).__name__} {error}".lower()
+    if 'timeout' in texto or 'timed out' in texto:
+        return 'timeout'
+
+    return None
+
+
+class TurnoSolicitud:
+    """Resultado de una solicitud hecha dentro de LimitadorTasa.turno()"""
+
+    def __init__(self):
+        self.error = None
+        self.espera_servidor = None
+
+    def fallar(self, error, espera_servidor=None):
+
+        #Marca la solicitud como fallida (código HTTP, excepción o texto)
+
+        self.error = error
+        self.espera_servidor = espera_servidor
+
+
+class LimitadorTasa:
+    """
+    Token bucket cuya tasa se ajusta con AIMD
+
+    - Respuesta sana (latencia dentro de LIMITADOR_FACTOR_LATENCIA veces la
+      latencia base): la tasa sube LIMITADOR_INCREMENTO req/s
+    - 429, 5xx, timeout o latencia degradada: la tasa se multiplica por
+      LIMITADOR_FACTOR_REDUCCION (como máximo una vez por enfriamiento)
+
+    Atributos:
+        nombre: Identificador del estado compartido (un archivo por nombre)
+        tasa_minima / tasa_maxima: Límites de la tasa en solicitudes por segundo
+        ruta_estado: Archivo de estado compartido entre procesos (o None)
+    """
+
+    def __init__(self, nombre='mercadopublico', tasa_inicial=LIMITADOR_TASA_INICIAL,
+                 tasa_minima=LIMITADOR_TASA_MINIMA, tasa_maxima=LIMITADOR_TASA_MAXIMA,
+                 incremento=LIMITADOR_INCREMENTO, factor_reduccion=LIMITADOR_FACTOR_REDUCCION,
+                 factor_latencia=LIMITADOR_FACTOR_LATENCIA, enfriamiento=LIMITADOR_ENFRIAMIENTO,
+                 rafaga=LIMITADOR_RAFAGA, compartido=LIMITADOR_COMPARTIDO):
+        self.nombre = nombre
+        self.tasa_inicial = tasa_inicial
+        self.tasa_minima = min(tasa_minima, tasa_maxima)
+        self.tasa_maxima = tasa_maxima
+        self.incremento = incremento
+        self.factor_reduccion = factor_reduccion
+        self.factor_latencia = factor_latencia
+        self.enfriamiento = enfriamiento
+        self.rafaga = max(1.0, rafaga)
+
+        # Tasa <= 0: limitador desactivado (equivale a REQUEST_DELAY=0)
+        self.activo = tasa_inicial > 0
+
+        self.ruta_estado = None
+        if compartido and fcntl is not None and self.activo:
+            self.ruta_estado = DIRECTORIO_ESTADO / f"limitador_{nombre}.json"
+
+        self._lock = threading.Lock()
+        self._estado_local = None
+
+    # ============================================
+    # ESTADO (local o compartido entre procesos)
+    # ============================================
+
+    def _estado_inicial(self):
+        return {
+            'tasa': self.tasa_inicial,
+            'tokens': self.rafaga,
+            'ultima_recarga': time.time(),
+            'pausa_hasta': 0.0,
+            'ultima_reduccion': 0.0,
+            'latencia_base': None
+        }
+
+    @contextmanager
+    def _estado(self):
+
+        #Entrega el estado bloqueado para leerlo/modificarlo y lo persiste al salir
+
+        with self._lock:
+            if not self.ruta_estado:
+                if self._estado_local is None:
+                    self._estado_local = self._estado_inicial()
+                yield self._estado_local
+                return
+
+            with open(self.ruta_estado.with_suffix('.lock'), 'a') as archivo_lock:
+                fcntl.flock(archivo_lock, fcntl.LOCK_EX)
+                try:
+                    try:
+                        estado = json.loads(self.ruta_estado.read_text(encoding='utf-8'))
+                    except (FileNotFoundError, ValueError):
+                        estado = self._estado_inicial()
+
+                    if time.time() - estado['ultima_recarga'] > VIGENCIA_ESTADO:
+                        estado = self._estado_inicial()
+
+                    yield estado
+
+                    self.ruta_estado.write_text(json.dumps(estado), encoding='utf-8')
+                finally:
+                    fcntl.flock(archivo_lock, fcntl.LOCK_UN)
+
+    def _recargar(self, estado, ahora):
+        transcurrido = max(0.0, ahora - estado['ultima_recarga'])
+        estado['tokens'] = min(self.rafaga, estado['tokens'] + transcurrido * estado['tasa'])
+        estado['ultima_recarga'] = ahora
+
+    @property
+    def tasa_actual(self):
+        """Tasa vigente en solicitudes por segundo (0 si está desactivado)"""
+        if not self.activo:
+            return 0.0
+        with self._estado() as estado:
+            return estado['tasa']
+
+    # ============================================
+    # USO
+    # ============================================
+
+    def adquirir(self, cantidad=1):
+
+        #Bloquea hasta poder emitir `cantidad` solicitudes
+        #Retorna: Segundos esperados
+
+        if not self.activo:
+            return 0.0
+
+        inicio = time.time()
+        cantidad = min(cantidad, self.rafaga)
+
+        while True:
+            with self._estado() as estado:
+                ahora = time.time()
+                self._recargar(estado, ahora)
+
+                if ahora >= estado['pausa_hasta'] and estado['tokens'] >= cantidad:
+                    estado['tokens'] -= cantidad
+                    return ahora - inicio
+
+                faltante = max(0.0, cantidad - estado['tokens'])
+                espera = max(estado['pausa_hasta'] - ahora, faltante / estado['tasa'])
+
+            time.sleep(min(espera, ESPERA_MAXIMA_SONDEO))
+
+    def registrar_resultado(self, latencia, error=None, espera_servidor=None, estadisticas=None):
+        """
+        Ajusta la tasa según el resultado de una solicitud
+
+        Args:
+            latencia: Segundos que tardó la solicitud
+            error: None si fue exitosa; código HTTP, excepción o texto si falló
+            espera_servidor: Segundos pedidos por el servidor (Retry-After), si los hay
+            estadisticas: EstadisticasScraper donde reflejar tasa y back-off (opcional)
+
+        Returns:
+            str: Motivo del back-off aplicado o None
+        """
+        if not self.activo:
+            return None
+
+        motivo = clasificar_error(error)
+
+        with self._estado() as estado:
+            ahora = time.time()
+            base = estado['latencia_base']
+
+            if motivo is None and error is None and base and latencia > base * self.factor_latencia:
+                motivo = 'latencia'
+
+            if motivo:
+                # Reducción multiplicativa, una vez por ventana de enfriamiento
+                if ahora - estado['ultima_reduccion'] >= self.enfriamiento:
+                    estado['tasa'] = max(self.tasa_minima, estado['tasa'] * self.factor_reduccion)
+                    estado['ultima_reduccion'] = ahora
+
+                if motivo != 'latencia':
+                    pausa = espera_servidor if espera_servidor else 1.0 / estado['tasa']
+                    estado['pausa_hasta'] = max(estado['pausa_hasta'], ahora + pausa)
+                    estado['tokens'] = 0.0
+
+            elif error is None:
+                # Aumento aditivo y actualización de la latencia base
+                estado['tasa'] = min(self.tasa_maxima, estado['tasa'] + self.incremento)
+                estado['latencia_base'] = latencia if base is None else (
+                    (1 - ALFA_LATENCIA) * base + ALFA_LATENCIA * latencia
+                )
+
+            tasa = estado['tasa']
+
+        if estadisticas is not None:
+            estadisticas.registrar_tasa(tasa)
+            if motivo:
+                estadisticas.registrar_backoff(motivo)
+
+        return motivo
+
+    @contextmanager
+    def turno(self, estadisticas=None):
+
+        #Espera turno, mide la solicitud del bloque y registra su resultado
+        #Uso: with limitador.turno() as turno: ... turno.fallar('timeout')
+        #Las excepciones del bloque se registran (y se propagan)
+
+        self.adquirir()
+        turno = TurnoSolicitud()
+        inicio = time.time()
+
+        try:
+            yield turno
+        except Exception as e:
+            self.registrar_resultado(time.time() - inicio, e, estadisticas=estadisticas)
+            raise
+
+        self.registrar_resultado(
+            time.time() - inicio, turno.error, turno.espera_servidor, estadisticas
+        )
+
+    def reiniciar(self):
+        """Descarta el estado (local y compartido) y vuelve a la tasa inicial"""
+        with self._lock:
+            self._estado_local = None
+            if self.ruta_estado and self.ruta_estado.exists():
+                self.ruta_estado.unlink()
+
+
+# Un limitador por nombre y proceso; los procesos se coordinan por archivo
+_limitadores = {}
+_lock_limitadores = threading.Lock()
+
+
+def obtener_limitador(nombre='mercadopublico'):
+    """
+    Retorna el limitador compartido del proceso para `nombre`
+
+    Args:
+        nombre: Identificador del sitio/recurso limitado
+
+    Returns:
+        LimitadorTasa: Instancia única por nombre en este proceso
+    """
+    with _lock_limitadores:
+        if nombre not in _limitadores:
+            _limitadores[nombre] = LimitadorTasa(nombre)
+        return _limitadores[nombre]
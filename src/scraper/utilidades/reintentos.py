@@ -0,0 +1,105 @@
+"""
+Cola de reintentos con backoff exponencial y jitter
+Las páginas o códigos que fallan durante el barrido se reintentan al final,
+sin frenar el recorrido principal
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from config.config import (
+    REINTENTOS_MAXIMOS,
+    REINTENTOS_ESPERA_BASE,
+    REINTENTOS_ESPERA_MAXIMA
+)
+
+
+class ColaReintentos:
+    """
+    Cola de elementos fallidos ordenada por el momento de su próximo intento
+
+    Atributos:
+        logger: Logger para registrar eventos
+        estadisticas: EstadisticasScraper donde se cuentan los reintentos
+        max_intentos: Intentos totales por elemento (incluye el del barrido)
+        fallidos: Elementos que agotaron sus intentos
+    """
+
+    def __init__(self, logger, estadisticas, max_intentos=REINTENTOS_MAXIMOS,
+                 espera_base=REINTENTOS_ESPERA_BASE, espera_maxima=REINTENTOS_ESPERA_MAXIMA):
+        self.logger = logger
+        self.estadisticas = estadisticas
+        self.max_intentos = max_intentos
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.fallidos = []
+
+        self._pendientes = []
+        self._secuencia = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pendientes)
+
+    def calcular_espera(self, intento):
+        """
+        Calcula la espera antes del intento siguiente
+
+        Args:
+            intento: Número de intentos ya realizados (1 = falló el primero)
+
+        Returns:
+            float: Segundos (exponencial con tope, la mitad aleatoria)
+        """
+        espera = min(self.espera_maxima, self.espera_base * 2 ** (intento - 1))
+        return espera / 2 + random.uniform(0, espera / 2)
+
+    def agregar(self, item, intento=1):
+
+        #Programa un nuevo intento de item tras `intento` fallos
+        #Retorna: True si quedó en cola, False si agotó sus intentos
+
+        if intento >= self.max_intentos:
+            self.fallidos.append(item)
+            return False
+
+        vence_en = time.time() + self.calcular_espera(intento)
+        with self._lock:
+            heapq.heappush(self._pendientes, (vence_en, next(self._secuencia), item, intento))
+        return True
+
+    def procesar(self, funcion):
+
+        #Reintenta cada elemento cuando vence su espera hasta que la cola se vacíe
+        #funcion: (item) -> resultado; None o vacío cuenta como fallo
+        #Retorna: Diccionario item -> resultado de los elementos recuperados
+
+        recuperados = {}
+
+        if self._pendientes:
+            self.logger.info(f"Reintentando {len(self._pendientes)} elementos fallidos...")
+
+        while self._pendientes:
+            with self._lock:
+                vence_en, _, item, intento = heapq.heappop(self._pendientes)
+
+            espera = vence_en - time.time()
+            if espera > 0:
+                time.sleep(espera)
+
+            self.estadisticas.incrementar_reintentos()
+            self.logger.info(f"Reintento {intento}/{self.max_intentos - 1}: {item}")
+
+            try:
+                resultado = funcion(item)
+            except Exception as e:
+                self.logger.error(f"ERROR en reintento de {item}: {e}")
+                resultado = None
+
+            if resultado:
+                recuperados[item] = resultado
+            elif not self.agregar(item, intento + 1):
+                self.logger.error(f"Sin más reintentos para {item}")
+
+        return recuperados
@@ -2,8 +2,10 @@
 Clase para rastrear estadísticas durante el scraping
 Mantiene contadores y métricas de progreso
 """
+import threading
 from datetime import datetime
 from .helpers import calcular_tiempo_transcurrido, formatear_duracion
+from config.config import ANCHO_BANDA_REFERENCIA
 
 
 class EstadisticasScraper:
@@ -16,15 +18,42 @@ class EstadisticasScraper:
         items_scrapeados: Contador de items extraídos
         errores: Contador de errores encontrados
         reintentos: Contador de reintentos realizados
+        solicitudes_bloqueadas: Solicitudes abortadas por el enrutador del navegador
+        solicitudes_permitidas: Solicitudes que el enrutador dejó pasar
+        bytes_bloqueados_estimados: Estimación (por tipo de recurso, no medida) de los
+                                    bytes que no se descargaron
+        tasa_actual: Última tasa del limitador adaptativo (solicitudes/segundo)
+        eventos_backoff: Reducciones de tasa por motivo (http_429, http_5xx, timeout, latencia)
+        cache_aciertos: Detalles servidos desde la caché en disco
+        cache_fallos: Detalles que hubo que descargar (ausentes o vencidos)
+        cache_listado_aciertos: Páginas del listado servidas desde la caché de respuestas
+        cache_listado_fallos: Páginas del listado que hubo que pedir al sitio
+        deriva_duplicados: Compras repetidas entre páginas por corrimiento del listado
+        deriva_huecos: Bordes de página donde el listado se corrió hacia arriba
+        deriva_recuperadas: Compras recuperadas al volver a pedir páginas corridas
     """
     
     def __init__(self):
         """Inicializa estadísticas con contadores en cero"""
+        # Lock para incrementos desde hilos de trabajo concurrentes
+        self._lock = threading.Lock()
         self.tiempo_inicio = datetime.now()
         self.paginas_procesadas = 0
         self.items_scrapeados = 0
         self.errores = 0
         self.reintentos = 0
+        self.solicitudes_bloqueadas = 0
+        self.solicitudes_permitidas = 0
+        self.bytes_bloqueados_estimados = 0
+        self.tasa_actual = 0.0
+        self.eventos_backoff = {}
+        self.cache_aciertos = 0
+        self.cache_fallos = 0
+        self.cache_listado_aciertos = 0
+        self.cache_listado_fallos = 0
+        self.deriva_duplicados = 0
+        self.deriva_huecos = 0
+        self.deriva_recuperadas = 0
     
     def incrementar_paginas(self, cantidad=1):
         """
@@ -33,7 +62,8 @@ class EstadisticasScraper:
         Args:
             cantidad: Número de páginas a incrementar
         """
-        self.paginas_procesadas += cantidad
+        with self._lock:
+            self.paginas_procesadas += cantidad
     
     def incrementar_items(self, cantidad=1):
         """
@@ -42,7 +72,8 @@ class EstadisticasScraper:
         Args:
             cantidad: Número de items a incrementar
         """
-        self.items_scrapeados += cantidad
+        with self._lock:
+            self.items_scrapeados += cantidad
     
     def incrementar_errores(self, cantidad=1):
         """
@@ -51,7 +82,8 @@ class EstadisticasScraper:
         Args:
             cantidad: Número de errores a incrementar
         """
-        self.errores += cantidad
+        with self._lock:
+            self.errores += cantidad
     
     def incrementar_reintentos(self, cantidad=1):
         """
@@ -60,7 +92,97 @@ class EstadisticasScraper:
         Args:
             cantidad: Número de reintentos a incrementar
         """
-        self.reintentos += cantidad
+        with self._lock:
+            self.reintentos += cantidad
+    
+    def registrar_solicitud_bloqueada(self, bytes_estimados=0):
+        """
+        Registra una solicitud abortada por el enrutador
+        
+        Args:
+            bytes_estimados: Tamaño estimado según el tipo de recurso (no se mide)
+        """
+        with self._lock:
+            self.solicitudes_bloqueadas += 1
+            self.bytes_bloqueados_estimados += bytes_estimados
+    
+    def registrar_solicitud_permitida(self):
+        """Registra una solicitud que el enrutador dejó pasar"""
+        with self._lock:
+            self.solicitudes_permitidas += 1
+    
+    def registrar_tasa(self, tasa):
+        """
+        Registra la tasa vigente del limitador adaptativo
+        
+        Args:
+            tasa: Solicitudes por segundo
+        """
+        with self._lock:
+            self.tasa_actual = tasa
+    
+    def registrar_backoff(self, motivo):
+        """
+        Registra un evento de back-off del limitador
+        
+        Args:
+            motivo: Causa de la reducción (http_429, http_5xx, timeout, latencia)
+        """
+        with self._lock:
+            self.eventos_backoff[motivo] = self.eventos_backoff.get(motivo, 0) + 1
+    
+    def registrar_cache(self, acierto):
+        """
+        Registra una consulta a la caché de detalles
+        
+        Args:
+            acierto: True si el detalle vino de la caché
+        """
+        with self._lock:
+            if acierto:
+                self.cache_aciertos += 1
+            else:
+                self.cache_fallos += 1
+    
+    def registrar_cache_listado(self, acierto):
+        """
+        Registra una consulta a la caché de respuestas del listado
+        
+        Args:
+            acierto: True si la página vino de la caché
+        """
+        with self._lock:
+            if acierto:
+                self.cache_listado_aciertos += 1
+            else:
+                self.cache_listado_fallos += 1
+    
+    def registrar_deriva(self, duplicados=0, huecos=0, recuperadas=0):
+        """
+        Registra correcciones por corrimiento de páginas durante el recorrido
+        
+        Args:
+            duplicados: Compras descartadas por aparecer en más de una página
+            huecos: Bordes de página con compras posiblemente saltadas
+            recuperadas: Compras agregadas al volver a pedir páginas
+        """
+        with self._lock:
+            self.deriva_duplicados += duplicados
+            self.deriva_huecos += huecos
+            self.deriva_recuperadas += recuperadas
+    
+    def obtener_tiempo_ahorrado_estimado(self):
+        """
+        Estima el tiempo de descarga ahorrado por los bloqueos
+        (aproximado: parte de bytes estimados, no medidos)
+        
+        Returns:
+            float: Segundos estimados (bytes bloqueados / ancho de banda de referencia)
+        """
+        if ANCHO_BANDA_REFERENCIA <= 0:
+            return 0.0
+        
+        return self.bytes_bloqueados_estimados / ANCHO_BANDA_REFERENCIA
     
     def obtener_tiempo_transcurrido(self):
         """
@@ -85,6 +207,20 @@ class EstadisticasScraper:
             'compras_scrapeadas': self.items_scrapeados,
             'errores': self.errores,
             'reintentos': self.reintentos,
+            'solicitudes_bloqueadas': self.solicitudes_bloqueadas,
+            'solicitudes_permitidas': self.solicitudes_permitidas,
+            'bytes_bloqueados_estimados': f"~{self.bytes_bloqueados_estimados / 1e6:.1f} MB (estimación por tipo de recurso)",
+            'tiempo_ahorrado_estimado': f"~{formatear_duracion(self.obtener_tiempo_ahorrado_estimado())} (estimación)",
+            'tasa_solicitudes': f"{self.tasa_actual:.2f} req/s",
+            'eventos_backoff': sum(self.eventos_backoff.values()),
+            'backoff_por_motivo': dict(self.eventos_backoff),
+            'cache_aciertos': self.cache_aciertos,
+            'cache_fallos': self.cache_fallos,
+            'cache_listado_aciertos': self.cache_listado_aciertos,
+            'cache_listado_fallos': self.cache_listado_fallos,
+            'deriva_duplicados': self.deriva_duplicados,
+            'deriva_huecos': self.deriva_huecos,
+            'deriva_recuperadas': self.deriva_recuperadas,
             'inicio': self.tiempo_inicio.strftime('%Y-%m-%d %H:%M:%S'),
             'fin': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
@@ -142,4 +278,16 @@ class EstadisticasScraper:
         self.items_scrapeados = 0
         self.errores = 0
         self.reintentos = 0
+        self.solicitudes_bloqueadas = 0
+        self.solicitudes_permitidas = 0
+        self.bytes_bloqueados_estimados = 0
+        self.tasa_actual = 0.0
+        self.eventos_backoff = {}
+        self.cache_aciertos = 0
+        self.cache_fallos = 0
+        self.cache_listado_aciertos = 0
+        self.cache_listado_fallos = 0
+        self.deriva_duplicados = 0
+        self.deriva_huecos = 0
+        self.deriva_recuperadas = 0
 
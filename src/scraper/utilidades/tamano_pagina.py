@@ -0,0 +1,84 @@
+"""
+Tamaño de página máximo aceptado por la API del listado
+Se sondea una vez por modo de scraping y se recuerda en disco
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config.config import RUTA_TAMANO_PAGINA, TAMANO_PAGINA_VIGENCIA, TAMANO_PAGINA_VIGENCIA_SIN_DECIDIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: el bloqueo queda solo dentro del proceso
+    fcntl = None
+
+
+# Un solo escritor a la vez entre hilos; entre procesos lo cubre el flock
+_lock = threading.Lock()
+
+
+def leer_tamano_pagina(modo, ruta=RUTA_TAMANO_PAGINA, vigencia=TAMANO_PAGINA_VIGENCIA,
+                       vigencia_sin_decidir=TAMANO_PAGINA_VIGENCIA_SIN_DECIDIR):
+    """
+    Lee el resultado del último sondeo para un modo
+
+    Args:
+        modo: Modo de scraping (el parámetro puede pasar o no según el modo)
+        vigencia_sin_decidir: Vigencia de un sondeo que no pudo decidir
+
+    Returns:
+        tuple: (conocido, tamaño) - conocido es False si no hay sondeo vigente;
+               tamaño None significa que el servidor no acepta el parámetro
+               o que el sondeo no pudo decidir (se usa el tamaño por defecto)
+    """
+    try:
+        registros = json.loads(ruta.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return False, None
+
+    registro = registros.get(modo)
+    if registro and registro.get('sin_decidir'):
+        vigencia = vigencia_sin_decidir
+    if not registro or time.time() - registro.get('fecha', 0) > vigencia:
+        return False, None
+
+    return True, registro.get('tamano')
+
+
+@contextmanager
+def _bloqueado(ruta):
+
+    #Bloquea el archivo de estado para leerlo y reescribirlo sin perder sondeos
+    #de otros hilos o procesos que scrapean a la vez
+
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with _lock, open(ruta.with_suffix('.lock'), 'a') as archivo_lock:
+        if fcntl is not None:
+            fcntl.flock(archivo_lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo_lock, fcntl.LOCK_UN)
+
+
+def guardar_tamano_pagina(modo, tamano, ruta=RUTA_TAMANO_PAGINA, sin_decidir=False):
+
+    #Recuerda el tamaño aceptado (None = no soportado) para el modo
+    #sin_decidir: muestra insuficiente; se recuerda con vigencia más corta
+    #Se escribe aparte y se renombra: un corte nunca deja el archivo a medias
+
+    with _bloqueado(ruta):
+        try:
+            registros = json.loads(ruta.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            registros = {}
+
+        registros[modo] = {'tamano': tamano, 'fecha': time.time()}
+        if sin_decidir:
+            registros[modo]['sin_decidir'] = True
+        ruta_temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+        ruta_temporal.write_text(json.dumps(registros, ensure_ascii=False, indent=2), encoding='utf-8')
+        ruta_temporal.replace(ruta)
@@ -0,0 +1,289 @@
+"""
+Persistencia de compras, fichas e historial en SQLite o PostgreSQL.
+
+Las compras se insertan o actualizan por id en lotes; las columnas que usan los
+filtros (fechas, organismo, estado de convocatoria) tienen índice para poder
+consultar meses de historia sin leer todos los JSON de data/raw.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy import (
+    JSON, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text,
+    create_engine, delete, event, select
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from config.config import URL_BASE_DATOS, BASE_DATOS_TAMANO_LOTE
+
+# JSONB en PostgreSQL, texto JSON en SQLite
+TIPO_JSON = JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+metadata = MetaData()
+
+compras = Table(
+    'compras', metadata,
+    Column('id', String(64), primary_key=True),
+    Column('codigo', String(64), index=True),
+    Column('nombre', Text),
+    Column('organismo', Text, index=True),
+    Column('estado_convocatoria', Integer, index=True),
+    Column('monto_disponible_CLP', Float),
+    Column('fecha_publicacion', DateTime, index=True),
+    Column('fecha_cierre', DateTime, index=True),
+    Column('cantidad_provedores_cotizando', Integer),
+    Column('datos', TIPO_JSON, nullable=False),
+    Column('actualizado_en', DateTime, nullable=False),
+)
+
+detalles = Table(
+    'detalles', metadata,
+    Column('codigo', String(64), primary_key=True),
+    Column('compra_id', String(64), ForeignKey('compras.id', ondelete='CASCADE'), index=True),
+    Column('ficha', TIPO_JSON),
+    Column('fecha_scraping_detalle', DateTime),
+    Column('actualizado_en', DateTime, nullable=False),
+)
+
+historial = Table(
+    'historial', metadata,
+    Column('codigo', String(64), ForeignKey('detalles.codigo', ondelete='CASCADE'), primary_key=True),
+    Column('posicion', Integer, primary_key=True),
+    Column('evento', TIPO_JSON, nullable=False),
+)
+
+# Columnas de compras que se devuelven como fecha o número (el resto sale de 'datos')
+COLUMNAS_TIPADAS = [
+    'estado_convocatoria', 'monto_disponible_CLP', 'fecha_publicacion',
+    'fecha_cierre', 'cantidad_provedores_cotizando'
+]
+
+
+def _leer_fecha(valor) -> Optional[datetime]:
+
+    # 'YYYY-MM-DD HH:MM:SS' o ISO 8601; la hora se guarda tal como la publica el sitio
+    if not valor or not isinstance(valor, str):
+        return None
+    try:
+        return datetime.fromisoformat(valor.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _leer_numero(valor, tipo=float):
+    try:
+        return tipo(float(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def identificador(compra: Dict) -> Optional[str]:
+    """id de la compra (o su código si no trae id), como texto."""
+    valor = compra.get('id', compra.get('codigo'))
+    return str(valor) if valor is not None else None
+
+
+class AlmacenCompras:
+    """
+    Base de datos de compras con inserción masiva idempotente.
+
+    Atributos:
+        motor: Engine de SQLAlchemy (SQLite o PostgreSQL).
+        tamano_lote: Filas por sentencia de inserción.
+    """
+    def __init__(self, url: str = URL_BASE_DATOS, tamano_lote: int = BASE_DATOS_TAMANO_LOTE):
+        self.motor = create_engine(url)
+        self.tamano_lote = max(1, tamano_lote)
+
+        if self.motor.dialect.name == 'sqlite':
+            event.listen(self.motor, 'connect', _configurar_sqlite)
+        elif self.motor.dialect.name != 'postgresql':
+            raise ValueError(f"Base de datos no soportada: {self.motor.dialect.name} (SQLite o PostgreSQL)")
+
+        metadata.create_all(self.motor)
+
+    def guardar_compras(self, lista_compras: List[Dict]) -> int:
+        """
+        Inserta o actualiza compras del listado por id.
+
+        Args:
+            lista_compras: Compras tal como vienen de la API.
+
+        Returns:
+            Cantidad de compras guardadas (las sin id ni código se omiten).
+        """
+        filas = self._filas_compras(lista_compras)
+        with self.motor.begin() as conexion:
+            self._insertar_o_actualizar(conexion, compras, filas, ['id'])
+        return len(filas)
+
+    def guardar_detalles(self, compras_con_detalle: List[Dict]) -> int:
+        """
+        Guarda compras con su ficha e historial (salida de ScraperDetalles).
+
+        El historial de cada código se reemplaza completo por el recién capturado.
+
+        Args:
+            compras_con_detalle: Compras con la clave 'detalle' ({'ficha', 'historial', ...}).
+
+        Returns:
+            Cantidad de detalles guardados.
+        """
+        filas_compras = self._filas_compras(compras_con_detalle)
+        ahora = datetime.now()
+        filas_detalles = {}
+        historiales = {}
+
+        for compra in compras_con_detalle:
+            detalle = compra.get('detalle')
+            codigo = (detalle or {}).get('codigo') or compra.get('codigo')
+            if not detalle or not codigo:
+                continue
+            filas_detalles[codigo] = {
+                'codigo': codigo,
+                'compra_id': identificador(compra),
+                'ficha': detalle.get('ficha'),
+                'fecha_scraping_detalle': _leer_fecha(detalle.get('fecha_scraping_detalle')),
+                'actualizado_en': ahora,
+            }
+            historiales[codigo] = detalle.get('historial') or []
+
+        filas_historial = [
+            {'codigo': codigo, 'posicion': posicion, 'evento': evento}
+            for codigo, eventos in historiales.items()
+            for posicion, evento in enumerate(eventos)
+        ]
+
+        with self.motor.begin() as conexion:
+            self._insertar_o_actualizar(conexion, compras, filas_compras, ['id'])
+            self._insertar_o_actualizar(conexion, detalles, list(filas_detalles.values()), ['codigo'])
+
+            codigos = list(filas_detalles)
+            for inicio in range(0, len(codigos), self.tamano_lote):
+                conexion.execute(delete(historial).where(
+                    historial.c.codigo.in_(codigos[inicio:inicio + self.tamano_lote])
+                ))
+            for inicio in range(0, len(filas_historial), self.tamano_lote):
+                conexion.execute(historial.insert(), filas_historial[inicio:inicio + self.tamano_lote])
+
+        return len(filas_detalles)
+
+    def consultar_compras(self, fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
+                          cierre_desde: Optional[str] = None, cierre_hasta: Optional[str] = None,
+                          organismo: Optional[str] = None, estado_convocatoria: Optional[int] = None,
+                          min_monto: Optional[float] = None, max_monto: Optional[float] = None) -> pd.DataFrame:
+        """
+        Consulta compras con filtros resueltos por los índices de la base.
+
+        Args:
+            fecha_inicio: Publicadas desde (YYYY-MM-DD, inclusive).
+            fecha_fin: Publicadas hasta (YYYY-MM-DD, inclusive).
+            cierre_desde: Cierran desde (YYYY-MM-DD HH:MM:SS o fecha).
+            cierre_hasta: Cierran hasta (YYYY-MM-DD HH:MM:SS o fecha).
+            organismo: Nombre exacto del organismo.
+            estado_convocatoria: 1 primer llamado, 2 segundo llamado.
+            min_monto: Monto mínimo en CLP.
+            max_monto: Monto máximo en CLP.
+
+        Returns:
+            DataFrame con las compras (campos originales, con fechas y montos tipados),
+            ordenado por fecha de publicación.
+        """
+        consulta = select(compras.c.datos, *[compras.c[columna] for columna in COLUMNAS_TIPADAS])
+
+        if fecha_inicio:
+            consulta = consulta.where(compras.c.fecha_publicacion >= pd.Timestamp(fecha_inicio).to_pydatetime())
+        if fecha_fin:
+            fin = pd.Timestamp(fecha_fin).normalize() + pd.Timedelta(days=1)
+            consulta = consulta.where(compras.c.fecha_publicacion < fin.to_pydatetime())
+        if cierre_desde:
+            consulta = consulta.where(compras.c.fecha_cierre >= pd.Timestamp(cierre_desde).to_pydatetime())
+        if cierre_hasta:
+            consulta = consulta.where(compras.c.fecha_cierre <= pd.Timestamp(cierre_hasta).to_pydatetime())
+        if organismo:
+            consulta = consulta.where(compras.c.organismo == organismo)
+        if estado_convocatoria is not None:
+            consulta = consulta.where(compras.c.estado_convocatoria == estado_convocatoria)
+        if min_monto is not None:
+            consulta = consulta.where(compras.c.monto_disponible_CLP >= min_monto)
+        if max_monto is not None:
+            consulta = consulta.where(compras.c.monto_disponible_CLP <= max_monto)
+
+        consulta = consulta.order_by(compras.c.fecha_publicacion)
+
+        with self.motor.connect() as conexion:
+            filas = conexion.execute(consulta).all()
+
+        if not filas:
+            return pd.DataFrame()
+
+        df = pd.DataFrame([fila.datos for fila in filas])
+        for posicion, columna in enumerate(COLUMNAS_TIPADAS, start=1):
+            df[columna] = pd.Series([fila[posicion] for fila in filas], dtype=object)
+        df['monto_disponible_CLP'] = pd.to_numeric(df['monto_disponible_CLP'])
+        for columna in ('fecha_publicacion', 'fecha_cierre'):
+            df[columna] = pd.to_datetime(df[columna])
+        return df
+
+    def obtener_historial(self, codigo: str) -> List[Dict]:
+        """Eventos del historial de una compra, en el orden capturado."""
+        consulta = select(historial.c.evento).where(historial.c.codigo == codigo).order_by(historial.c.posicion)
+        with self.motor.connect() as conexion:
+            return [fila.evento for fila in conexion.execute(consulta)]
+
+    def cerrar(self):
+        """Libera las conexiones del motor."""
+        self.motor.dispose()
+
+    def _filas_compras(self, lista_compras: Iterable[Dict]) -> List[Dict]:
+
+        # Una fila por id (la última aparición gana), sin la clave 'detalle'
+        ahora = datetime.now()
+        filas = {}
+
+        for compra in lista_compras:
+            clave = identificador(compra)
+            if clave is None:
+                continue
+            datos = {k: v for k, v in compra.items() if k != 'detalle'}
+            filas[clave] = {
+                'id': clave,
+                'codigo': compra.get('codigo'),
+                'nombre': compra.get('nombre'),
+                'organismo': compra.get('organismo'),
+                'estado_convocatoria': _leer_numero(compra.get('estado_convocatoria'), int),
+                'monto_disponible_CLP': _leer_numero(compra.get('monto_disponible_CLP')),
+                'fecha_publicacion': _leer_fecha(compra.get('fecha_publicacion')),
+                'fecha_cierre': _leer_fecha(compra.get('fecha_cierre')),
+                'cantidad_provedores_cotizando': _leer_numero(compra.get('cantidad_provedores_cotizando'), int),
+                'datos': datos,
+                'actualizado_en': ahora,
+            }
+
+        return list(filas.values())
+
+    def _insertar_o_actualizar(self, conexion, tabla: Table, filas: List[Dict], claves: List[str]):
+
+        # INSERT ... ON CONFLICT DO UPDATE por lotes (mismo SQL en SQLite y PostgreSQL)
+        if not filas:
+            return
+
+        dialecto = postgresql if self.motor.dialect.name == 'postgresql' else sqlite
+        sentencia = dialecto.insert(tabla)
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=claves,
+            set_={columna.name: sentencia.excluded[columna.name] for columna in tabla.columns if columna.name not in claves}
+        )
+
+        for inicio in range(0, len(filas), self.tamano_lote):
+            conexion.execute(sentencia, filas[inicio:inicio + self.tamano_lote])
+
+
+def _configurar_sqlite(conexion_dbapi, _registro):
+
+    # WAL: lecturas mientras otro proceso escribe; claves foráneas activas
+    cursor = conexion_dbapi.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
@@ -0,0 +1,249 @@
+"""
+Histórico de compras particionado por mes de publicación (Parquet).
+
+compactar_historico() fusiona los JSON/JSONL acumulados en data/raw (listados
+completos, segundo llamado, con detalle...) en una partición por mes,
+fecha_publicacion=YYYY-MM/compras.parquet, con una sola versión de cada compra:
+la del archivo modificado más recientemente. Las consultas por rango de fechas
+solo abren las particiones de los meses que tocan.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.config import DIRECTORIO_DATOS_RAW, DIRECTORIO_HISTORICO
+from src.filters.fecha import filtrar_por_fecha
+from src.scraper.utilidades.lector_json import iterar_lotes
+from src.storage.normalizacion import normalizar_dataframe
+from src.storage.snapshot import tipar_compras
+
+PREFIJO_PARTICION = 'fecha_publicacion='
+SIN_FECHA = 'sin_fecha'
+ARCHIVO_PARTICION = 'compras.parquet'
+# Archivos de data/raw ya compactados: {nombre: [mtime, tamaño]}
+ARCHIVO_MANIFIESTO = '_compactados.json'
+
+
+def _texto_clave(valor) -> Optional[str]:
+
+    # 123, 123.0 y '123' son la misma compra
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _claves(df: pd.DataFrame) -> pd.Series:
+
+    # Código de la compra, o su id si no trae código (como identificador_compra)
+    claves = pd.Series(None, index=df.index, dtype=object)
+    for columna in ('id', 'codigo'):
+        if columna in df.columns:
+            valores = df[columna].map(_texto_clave)
+            claves = valores.where(valores.notna(), claves)
+    return claves
+
+
+def _particiones(df: pd.DataFrame) -> pd.Series:
+
+    # Mes de publicación 'YYYY-MM'; sin fecha válida -> SIN_FECHA
+    if 'fecha_publicacion' not in df.columns:
+        return pd.Series(SIN_FECHA, index=df.index)
+    fechas = df['fecha_publicacion']
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas, errors='coerce', utc=True)
+    return fechas.dt.strftime('%Y-%m').fillna(SIN_FECHA)
+
+
+def _ruta_particion(directorio: Path, particion: str) -> Path:
+    return directorio / f"{PREFIJO_PARTICION}{particion}" / ARCHIVO_PARTICION
+
+
+def particiones(directorio: Path = DIRECTORIO_HISTORICO) -> List[str]:
+    """Particiones existentes ('YYYY-MM' o 'sin_fecha'), ordenadas."""
+    if not directorio.exists():
+        return []
+    return sorted(
+        ruta.parent.name[len(PREFIJO_PARTICION):]
+        for ruta in directorio.glob(f"{PREFIJO_PARTICION}*/{ARCHIVO_PARTICION}")
+    )
+
+
+def particiones_en_rango(fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
+                         directorio: Path = DIRECTORIO_HISTORICO) -> List[str]:
+    """
+    Particiones que pueden contener compras publicadas en el rango.
+
+    Args:
+        fecha_inicio: Fecha inicial (YYYY-MM-DD, inclusive).
+        fecha_fin: Fecha final (YYYY-MM-DD, inclusive).
+        directorio: Directorio del histórico.
+
+    Returns:
+        Particiones a leer; sin rango, todas (incluida la de compras sin fecha).
+    """
+    existentes = particiones(directorio)
+    if not fecha_inicio and not fecha_fin:
+        return existentes
+
+    desde = pd.Timestamp(fecha_inicio).strftime('%Y-%m') if fecha_inicio else '0000-00'
+    hasta = pd.Timestamp(fecha_fin).strftime('%Y-%m') if fecha_fin else '9999-99'
+    return [p for p in existentes if p != SIN_FECHA and desde <= p <= hasta]
+
+
+def _leer_particion(directorio: Path, particion: str, columnas: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    ruta = _ruta_particion(directorio, particion)
+    if columnas is not None:
+        disponibles = set(pq.read_schema(ruta).names)
+        columnas = [columna for columna in columnas if columna in disponibles]
+    return pq.read_table(ruta, columns=columnas).to_pandas()
+
+
+def _escribir_particion(directorio: Path, particion: str, df: pd.DataFrame):
+    ruta = _ruta_particion(directorio, particion)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+
+    if 'fecha_publicacion' in df.columns:
+        df = df.sort_values('fecha_publicacion', kind='stable')
+    tabla = pa.Table.from_pandas(tipar_compras(df), preserve_index=False)
+
+    # Se escribe aparte y se renombra: una partición nunca queda a medias
+    ruta_temporal = ruta.with_name(ruta.name + '.tmp')
+    pq.write_table(tabla, ruta_temporal)
+    ruta_temporal.replace(ruta)
+
+
+def _leer_manifiesto(directorio: Path) -> Dict[str, list]:
+    ruta = directorio / ARCHIVO_MANIFIESTO
+    if not ruta.exists():
+        return {}
+    return json.loads(ruta.read_text(encoding='utf-8'))
+
+
+def _guardar_manifiesto(directorio: Path, manifiesto: Dict[str, list]):
+    ruta = directorio / ARCHIVO_MANIFIESTO
+    ruta_temporal = ruta.with_name(ruta.name + '.tmp')
+    ruta_temporal.write_text(json.dumps(manifiesto, indent=2, sort_keys=True), encoding='utf-8')
+    ruta_temporal.replace(ruta)
+
+
+def compactar_historico(origen: Path = DIRECTORIO_DATOS_RAW, directorio: Path = DIRECTORIO_HISTORICO) -> Dict:
+    """
+    Fusiona los archivos nuevos o modificados de data/raw en el histórico.
+
+    Solo se leen los archivos que no estaban compactados (o que cambiaron) y se
+    reescriben las particiones donde cae alguna de sus compras. Si una compra
+    cambió de mes de publicación, su versión anterior se quita de la otra partición.
+
+    Args:
+        origen: Directorio con los JSON/JSONL de compras (no se recorre recursivamente).
+        directorio: Directorio del histórico.
+
+    Returns:
+        Resumen: {'archivos', 'omitidos', 'compras', 'particiones'} de esta compactación.
+    """
+    directorio.mkdir(parents=True, exist_ok=True)
+    manifiesto = _leer_manifiesto(directorio)
+
+    candidatos = [ruta for ruta in origen.glob('*') if ruta.suffix in ('.json', '.jsonl')]
+    pendientes = []
+    for ruta in sorted(candidatos, key=lambda ruta: ruta.stat().st_mtime):
+        estado = ruta.stat()
+        firma = [estado.st_mtime, estado.st_size]
+        if manifiesto.get(ruta.name) != firma:
+            pendientes.append((ruta, firma))
+
+    resumen = {'archivos': 0, 'omitidos': [], 'compras': 0, 'particiones': []}
+    tablas = []
+
+    # Más antiguos primero: al deduplicar gana la última aparición. Cada archivo
+    # se lee en flujo y por lotes ya tipados, sin tener todos los dict en memoria
+    for ruta, firma in pendientes:
+        try:
+            lotes = []
+            for lote in iterar_lotes(ruta):
+                if not all(isinstance(compra, dict) for compra in lote):
+                    raise ValueError("no es una lista de compras")
+                lotes.append(tipar_compras(pd.DataFrame(lote)))
+        except Exception:
+            resumen['omitidos'].append(ruta.name)
+        else:
+            tablas.extend(lotes)
+            resumen['archivos'] += 1
+        manifiesto[ruta.name] = firma
+
+    if tablas:
+        nuevas = pd.concat(tablas, ignore_index=True)
+        nuevas['_clave'] = _claves(nuevas)
+        nuevas = nuevas.dropna(subset=['_clave']).drop_duplicates('_clave', keep='last')
+        nuevas['_particion'] = _particiones(nuevas)
+        claves_nuevas = set(nuevas['_clave'])
+
+        afectadas = set(nuevas['_particion'])
+        for particion in particiones(directorio):
+            if particion in afectadas:
+                continue
+            # Solo id/código: ¿hay versiones antiguas de compras que cambiaron de mes?
+            if _claves(_leer_particion(directorio, particion, ['id', 'codigo'])).isin(claves_nuevas).any():
+                afectadas.add(particion)
+
+        existentes = set(particiones(directorio))
+        for particion in sorted(afectadas):
+            df = nuevas[nuevas['_particion'] == particion].drop(columns=['_clave', '_particion'])
+            if particion in existentes:
+                anterior = _leer_particion(directorio, particion)
+                anterior = anterior[~_claves(anterior).isin(claves_nuevas)]
+                df = pd.concat([anterior, df], ignore_index=True)
+
+            if df.empty:
+                _ruta_particion(directorio, particion).unlink()
+            else:
+                _escribir_particion(directorio, particion, df)
+
+        resumen['compras'] = len(nuevas)
+        resumen['particiones'] = sorted(afectadas)
+
+    # Al final: si la compactación se corta, los archivos se vuelven a leer
+    _guardar_manifiesto(directorio, manifiesto)
+    return resumen
+
+
+def cargar_historico(fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
+                     columnas: Optional[Iterable[str]] = None, directorio: Path = DIRECTORIO_HISTORICO) -> pd.DataFrame:
+    """
+    Carga compras del histórico leyendo solo las particiones del rango.
+
+    Args:
+        fecha_inicio: Publicadas desde (YYYY-MM-DD, inclusive).
+        fecha_fin: Publicadas hasta (YYYY-MM-DD, inclusive).
+        columnas: Columnas a leer (None lee todas).
+        directorio: Directorio del histórico.
+
+    Returns:
+        DataFrame con las compras del rango, con las reglas de filtrar_por_fecha.
+    """
+    columnas = list(columnas) if columnas is not None else None
+    lectura = columnas
+    if columnas is not None and (fecha_inicio or fecha_fin) and 'fecha_publicacion' not in columnas:
+        lectura = columnas + ['fecha_publicacion']
+
+    partes = [
+        _leer_particion(directorio, particion, lectura)
+        for particion in particiones_en_rango(fecha_inicio, fecha_fin, directorio)
+    ]
+    if not partes:
+        return pd.DataFrame()
+
+    # Cada partición trae sus propias categorías: se unifican tras concatenar
+    df = normalizar_dataframe(pd.concat(partes, ignore_index=True))
+    if fecha_inicio or fecha_fin:
+        # Los meses de los extremos se recortan al día pedido
+        df = filtrar_por_fecha(df, fecha_inicio, fecha_fin).reset_index(drop=True)
+        if columnas is not None:
+            df = df[[columna for columna in columnas if columna in df.columns]]
+    return df
@@ -0,0 +1,194 @@
+"""
+Forma compacta y tipada de las compras, aplicada al ingresar los datos.
+
+- DataFrames: organismo/región como categoría, montos y conteos enteros,
+  fechas datetime64 (normalizar_dataframe). Los filtros ya no convierten.
+- Listas: los textos repetidos (organismo, región) se comparten con
+  sys.intern en los dict del listado, y Compra es un registro con __slots__
+  y campos tipados para código que trabaja con listas.
+"""
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Textos con pocos valores distintos repetidos en miles de compras
+COLUMNAS_CATEGORICAS = ['organismo', 'region', 'estado']
+# Enteros cuando todos los valores lo son (los montos en CLP no traen decimales)
+COLUMNAS_ENTERAS = ['monto_disponible_CLP', 'estado_convocatoria', 'cantidad_provedores_cotizando']
+COLUMNAS_FECHA = ['fecha_publicacion', 'fecha_cierre']
+
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+def _entero_si_es_posible(serie: pd.Series) -> pd.Series:
+
+    # Int64 (admite nulos) si todos los valores válidos son enteros; si no, float
+    numeros = serie if pd.api.types.is_numeric_dtype(serie) else pd.to_numeric(serie, errors='coerce')
+    if pd.api.types.is_integer_dtype(numeros) or pd.api.types.is_bool_dtype(numeros):
+        return numeros
+    validos = numeros.dropna()
+    if (validos == validos.round()).all() and (validos.abs() < 2 ** 63).all():
+        return numeros.astype('Int64')
+    return numeros
+
+
+def normalizar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas de compras a tipos compactos una sola vez.
+
+    Es idempotente: las columnas que ya tienen su tipo no se vuelven a convertir.
+    Valores inválidos quedan como nulos (igual que en los filtros) y las fechas
+    con zonas horarias mezcladas se dejan como texto.
+
+    Args:
+        df: DataFrame de compras.
+
+    Returns:
+        DataFrame nuevo con las columnas tipadas (el original no se modifica).
+    """
+    df_normalizado = df.copy(deep=False)
+
+    for columna in COLUMNAS_ENTERAS:
+        if columna in df_normalizado.columns:
+            df_normalizado[columna] = _entero_si_es_posible(df_normalizado[columna])
+
+    for columna in COLUMNAS_FECHA:
+        if columna in df_normalizado.columns and not pd.api.types.is_datetime64_any_dtype(df_normalizado[columna]):
+            fechas = pd.to_datetime(df_normalizado[columna], errors='coerce')
+            if fechas.dtype != object:
+                df_normalizado[columna] = fechas
+
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna in df_normalizado.columns and df_normalizado[columna].dtype == object:
+            try:
+                df_normalizado[columna] = df_normalizado[columna].astype('category')
+            except TypeError:
+                # Valores no hashables (listas/dict): se deja como está
+                pass
+
+    return df_normalizado
+
+
+def internar_compras(compras: List[Dict]) -> List[Dict]:
+    """
+    Comparte entre compras los textos repetidos (organismo, región, estado).
+
+    Cada respuesta JSON trae su propia copia de cada texto; con sys.intern todas
+    las compras de un organismo apuntan al mismo objeto. Modifica los dict.
+
+    Args:
+        compras: Compras tal como vienen de la API.
+
+    Returns:
+        La misma lista.
+    """
+    for compra in compras:
+        if not isinstance(compra, dict):
+            continue
+        for campo in COLUMNAS_CATEGORICAS:
+            valor = compra.get(campo)
+            if type(valor) is str:
+                compra[campo] = sys.intern(valor)
+    return compras
+
+
+def _leer_entero(valor):
+
+    # int si el valor es entero (también '1500.0'); float si trae decimales; None si no es número
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    if numero != numero:
+        return None
+    return int(numero) if numero.is_integer() else numero
+
+
+def _leer_fecha(valor) -> Optional[datetime]:
+    if isinstance(valor, datetime):
+        return valor
+    if not valor or not isinstance(valor, str):
+        return None
+    try:
+        return datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class Compra:
+    """
+    Compra del listado con campos tipados y sin dict por instancia.
+
+    Las claves sin campo propio quedan en 'otros' (None si no hay). get() imita
+    a dict.get para que el código que recibe dict acepte también registros.
+
+    Atributos:
+        id, codigo, nombre, organismo (compartido con sys.intern), estado_convocatoria,
+        monto_disponible_CLP, cantidad_provedores_cotizando (int), fecha_publicacion,
+        fecha_cierre (datetime), otros (dict o None).
+    """
+    CAMPOS = (
+        'id', 'codigo', 'nombre', 'organismo', 'estado_convocatoria', 'monto_disponible_CLP',
+        'fecha_publicacion', 'fecha_cierre', 'cantidad_provedores_cotizando'
+    )
+    __slots__ = CAMPOS + ('otros',)
+
+    def __init__(self, **campos):
+        for campo in self.__slots__:
+            setattr(self, campo, campos.get(campo))
+
+    @classmethod
+    def desde_dict(cls, compra: Dict) -> 'Compra':
+        """Convierte una compra de la API (dict) en registro tipado."""
+        organismo = compra.get('organismo')
+        otros = {clave: valor for clave, valor in compra.items() if clave not in cls.CAMPOS}
+        return cls(
+            id=compra.get('id'),
+            codigo=compra.get('codigo'),
+            nombre=compra.get('nombre'),
+            organismo=sys.intern(organismo) if type(organismo) is str else organismo,
+            estado_convocatoria=_leer_entero(compra.get('estado_convocatoria')),
+            monto_disponible_CLP=_leer_entero(compra.get('monto_disponible_CLP')),
+            fecha_publicacion=_leer_fecha(compra.get('fecha_publicacion')),
+            fecha_cierre=_leer_fecha(compra.get('fecha_cierre')),
+            cantidad_provedores_cotizando=_leer_entero(compra.get('cantidad_provedores_cotizando')),
+            otros=otros or None
+        )
+
+    def get(self, campo: str, defecto=None):
+        """Valor de un campo (o de 'otros'), como dict.get."""
+        if campo in self.CAMPOS:
+            valor = getattr(self, campo)
+            return defecto if valor is None else valor
+        return (self.otros or {}).get(campo, defecto)
+
+    def a_dict(self) -> Dict:
+        """Compra como dict serializable a JSON (fechas 'YYYY-MM-DD HH:MM:SS', sin campos vacíos)."""
+        compra = {}
+        for campo in self.CAMPOS:
+            valor = getattr(self, campo)
+            if valor is None:
+                continue
+            compra[campo] = valor.strftime(FORMATO_FECHA) if isinstance(valor, datetime) else valor
+        compra.update(self.otros or {})
+        return compra
+
+    def __repr__(self):
+        return f"Compra(codigo={self.codigo!r}, organismo={self.organismo!r}, monto={self.monto_disponible_CLP!r})"
+
+
+def normalizar_compras(compras: Iterable[Dict]) -> List[Compra]:
+    """
+    Convierte compras (dict) en registros Compra.
+
+    Args:
+        compras: Compras de la API o de un archivo (acepta un iterador, p. ej. iterar_compras).
+
+    Returns:
+        Lista de Compra.
+    """
+    return [Compra.desde_dict(compra) for compra in compras]
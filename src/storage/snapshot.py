@@ -0,0 +1,143 @@
+"""
+Snapshots columnares de las compras (Arrow IPC o Parquet).
+
+Las columnas de monto, fechas y conteos se guardan ya tipadas: cargar un
+snapshot no requiere parsear JSON ni convertir strings, y se pueden leer solo
+las columnas que necesita cada comando.
+"""
+import json
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from config.config import DIRECTORIO_SNAPSHOTS, FORMATO_SNAPSHOT
+from src.storage.normalizacion import normalizar_dataframe
+
+EXTENSIONES = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+
+def tipar_compras(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte una sola vez las columnas que los filtros usan como número o fecha.
+
+    Con normalizar_dataframe (valores inválidos -> nulos, organismo como
+    categoría, que Arrow/Parquet guardan como diccionario), para que filtrar un
+    snapshot dé el mismo resultado que filtrar el JSON. Las listas o
+    diccionarios se guardan como texto JSON y los valores de otro tipo en
+    columnas de texto, como texto.
+
+    Args:
+        df: DataFrame con las compras tal como vienen de la API.
+
+    Returns:
+        Copia del DataFrame con tipos columnares.
+    """
+    df_tipado = normalizar_dataframe(df)
+
+    for columna in df_tipado.columns[df_tipado.dtypes == object]:
+        df_tipado[columna] = df_tipado[columna].map(_valor_escalar)
+
+    return df_tipado
+
+
+def _valor_escalar(valor):
+
+    # Listas/diccionarios como JSON y el resto de valores no texto como texto,
+    # para que cada columna tenga un solo tipo
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor, ensure_ascii=False)
+    if isinstance(valor, float) and pd.isna(valor):
+        return None
+    return str(valor)
+
+
+def guardar_snapshot(compras: List[dict], nombre: str, directorio: Path = DIRECTORIO_SNAPSHOTS,
+                     formato: str = FORMATO_SNAPSHOT) -> Path:
+    """
+    Escribe las compras como snapshot columnar.
+
+    Args:
+        compras: Lista de compras.
+        nombre: Nombre base del archivo (sin extensión).
+        directorio: Directorio de snapshots.
+        formato: 'arrow' (memory-map, sin compresión) o 'parquet'.
+
+    Returns:
+        Ruta del snapshot escrito.
+    """
+    if formato not in EXTENSIONES:
+        raise ValueError(f"Formato de snapshot inválido: {formato} (opciones: {', '.join(EXTENSIONES)})")
+
+    tabla = pa.Table.from_pandas(tipar_compras(pd.DataFrame(compras)), preserve_index=False)
+
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / f"{nombre}{EXTENSIONES[formato]}"
+    # Se escribe aparte y se renombra: un snapshot a medias nunca es el "último"
+    ruta_temporal = ruta.with_name(ruta.name + '.tmp')
+
+    if formato == 'arrow':
+        with pa.OSFile(str(ruta_temporal), 'wb') as archivo:
+            with ipc.new_file(archivo, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+    else:
+        pq.write_table(tabla, ruta_temporal)
+
+    ruta_temporal.replace(ruta)
+    return ruta
+
+
+def ultimo_snapshot(directorio: Path = DIRECTORIO_SNAPSHOTS, prefijo: str = '') -> Optional[Path]:
+    """
+    Busca el snapshot más reciente.
+
+    Args:
+        directorio: Directorio de snapshots.
+        prefijo: Solo snapshots cuyo nombre empieza así (p. ej. 'compras_completas').
+
+    Returns:
+        Ruta del snapshot modificado por última vez, o None si no hay.
+    """
+    if not directorio.exists():
+        return None
+
+    snapshots = [
+        ruta for ruta in directorio.iterdir()
+        if ruta.suffix in EXTENSIONES.values() and ruta.name.startswith(prefijo)
+    ]
+    return max(snapshots, key=lambda ruta: ruta.stat().st_mtime, default=None)
+
+
+def cargar_snapshot(ruta: Optional[Path] = None, columnas: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Carga un snapshot leyendo solo las columnas pedidas.
+
+    Args:
+        ruta: Snapshot a cargar (por defecto el más reciente).
+        columnas: Columnas a leer; las que el snapshot no tiene se omiten.
+                  None lee todas.
+
+    Returns:
+        DataFrame con las compras (vacío si no hay snapshot).
+    """
+    ruta = ruta or ultimo_snapshot()
+    if ruta is None:
+        return pd.DataFrame()
+
+    if ruta.suffix == EXTENSIONES['parquet']:
+        if columnas is not None:
+            disponibles = set(pq.read_schema(ruta).names)
+            columnas = [columna for columna in columnas if columna in disponibles]
+        return pq.read_table(ruta, columns=columnas).to_pandas()
+
+    # Arrow IPC con memory-map: solo se copian las columnas proyectadas
+    with pa.memory_map(str(ruta), 'r') as archivo:
+        tabla = ipc.open_file(archivo).read_all()
+        if columnas is not None:
+            tabla = tabla.select([columna for columna in columnas if columna in tabla.schema.names])
+        return tabla.to_pandas()